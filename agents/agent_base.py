@@ -1,6 +1,7 @@
 # agents/agent_base.py
 
 from llm import groq_api
+from utils.retrieval import get_legal_context
 from typing import List, Dict, Any, Optional
 import os
 from datetime import datetime
@@ -15,6 +16,10 @@ class AgentBase(ABC):
     def generate_response(self, context: Dict[str, Any]) -> str:
         """Generate a response based on the given context"""
         pass
+
+    def legal_context(self, case_data: Dict[str, Any], phase: str) -> str:
+        """Case brief plus the statute sections and precedents retrieved for this phase"""
+        return get_legal_context(case_data, phase)
     
     @abstractmethod
     def analyze_case(self, case_data: Dict[str, Any]) -> Dict[str, Any]:
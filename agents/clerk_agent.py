@@ -1,6 +1,6 @@
 # agents/clerk_agent.py
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from .agent_base import AgentBase
 from utils import knowledge_base
 import random
@@ -141,7 +141,8 @@ class ClerkAgent(AgentBase):
         else:
             raise ValueError(f"Invalid action: {action}")
 
-    def get_law(self, act_name: str, section_number: int) -> str:
+    def get_law(self, act_name: str, section_number: Union[int, str]) -> str:
+        """Quote a statute section verbatim, e.g. ("ICA", "2(h)")"""
         section_text = knowledge_base.get_section_text(act_name, section_number)
         return f"{act_name} Section {section_number}:\n{section_text}" if section_text else "Section not found."
 
@@ -148,16 +148,18 @@ class DefendantAgent(AgentBase):
         Generate a professional and strategic response."""
 
     def generate_opening_statement(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are the defendant's lawyer in an Indian court. Write a persuasive opening statement for the following case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are the defendant's lawyer in an Indian court. Write a persuasive opening statement for the following case:\n{self.legal_context(case_data, "opening")}"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Opening statement could not be generated.")
 
-    def generate_question(self, witness: Dict[str, Any]) -> str:
+    def generate_question(self, witness: Dict[str, Any], case_data: Dict[str, Any] = None) -> str:
         prompt = f"""You are the defendant's lawyer. Write a strong cross-examination question for this witness:\nWitness: {witness}\n"""
+        if case_data:
+            prompt += self.legal_context(case_data, "cross_examination")
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Question could not be generated.")
 
     def generate_closing_argument(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are the defendant's lawyer. Write a compelling closing argument for this case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are the defendant's lawyer. Write a compelling closing argument for this case:\n{self.legal_context(case_data, "closing")}"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Closing argument could not be generated.") 
\ No newline at end of file
@@ -1,6 +1,6 @@
 # agents/judge_agent.py
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Union
 from .agent_base import AgentBase
 from llm.groq_api import groq_api
 
@@ -14,7 +14,7 @@ class JudgeAgent(AgentBase):
         }
     
     def generate_opening_statement(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are the presiding judge. Write a brief opening address to the court for this case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are the presiding judge. Write a brief opening address to the court for this case:\n{self.legal_context(case_data, "opening")}"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Opening address could not be generated.")
 
@@ -24,7 +24,7 @@ class JudgeAgent(AgentBase):
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Question could not be generated.")
 
     def generate_closing_argument(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are the presiding judge. Summarize the closing arguments for this case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are the presiding judge. Summarize the closing arguments for this case:\n{self.legal_context(case_data, "closing")}"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Closing summary could not be generated.")
 
@@ -53,15 +53,30 @@ class JudgeAgent(AgentBase):
             "The burden of proof must be properly allocated"
         ]
     
-    def rule_on_objection(self, objection: str) -> str:
+    def rule_on_objection(self, objection: str, case_data: Dict[str, Any] = None) -> str:
         prompt = f"You are the presiding judge. Rule on this objection: {objection}"
+        if case_data:
+            prompt += f"\n{self.legal_context(case_data, 'objection')}"
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Objection ruling could not be generated.")
         
-    def give_judgment(self, case_summary: str) -> str:
-        prompt = f"You are the presiding judge. Deliver your final judgment for this case:\nCase Summary: {case_summary}\n"""
-        result = groq_api.generate_response(prompt)
+    def give_judgment(self, case_summary: Union[str, Dict[str, Any]]) -> str:
+        result = groq_api.generate_response(self._judgment_prompt(case_summary))
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Judgment could not be generated.")
+
+    def give_judgment_stream(self, case_summary: Union[str, Dict[str, Any]]) -> Iterator[str]:
+        """Like give_judgment, but yields the text as it is generated so it can be shown and spoken early"""
+        produced = False
+        for chunk in groq_api.generate_response_stream(self._judgment_prompt(case_summary)):
+            produced = True
+            yield chunk
+        if not produced:
+            yield "[LLM Error] Judgment could not be generated."
+
+    def _judgment_prompt(self, case_summary: Union[str, Dict[str, Any]]) -> str:
+        if isinstance(case_summary, dict):
+            return f"You are the presiding judge. Deliver your final judgment for this case:\n{self.legal_context(case_summary, 'judgment')}"
+        return f"You are the presiding judge. Deliver your final judgment for this case:\nCase Summary: {case_summary}\n"
     
     def comment_on_statement(self, statement: str) -> str:
         prompt = f"You are the presiding judge. Comment on this statement: {statement}"
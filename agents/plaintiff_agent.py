@@ -71,7 +71,7 @@ class PlaintiffAgent(AgentBase):
     def generate_opening_statement(self, case_data: Dict[str, Any]) -> str:
         try:
             prompt = f"""You are the plaintiff's lawyer in an Indian court. Write a persuasive opening statement for the following case:
-Case Details: {case_data}
+{self.legal_context(case_data, "opening")}
 """
             result = groq_api.generate_response(prompt)
             response = result.get("response", "")
@@ -82,16 +82,18 @@ Case Details: {case_data}
             print(f"Error generating opening statement: {str(e)}")
             return "Your Honor, I am the plaintiff's lawyer. I will present evidence to support my client's case."
     
-    def generate_question(self, witness: Dict[str, Any]) -> str:
+    def generate_question(self, witness: Dict[str, Any], case_data: Dict[str, Any] = None) -> str:
         prompt = f"""You are the plaintiff's lawyer. Write a strong examination question for this witness:
 Witness: {witness}
 """
+        if case_data:
+            prompt += self.legal_context(case_data, "examination")
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Question could not be generated.")
     
     def generate_closing_argument(self, case_data: Dict[str, Any]) -> str:
         prompt = f"""You are the plaintiff's lawyer. Write a compelling closing argument for this case:
-Case Details: {case_data}
+{self.legal_context(case_data, "closing")}
 """
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Closing argument could not be generated.") 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Dict, Any, List
 from .agent_base import AgentBase
 from llm.groq_api import groq_api
+from utils.retrieval import format_case_brief
 
 class WitnessAgent(AgentBase):
     def __init__(self, llm_provider: str = "Groq"):
@@ -10,7 +11,7 @@ class WitnessAgent(AgentBase):
         self.credibility = 0.8  # Default credibility score
     
     def generate_opening_statement(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are a witness in an Indian court. Briefly introduce yourself and your relevance to this case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are a witness in an Indian court. Briefly introduce yourself and your relevance to this case:\nCase Brief:\n{format_case_brief(case_data)}\n"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Opening statement could not be generated.")
 
@@ -20,7 +21,7 @@ class WitnessAgent(AgentBase):
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Question could not be generated.")
 
     def generate_closing_argument(self, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are a witness. Summarize your testimony and its importance for this case:\nCase Details: {case_data}\n"""
+        prompt = f"""You are a witness. Summarize your testimony and its importance for this case:\nCase Brief:\n{format_case_brief(case_data)}\n"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Closing summary could not be generated.")
 
@@ -30,7 +31,7 @@ class WitnessAgent(AgentBase):
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Response could not be generated.")
 
     def give_testimony(self, question: str, case_data: Dict[str, Any]) -> str:
-        prompt = f"""You are a witness in an Indian court. Answer the following question truthfully, based on your knowledge and the case details.\nQuestion: {question}\nCase Details: {case_data}\n"""
+        prompt = f"""You are a witness in an Indian court. Answer the following question truthfully, based on your knowledge and the case details.\nQuestion: {question}\n{self.legal_context(case_data, "testimony")}"""
         result = groq_api.generate_response(prompt)
         return result.get("response", f"[LLM Error: {result.get('error', 'Unknown error')}] Testimony could not be generated.")
     
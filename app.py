@@ -2,6 +2,7 @@ import streamlit as st
 import json
 import os
 import time
+import tempfile
 from datetime import datetime
 import numpy as np
 import matplotlib.pyplot as plt
@@ -9,20 +10,31 @@ from PIL import Image
 import base64
 from io import BytesIO, StringIO
 from typing import Dict, Any
-import requests
-from bs4 import BeautifulSoup
-import urllib.parse
 # from frontend import CourtroomFrontend
-from frontend.components import CourtroomUI
+from frontend.components import CourtroomUI, play_audio_bytes
+from frontend.transcript_view import TranscriptView
 from frontend.animations import AnimationManager
 from frontend.proceeding_animations import CourtProceedingAnimations
 from courtroom import create_simulation, CourtroomSimulationManager
+from courtroom.trial_runner import build_case_data, observer_script
+from courtroom.trial_events import TrialMirror
+from courtroom.broadcast import broadcasts
+from courtroom.trial_bundle import load_bundle, BundlePlayback
 from agents.plaintiff_agent import PlaintiffAgent
 from agents.defendant_agent import DefendantAgent
 from agents.judge_agent import JudgeAgent
 from agents.witness_agent import WitnessAgent
 from utils.tts import TTSEngine
+from utils.tts_warmup import start_warmup
+from utils.audio_playback import audio_duration, audio_mime_type, join_audio
 from utils.stt import STTEngine
+from utils.case_law_search import search_case_law
+from server.client import TrialClient, RemoteTrial
+
+# When set, Observer trials run on the shared trial server and this app only mirrors them
+TRIAL_SERVER_URL = os.environ.get("TRIAL_SERVER_URL")
+# "browser" sends synthesized speech to the client; "server" plays it through pygame here
+AUDIO_DELIVERY = os.environ.get("AUDIO_DELIVERY", "browser")
 
 # Must be called before any other Streamlit commands
 st.set_page_config(
@@ -40,6 +52,14 @@ if 'audio_on' not in st.session_state:
     st.session_state['audio_on'] = True
 st.session_state['audio_on'] = st.sidebar.checkbox("🔊 Audio On/Off", value=st.session_state['audio_on'])
 
+# Broadcast mode: Observers of the same catalog case share one generated trial
+if 'broadcast_mode' not in st.session_state:
+    st.session_state['broadcast_mode'] = False
+st.session_state['broadcast_mode'] = st.sidebar.checkbox(
+    "📡 Broadcast Mode", value=st.session_state['broadcast_mode'],
+    help="Watch the shared live trial for this case instead of generating your own"
+)
+
 # Progress bar
 phases = [
     'opening',
@@ -59,21 +79,34 @@ st.sidebar.progress(progress, text=f"Phase: {current_phase.replace('_', ' ').tit
 if st.sidebar.button("⬅️ Back/Undo", help="Go back to the previous phase or action"):
     if 'history' in st.session_state and st.session_state['history']:
         last_state = st.session_state['history'].pop()
+        # Lines queued for the undone step should not keep playing
+        if 'tts_engine' in st.session_state:
+            st.session_state.tts_engine.cancel_playback()
         for k, v in last_state.items():
             st.session_state[k] = v
         st.rerun()
     else:
         st.sidebar.warning("No previous state to undo.")
 
+def close_simulation():
+    """Release what the current simulation holds on to (e.g. its seat in a broadcast)"""
+    sim = st.session_state.get('simulation')
+    if sim is not None and hasattr(sim, 'close'):
+        sim.close()
+
 # End Simulation button with checkbox confirmation
 if st.sidebar.button("🛑 End Simulation", help="End the current simulation and return to main menu"):
     st.session_state.show_end_confirm = True
 if st.session_state.get("show_end_confirm", False):
     if st.sidebar.checkbox("Are you sure you want to end the simulation? This cannot be undone."):
+        if 'tts_engine' in st.session_state:
+            st.session_state.tts_engine.cancel_playback()
+        close_simulation()
         for key in [
             'simulation', 'simulation_state', 'transcript', 'current_phase', 'evidence_presented',
-            'selected_witness', 'current_speaker', 'opening_done', 'examination_done', 'cross_done',
-            'evidence_done', 'objection_done', 'closing_done', 'judgment_done', 'selected_case_id', 'selected_role', 'history']:
+            'selected_witness', 'current_speaker', 'observer_step', 'observer_previous',
+            'selected_case_id', 'selected_role', 'history',
+            'mirror_pending', 'transcript_view', 'transcript_export']:
             if key in st.session_state:
                 del st.session_state[key]
         st.session_state.show_end_confirm = False
@@ -84,48 +117,61 @@ if st.sidebar.button("🔄 Restart Simulation", help="Restart the current case f
     st.session_state.show_restart_confirm = True
 if st.session_state.get("show_restart_confirm", False):
     if st.sidebar.checkbox("Are you sure you want to restart? All progress will be lost."):
+        if 'tts_engine' in st.session_state:
+            st.session_state.tts_engine.cancel_playback()
+        close_simulation()
         for key in [
             'simulation', 'simulation_state', 'transcript', 'current_phase', 'evidence_presented',
-            'selected_witness', 'current_speaker', 'opening_done', 'examination_done', 'cross_done',
-            'evidence_done', 'objection_done', 'closing_done', 'judgment_done', 'history']:
+            'selected_witness', 'current_speaker', 'observer_step', 'observer_previous', 'history',
+            'mirror_pending', 'transcript_view', 'transcript_export']:
             if key in st.session_state:
                 del st.session_state[key]
         st.session_state.show_restart_confirm = False
         st.rerun()
 
 # Download Transcript button
-if 'transcript' in st.session_state and st.session_state['transcript']:
-    transcript_text = '\n'.join([f"{entry['speaker']}: {entry['content']}" for entry in st.session_state['transcript']])
-    st.sidebar.download_button(
-        label="⬇️ Download Transcript",
-        data=transcript_text,
-        file_name="courtroom_transcript.txt",
-        mime="text/plain"
-    )
+def export_transcript(transcript):
+    """Stream the transcript into a temporary file instead of building one big string"""
+    export_file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+    if hasattr(transcript, 'export_text'):
+        transcript.export_text(export_file)
+    else:
+        for entry in transcript:
+            export_file.write(f"{entry['speaker']}: {entry['content']}\n")
+    export_file.seek(0)
+    return export_file
+
+if 'simulation' in st.session_state and len(st.session_state.simulation.transcript) > 0:
+    transcript = st.session_state.simulation.transcript
+    # Exported only when asked for, and again only once the trial has moved on
+    prepared = st.session_state.get('transcript_export')
+    if prepared is not None and prepared[0] != len(transcript):
+        prepared = st.session_state.transcript_export = None
+    if prepared is None:
+        if st.sidebar.button("⬇️ Download Transcript"):
+            with export_transcript(transcript) as export_file:
+                st.session_state.transcript_export = (len(transcript), export_file.read())
+            st.rerun()
+    else:
+        st.sidebar.download_button(
+            label="💾 Save Transcript",
+            data=prepared[1],
+            file_name="courtroom_transcript.txt",
+            mime="text/plain"
+        )
 
 # --- Legal Research Section in Sidebar ---
 st.sidebar.markdown("---")
 st.sidebar.header("📚 Legal Research")
 
-def search_indiankanoon(case_name, year="", max_results=5):
-    query = f"{case_name} {year} site:indiankanoon.org"
-    encoded_query = urllib.parse.quote_plus(query)
-    search_url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Version/13.1.2 Safari/537.36"
-    }
-
+def search_indiankanoon(case_name, year="", max_results=5, web_fallback=False):
+    """Search the local case-law index; the web is only queried if asked and nothing was found locally"""
     try:
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
+        results = search_case_law(case_name, year, max_results, web_fallback=web_fallback)
     except Exception as e:
         st.sidebar.error(f"Error fetching search results: {e}")
         return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    results = soup.find_all("a", class_="result__a", limit=max_results)
-    
     if not results:
         st.sidebar.warning(f"No results found for '{case_name}' in {year}.")
         return None
@@ -137,18 +183,19 @@ with st.sidebar.form("case_law_search"):
     case_name = st.text_input("🔍 Case Name", placeholder="e.g., Keshavananda Bharati")
     year = st.text_input("📅 Year (Optional)", placeholder="e.g., 1973")
     max_results = st.slider("Max Results", min_value=1, max_value=10, value=5)
+    web_fallback = st.checkbox("Search the web if nothing is found locally", value=False)
     search_submitted = st.form_submit_button("Search Case Law")
 
 if search_submitted and case_name:
     with st.sidebar:
-        with st.spinner("Searching Indian Kanoon..."):
-            results = search_indiankanoon(case_name, year, max_results)
+        with st.spinner("Searching case law..."):
+            results = search_indiankanoon(case_name, year, max_results, web_fallback)
             if results:
                 st.success(f"Found {len(results)} results")
-                for i, link in enumerate(results, 1):
-                    title = link.get_text()
-                    url = link['href']
-                    st.markdown(f"{i}. [{title}]({url})")
+                for i, result in enumerate(results, 1):
+                    st.markdown(f"{i}. [{result['title']}]({result['url']})")
+                    if result.get('snippet'):
+                        st.caption(result['snippet'])
 
 # --- HISTORY TRACKING FOR UNDO ---
 def save_history():
@@ -157,8 +204,8 @@ def save_history():
     # Save a shallow copy of relevant state
     state_snapshot = {k: v for k, v in st.session_state.items() if k in [
         'simulation', 'simulation_state', 'transcript', 'current_phase', 'evidence_presented',
-        'selected_witness', 'current_speaker', 'opening_done', 'examination_done', 'cross_done',
-        'evidence_done', 'objection_done', 'closing_done', 'judgment_done', 'selected_case_id', 'selected_role']}
+        'selected_witness', 'current_speaker', 'observer_step', 'observer_previous',
+        'selected_case_id', 'selected_role']}
     st.session_state['history'].append(state_snapshot)
 
 # Display the logo using Streamlit's native st.image for debugging
@@ -201,11 +248,42 @@ def play_tts(role, text):
             return False
         voice_settings = tts_voices.get(role, {"language": "en", "slow": False})
         print(f"Playing TTS for role {role} with text: {text[:100]}...")
-        return st.session_state.tts_engine.speak(text, role=role, language=voice_settings["language"])
+        engine = st.session_state.tts_engine
+        if engine.delivery == "browser":
+            return play_audio_bytes(engine.synthesize(text, role=role, language=voice_settings["language"]))
+        return engine.speak(text, role=role, language=voice_settings["language"])
     except Exception as e:
         print(f"Error in play_tts: {str(e)}")
         return False
 
+def stream_tts(role, chunks):
+    """Pass streamed text through unchanged, speaking each sentence as soon as it is complete"""
+    if not st.session_state.get('audio_on', True) or 'tts_engine' not in st.session_state:
+        yield from chunks
+        return
+    voice_settings = tts_voices.get(role, {"language": "en", "slow": False})
+    engine = st.session_state.tts_engine
+    speech = engine.open_speech_stream(role, language=voice_settings["language"])
+    if engine.delivery != "browser":
+        yield from speech.tee(chunks)
+        return
+    # Each sentence goes to the browser once it is synthesized and the one before it has played;
+    # replacing the clip in one slot keeps the page from playing two at once
+    slot = st.empty()
+    pending = []
+    playing_until = 0.0
+    for chunk in speech.tee(chunks):
+        yield chunk
+        pending.extend(engine.ready_audio(speech))
+        if pending and time.monotonic() >= playing_until:
+            clip = pending.pop(0)
+            slot.audio(clip, format=audio_mime_type(clip), autoplay=True)
+            playing_until = time.monotonic() + audio_duration(clip)
+    # The text is complete: play what is left as one clip after the current one
+    rest = join_audio([clip for clip in pending + [engine.collect_audio(speech)] if clip])
+    time.sleep(max(0.0, playing_until - time.monotonic()))
+    play_audio_bytes(rest, slot)
+
 # Inject custom CSS for dark theme and branding
 st.markdown(
     '''
@@ -297,10 +375,12 @@ st.markdown(
         </style>
     ''', unsafe_allow_html=True)
 
-# Initialize TTS and STT engines
-if 'tts_engine' not in st.session_state:
-    st.session_state.tts_engine = TTSEngine()
-if 'stt_engine' not in st.session_state:
+# Initialize TTS and STT engines (the trial server does synthesis for thin clients)
+if 'tts_engine' not in st.session_state and not TRIAL_SERVER_URL:
+    st.session_state.tts_engine = TTSEngine(delivery=AUDIO_DELIVERY)
+    # Pre-synthesize fixed and frequent lines in the background (once per process)
+    start_warmup(st.session_state.tts_engine)
+if 'stt_engine' not in st.session_state and not TRIAL_SERVER_URL:
     st.session_state.stt_engine = STTEngine()
 
 # Initialize animations
@@ -461,22 +541,24 @@ if not st.session_state.selected_role:
     st.stop()
 
 # --- Simulation Setup ---
+remote_observer = bool(TRIAL_SERVER_URL) and st.session_state.selected_role == "Observer"
+broadcast_observer = (st.session_state.broadcast_mode and not remote_observer
+                      and st.session_state.selected_role == "Observer" and case["case_id"] != "custom")
 if 'simulation' not in st.session_state:
-    case_data = {
-        "case_id": case["case_id"],
-        "title": case["title"],
-        "type": case["case_type"],
-        "plaintiff": case["parties"]["plaintiff"],
-        "defendant": case["parties"]["defendant"],
-        "description": case["description"],
-        "judge_data": {"name": "Justice Rao", "experience": "20 years", "specialization": "Civil Law"},
-        "plaintiff_lawyer_data": {"name": "Adv. Mehta", "experience": "15 years", "specialization": "Contracts"},
-        "defendant_lawyer_data": {"name": "Adv. Singh", "experience": "12 years", "specialization": "Contracts"},
-        "witnesses": case["witnesses"],
-        "evidence": case["evidence"]
-    }
-    
-    st.session_state.simulation = create_simulation(case_data)
+    if remote_observer:
+        if 'trial_client' not in st.session_state:
+            st.session_state.trial_client = TrialClient(TRIAL_SERVER_URL)
+        st.session_state.simulation = RemoteTrial(st.session_state.trial_client, case)
+    elif broadcast_observer:
+        from utils.tts import tts_engine
+        st.session_state.simulation = broadcasts.join(case, tts_engine)
+    else:
+        bundle = load_bundle(case) if st.session_state.selected_role == "Observer" else None
+        if bundle is not None:
+            # Precomputed canonical trial: instant playback without LLM or TTS calls
+            st.session_state.simulation = BundlePlayback(bundle, case)
+        else:
+            st.session_state.simulation = create_simulation(build_case_data(case))
     st.session_state.simulation_state = 'not_started'
     st.session_state.transcript = []
     st.session_state.current_phase = 'opening'
@@ -511,261 +593,95 @@ courtroom_ui.display_phase_banner(phase)
 
 # --- Live Transcript Sidebar ---
 transcript_placeholder = st.empty()
-def render_transcript(transcript):
-    transcript_html = '<div class="transcript-sidebar"><b>Live Transcript</b><br>'
-    for entry in transcript[-30:]:
-        transcript_html += f'<span style="color:#e10600;font-weight:bold;">{entry["speaker"]}:</span> <span style="color:#fff;">{entry["content"]}</span><br>'
-    transcript_html += '</div>'
-    return transcript_html
-transcript = sim.get_simulation_state().get('transcript', [])
-transcript_placeholder.markdown(render_transcript(transcript), unsafe_allow_html=True)
+if 'transcript_view' not in st.session_state:
+    st.session_state.transcript_view = TranscriptView(window=30)
+transcript_view = st.session_state.transcript_view
+transcript_view.sync(sim.get_simulation_state().get('transcript', []))
+transcript_placeholder.markdown(transcript_view.render_html(), unsafe_allow_html=True)
 
 # --- Courtroom Display ---
 speaking_role = st.session_state.get('current_speaker', None)
-courtroom_ui.display_courtroom(sim.get_simulation_state(), speaking_role)
+courtroom_ui.display_courtroom(sim.get_simulation_state(), speaking_role, transcript_view.last_statements)
 
 # --- Phase Logic ---
-def next_phase(current):
-    idx = phases.index(current)
-    return phases[idx+1] if idx+1 < len(phases) else 'completed'
+PHASE_MESSAGES = {
+    'opening': "AI agents are presenting opening statements...",
+    'examination_in_chief': "Examination-in-Chief: Plaintiff Lawyer questions witness...",
+    'cross_examination': "Cross-Examination: Defendant Lawyer questions witness...",
+    'evidence': "AI agents are presenting evidence...",
+    'objection': "AI agents are raising objections...",
+    'closing': "AI agents are presenting closing arguments...",
+    'judgment': "The judge is delivering the verdict..."
+}
 
 # --- Realistic Courtroom Flow ---
-if st.session_state.selected_role == "Observer":
-    # Opening Statements
-    if phase == 'opening':
-        st.info("AI agents are presenting opening statements...")
-        if not st.session_state.get('opening_done', False):
-            plaintiff_statement = sim.plaintiff_agent.generate_opening_statement(case)
-            sim.add_to_transcript("Plaintiff Lawyer", plaintiff_statement)
-            st.session_state.current_speaker = "plaintiff"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble plaintiff">{plaintiff_statement}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("plaintiff", plaintiff_statement)
-            time.sleep(2)
-            st.session_state.opening_done = 'plaintiff'
-            st.rerun()
-        elif st.session_state.opening_done == 'plaintiff':
-            defendant_statement = sim.defendant_agent.generate_opening_statement(case)
-            sim.add_to_transcript("Defendant Lawyer", defendant_statement)
-            st.session_state.current_speaker = "defendant"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble defendant">{defendant_statement}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("defendant", defendant_statement)
-            time.sleep(2)
-            st.session_state.opening_done = 'done'
-            st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.opening_done = False
-            st.rerun()
-    # Examination-in-Chief (Plaintiff's Witness)
-    elif phase == 'examination_in_chief':
-        st.info("Examination-in-Chief: Plaintiff Lawyer questions witness...")
-        if not st.session_state.get('examination_done', False):
-            witness = case["witnesses"][0] if case["witnesses"] else {"name": "Witness"}
-            question = sim.plaintiff_agent.generate_question(witness)
-            sim.add_to_transcript("Plaintiff Lawyer", question)
-            st.session_state.current_speaker = "plaintiff"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble plaintiff">{question}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("plaintiff", question)
-            time.sleep(2)
-            st.session_state.examination_done = 'plaintiff_q'
-            st.session_state.examination_question = question
-            st.rerun()
-        elif st.session_state.examination_done == 'plaintiff_q':
-            witness = case["witnesses"][0] if case["witnesses"] else {"name": "Witness"}
-            question = st.session_state.get('examination_question', '')
-            answer = sim.witness_agent.give_testimony(question, case)
-            sim.add_to_transcript("Witness", answer)
-            st.session_state.current_speaker = "witness"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble witness">{answer}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("witness", answer)
-            time.sleep(2)
-            st.session_state.examination_done = 'done'
-            st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.examination_done = False
-            st.session_state.examination_question = ''
-            st.rerun()
-    # Cross-Examination (Defendant's turn)
-    elif phase == 'cross_examination':
-        st.info("Cross-Examination: Defendant Lawyer questions witness...")
-        if not st.session_state.get('cross_done', False):
-            witness = case["witnesses"][0] if case["witnesses"] else {"name": "Witness"}
-            cross_question = sim.defendant_agent.generate_question(witness)
-            sim.add_to_transcript("Defendant Lawyer", cross_question)
-            st.session_state.current_speaker = "defendant"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble defendant">{cross_question}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("defendant", cross_question)
-            time.sleep(2)
-            st.session_state.cross_done = 'defendant_q'
-            st.session_state.cross_question = cross_question
-            st.rerun()
-        elif st.session_state.cross_done == 'defendant_q':
-            witness = case["witnesses"][0] if case["witnesses"] else {"name": "Witness"}
-            cross_question = st.session_state.get('cross_question', '')
-            answer = sim.witness_agent.give_testimony(cross_question, case)
-            sim.add_to_transcript("Witness", answer)
-            st.session_state.current_speaker = "witness"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble witness">{answer}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("witness", answer)
-            time.sleep(2)
-            st.session_state.cross_done = 'done'
-            st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.cross_done = False
-            st.session_state.cross_question = ''
-            st.rerun()
-    # Evidence Presentation
-    elif phase == 'evidence':
-        st.info("AI agents are presenting evidence...")
-        evidence_list = case["evidence"]
-        
-        if not st.session_state.get('evidence_done', False):
-            # Initialize evidence tracking if not already done
-            if 'evidence_index' not in st.session_state:
-                st.session_state.evidence_index = 0
-                st.session_state.evidence_side = 'plaintiff'
-            
-            # Plaintiff's evidence presentation
-            if st.session_state.evidence_side == 'plaintiff':
-                if st.session_state.evidence_index < len(evidence_list):
-                    evidence = evidence_list[st.session_state.evidence_index]
-                    evidence_text = f"Presenting evidence: {evidence}"
-                    sim.add_to_transcript("Plaintiff Lawyer", evidence_text)
-                    st.session_state.current_speaker = "plaintiff"
-                    # Show transcript first
-                    st.markdown(f'<div class="chat-bubble plaintiff">{evidence_text}</div>', unsafe_allow_html=True)
-                    time.sleep(1)  # Give time to read
-                    play_tts("plaintiff", str(evidence))
-                    time.sleep(2)
-                    st.session_state.evidence_index += 1
-                    st.rerun()
-                else:
-                    st.session_state.evidence_index = 0
-                    st.session_state.evidence_side = 'defendant'
-                    st.rerun()
-            
-            # Defendant's evidence presentation
-            elif st.session_state.evidence_side == 'defendant':
-                if st.session_state.evidence_index < len(evidence_list):
-                    evidence = evidence_list[st.session_state.evidence_index]
-                    evidence_text = f"Presenting evidence: {evidence}"
-                    sim.add_to_transcript("Defendant Lawyer", evidence_text)
-                    st.session_state.current_speaker = "defendant"
-                    # Show transcript first
-                    st.markdown(f'<div class="chat-bubble defendant">{evidence_text}</div>', unsafe_allow_html=True)
-                    time.sleep(1)  # Give time to read
-                    play_tts("defendant", str(evidence))
-                    time.sleep(2)
-                    st.session_state.evidence_index += 1
-                    st.rerun()
-                else:
-                    st.session_state.evidence_done = True
-                    st.session_state.evidence_index = 0
-                    st.session_state.evidence_side = 'plaintiff'
-                    st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.evidence_done = False
-            st.rerun()
-    # Objections
-    elif phase == 'objection':
-        st.info("AI agents are raising objections...")
-        if not st.session_state.get('objection_done', False):
-            objection = "Objection, leading the witness!"
-            sim.add_to_transcript("Defendant Lawyer", objection)
-            st.session_state.current_speaker = "defendant"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble defendant">{objection}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("defendant", objection)
-            time.sleep(2)
-            st.session_state.objection_done = 'raised'
-            st.session_state.objection_text = objection
-            st.rerun()
-        elif st.session_state.objection_done == 'raised':
-            objection = st.session_state.get('objection_text', '')
-            ruling = sim.judge_agent.rule_on_objection(objection)
-            sim.add_to_transcript("Judge", ruling)
-            st.session_state.current_speaker = "judge"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble judge">{ruling}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("judge", ruling)
-            time.sleep(2)
-            st.session_state.objection_done = 'done'
-            st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.objection_done = False
-            st.session_state.objection_text = ''
-            st.rerun()
-    # Closing Arguments
-    elif phase == 'closing':
-        st.info("AI agents are presenting closing arguments...")
-        if not st.session_state.get('closing_done', False):
-            closing1 = sim.plaintiff_agent.generate_closing_argument(case)
-            sim.add_to_transcript("Plaintiff Lawyer", closing1)
-            st.session_state.current_speaker = "plaintiff"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble plaintiff">{closing1}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("plaintiff", closing1)
-            time.sleep(2)
-            st.session_state.closing_done = 'plaintiff'
-            st.rerun()
-        elif st.session_state.closing_done == 'plaintiff':
-            closing2 = sim.defendant_agent.generate_closing_argument(case)
-            sim.add_to_transcript("Defendant Lawyer", closing2)
-            st.session_state.current_speaker = "defendant"
-            # Show transcript first
-            st.markdown(f'<div class="chat-bubble defendant">{closing2}</div>', unsafe_allow_html=True)
-            time.sleep(1)  # Give time to read
-            play_tts("defendant", closing2)
-            time.sleep(2)
-            st.session_state.closing_done = 'done'
-            st.rerun()
+if isinstance(sim, TrialMirror):
+    # The trial is generated elsewhere (trial server, shared broadcast or a
+    # precomputed bundle); we only replay its events, one line per rerun.
+    catching_up = sim.cursor == 0
+    arrived = [event for event in sim.poll() if event['type'] == 'utterance']
+    if catching_up:
+        # Late joiners get the whole buffer at once; only the latest line is spoken
+        arrived = arrived[-1:]
+    pending = st.session_state.setdefault('mirror_pending', [])
+    pending.extend(arrived)
+    current = pending.pop(0) if pending else None
+    shown = current or sim.last_utterance
+    if shown is not None:
+        st.session_state.current_speaker = shown['role']
+        st.markdown(f'<div class="chat-bubble {shown["role"]}">{shown["content"]}</div>', unsafe_allow_html=True)
+    # Wait until the clip has played before the rerun replaces it
+    wait = sim.pace()
+    if current is not None and st.session_state.get('audio_on', True):
+        clip = sim.get_audio(current)
+        if clip:
+            st.audio(clip, format=audio_mime_type(clip), autoplay=True)
+            wait = audio_duration(clip) + 0.5
+    st.session_state.current_phase = current['phase'] if current is not None else sim.current_phase
+    if sim.status == 'failed':
+        st.error("The trial could not be completed.")
+        sim.close()
+    elif sim.finished and sim.current_phase == 'completed' and current is None:
+        st.success("Case closed. Justice served!")
+        st.session_state.current_speaker = None
+        sim.close()
+    else:
+        st.info(f"Trial in progress: {st.session_state.current_phase.replace('_', ' ').title()}...")
+        time.sleep(wait)
+        st.rerun()
+elif st.session_state.selected_role == "Observer":
+    # The same script the trial server, broadcasts and bundles run, one line per rerun
+    script = observer_script(case)
+    step = st.session_state.get('observer_step', 0)
+    if step < len(script):
+        line = script[step]
+        st.info(PHASE_MESSAGES[line.phase])
+        sim.set_current_phase(line.phase)
+        st.session_state.current_speaker = line.role
+        if line.stream is not None:
+            # Show and speak the line sentence by sentence while it is generated
+            bubble = st.empty()
+            content = ""
+            for chunk in stream_tts(line.role, line.stream(sim)):
+                content += chunk
+                bubble.markdown(f'<div class="chat-bubble {line.role}">{content}</div>', unsafe_allow_html=True)
+            sim.add_to_transcript(line.speaker, content)
         else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.closing_done = False
-            st.rerun()
-    # Judgment
-    elif phase == 'judgment':
-        st.info("The judge is delivering the verdict...")
-        if not st.session_state.get('judgment_done', False):
-            judgment = sim.judge_agent.give_judgment(str(case))
-            sim.add_to_transcript("Judge", judgment)
-            st.session_state.current_speaker = "judge"
+            content = line.produce(sim, st.session_state.get('observer_previous'))
+            sim.add_to_transcript(line.speaker, content)
             # Show transcript first
-            st.markdown(f'<div class="chat-bubble judge">{judgment}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="chat-bubble {line.role}">{content}</div>', unsafe_allow_html=True)
             time.sleep(1)  # Give time to read
-            play_tts("judge", judgment)
-            time.sleep(2)
-            st.session_state.judgment_done = True
-            st.rerun()
-        else:
-            st.session_state.current_phase = next_phase(phase)
-            st.session_state.judgment_done = False
-            st.rerun()
-    elif phase == 'completed':
+            play_tts(line.role, line.speak_text(content))
+        time.sleep(2)
+        st.session_state.observer_previous = content
+        st.session_state.observer_step = step + 1
+        st.session_state.current_phase = script[step + 1].phase if step + 1 < len(script) else 'completed'
+        st.rerun()
+    else:
         st.success("Case closed. Justice served!")
         st.session_state.current_speaker = None
-    else:
-        st.warning("For the extreme AI simulation, only Observer mode is currently supported. Please restart and select Observer.")
-        
+
 # Footer
 st.markdown("""
 <div style="text-align:center; margin-top:50px; padding:20px; border-top:1px solid #333;">
@@ -0,0 +1,152 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from llm.worker_pool import FairWorkerPool, worker_pool
+from .simulation_manager import create_simulation
+from .trial_events import TrialEventLog, TrialMirror
+from .trial_runner import build_case_data, run_observer_trial
+
+class TrialBroadcast:
+    """A single generated trial whose events are shared by every viewer.
+
+    Transcript lines and their synthesized audio are kept in one in-process
+    event buffer, so LLM and TTS cost is paid once no matter how many
+    viewers watch, and late joiners simply read the buffer from the start.
+    """
+
+    def __init__(self, case: Dict[str, Any], pool: FairWorkerPool, tts_engine=None):
+        self.case = case
+        self.broadcast_id = f"broadcast-{case['case_id']}"
+        self.pool = pool
+        self.tts_engine = tts_engine
+        self.events = TrialEventLog()
+        self.status = 'pending'
+        self.viewers = 0
+        self.finished_at = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.broadcast_id, daemon=True)
+
+    def start(self):
+        self.status = 'running'
+        self._thread.start()
+
+    def stop(self):
+        """Stop generating: queued requests are cancelled and no new ones are made"""
+        self._stopped.set()
+        self.pool.cancel_session(self.broadcast_id)
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def _synthesize(self, text: str, role: str) -> Optional[bytes]:
+        return self.tts_engine.synthesize(text, role=role)
+
+    def _run(self):
+        def call(fn, *args):
+            if self._stopped.is_set():
+                raise RuntimeError("Broadcast stopped")
+            return self.pool.run(self.broadcast_id, fn, *args)
+
+        def emit(event: Dict[str, Any]):
+            speak_text = event.pop('speak_text', None)
+            if self.tts_engine is not None and speak_text:
+                event['audio'] = call(self._synthesize, speak_text, event['role'])
+            self.events.append(event)
+
+        sim = None
+        try:
+            sim = call(create_simulation, build_case_data(self.case))
+            run_observer_trial(sim, self.case, emit, call=call)
+            self.status = 'completed'
+        except Exception as e:
+            if self._stopped.is_set():
+                self.status = 'stopped'
+            else:
+                print(f"Error running broadcast {self.broadcast_id}: {str(e)}")
+                self.status = 'failed'
+                self.events.append({'type': 'error', 'message': str(e)})
+        finally:
+            self.finished_at = time.time()
+            self.events.close()
+            if sim is not None:
+                sim.close()
+
+class BroadcastViewer(TrialMirror):
+    """One viewer's cursor into a shared broadcast"""
+
+    def __init__(self, broadcast: TrialBroadcast, registry: "BroadcastRegistry"):
+        super().__init__(broadcast.case)
+        self.broadcast = broadcast
+        self.registry = registry
+        self._closed = False
+
+    def poll(self) -> List[Dict[str, Any]]:
+        events = self.broadcast.events.since(self.cursor)
+        self.status = self.broadcast.status
+        self.apply(events)
+        return events
+
+    def get_audio(self, event: Dict[str, Any]) -> Optional[bytes]:
+        return event.get('audio')
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.registry.leave(self.broadcast)
+
+class BroadcastRegistry:
+    """Process-wide registry of broadcasts, one per case.
+
+    A running broadcast is stopped and dropped when its last viewer leaves.
+    Finished broadcasts are kept for late joiners for retention_seconds,
+    whether or not anyone is still watching.
+    """
+
+    def __init__(self, pool: FairWorkerPool = worker_pool, retention_seconds: int = 600):
+        self.pool = pool
+        self.retention_seconds = retention_seconds
+        self.broadcasts: Dict[str, TrialBroadcast] = {}
+        self._lock = threading.Lock()
+
+    def join(self, case: Dict[str, Any], tts_engine=None) -> BroadcastViewer:
+        """Join the broadcast for a case, starting it if nobody is watching it yet"""
+        self.reap_finished()
+        with self._lock:
+            broadcast = self.broadcasts.get(case['case_id'])
+            if broadcast is None or broadcast.status in ('failed', 'stopped'):
+                broadcast = TrialBroadcast(case, self.pool, tts_engine)
+                self.broadcasts[case['case_id']] = broadcast
+                broadcast.start()
+            broadcast.viewers += 1
+        return BroadcastViewer(broadcast, self)
+
+    def leave(self, broadcast: TrialBroadcast):
+        """A viewer detached; a running broadcast goes once nobody is watching"""
+        with self._lock:
+            broadcast.viewers = max(0, broadcast.viewers - 1)
+            if broadcast.viewers > 0 or broadcast.finished:
+                # Finished broadcasts are left for reap_finished
+                return
+            if self.broadcasts.get(broadcast.case['case_id']) is broadcast:
+                del self.broadcasts[broadcast.case['case_id']]
+        broadcast.stop()
+
+    def reap_finished(self):
+        """Drop broadcasts that finished more than retention_seconds ago"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for case_id in [case_id for case_id, b in self.broadcasts.items()
+                            if b.finished and b.finished_at < cutoff]:
+                del self.broadcasts[case_id]
+
+    def stop(self, case_id: str):
+        """Forget a broadcast so the next viewer starts a fresh trial"""
+        with self._lock:
+            broadcast = self.broadcasts.pop(case_id, None)
+        if broadcast is not None:
+            broadcast.stop()
+
+# Global registry shared by every Streamlit session in the process
+broadcasts = BroadcastRegistry()
@@ -3,11 +3,12 @@ from datetime import datetime
 import json
 import os
 from utils import knowledge_base, simulation, tts, stt
+from utils.transcript_store import open_transcript_store
 
 class CourtroomManager:
     def __init__(self, case_data: Dict[str, Any]):
         self.case_data = case_data
-        self.knowledge_base = knowledge_base.KnowledgeBase()
+        self.knowledge_base = knowledge_base.get_knowledge_base()
         self.tts_engine = tts.TTSEngine()
         self.stt_engine = stt.STTEngine()
         
@@ -15,7 +16,7 @@ class CourtroomManager:
         self.state = {
             'status': 'not_started',
             'current_phase': None,
-            'transcript': [],
+            'transcript': open_transcript_store(),
             'evidence_presented': [],
             'objections': [],
             'active_speaker': None,
@@ -33,14 +34,15 @@ class CourtroomManager:
         """End the court hearing"""
         self.state['status'] = 'completed'
         self._speak_as_judge("Court is adjourned")
+        self.close()
+    
+    def close(self):
+        """Release the transcript file (it can still be read)"""
+        self.state['transcript'].close()
     
     def _add_to_transcript(self, speaker: str, content: str):
         """Add an entry to the transcript"""
-        self.state['transcript'].append({
-            'speaker': speaker,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        })
+        self.state['transcript'].append(speaker, content, datetime.now().isoformat())
     
     def _speak_as_judge(self, text: str):
         """Have the judge speak and add to transcript"""
@@ -95,12 +97,18 @@ class CourtroomManager:
     
     def save_state(self, filepath: str):
         """Save the state to a file"""
+        state = {**self.state, 'transcript': self.state['transcript'].to_list()}
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         with open(filepath, 'w') as f:
-            json.dump(self.state, f, indent=4)
+            json.dump(state, f, indent=4)
     
     def load_state(self, filepath: str):
         """Load the state from a file"""
         with open(filepath, 'r') as f:
-            self.state = json.load(f)
+            state = json.load(f)
+        self.close()
+        transcript = open_transcript_store()
+        for entry in state.get('transcript', []):
+            transcript.append(**entry)
+        self.state = {**state, 'transcript': transcript}
         self.case_data = self.state['case_info'] 
\ No newline at end of file
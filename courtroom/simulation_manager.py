@@ -3,6 +3,7 @@ from datetime import datetime
 import json
 import os
 from utils.knowledge_base import KnowledgeBase
+from utils.transcript_store import open_transcript_store
 from agents.judge_agent import JudgeAgent
 from agents.plaintiff_agent import PlaintiffAgent
 from agents.defendant_agent import DefendantAgent
@@ -12,7 +13,7 @@ import streamlit as st
 class CourtroomSimulationManager:
     def __init__(self, case_data: Dict[str, Any]):
         self.case_data = case_data
-        self.transcript = []
+        self.transcript = open_transcript_store()
         self.current_phase = 'opening'
         self.evidence_presented = []
         self.selected_witness = None
@@ -31,14 +32,14 @@ class CourtroomSimulationManager:
         
     def add_to_transcript(self, speaker: str, content: str):
         """Add an entry to the transcript"""
-        self.transcript.append({
-            'speaker': speaker,
-            'content': content,
-            'timestamp': datetime.now().strftime("%H:%M:%S")
-        })
+        self.transcript.append(speaker, content, datetime.now().strftime("%H:%M:%S"))
+        
+    def close(self):
+        """Release the transcript file (it can still be read and downloaded)"""
+        self.transcript.close()
         
     def get_transcript(self) -> List[Dict[str, str]]:
-        """Get the current transcript"""
+        """Get the current transcript (an on-disk store that supports slicing)"""
         return self.transcript
         
     def get_current_phase(self) -> str:
@@ -155,14 +156,14 @@ class CourtroomSimulationManager:
             plaintiff_agent = st.session_state.agents['plaintiff']
             defendant_agent = st.session_state.agents['defendant']
             
-            question = plaintiff_agent.generate_question(self.selected_witness)
+            question = plaintiff_agent.generate_question(self.selected_witness, self.case_data)
             answer = self.selected_witness['testimony']
             
             self.add_to_transcript("Plaintiff Lawyer", question)
             self.add_to_transcript("Witness", answer)
             
             # Cross-examination
-            question = defendant_agent.generate_question(self.selected_witness)
+            question = defendant_agent.generate_question(self.selected_witness, self.case_data)
             answer = self.selected_witness['testimony']
             
             self.add_to_transcript("Defendant Lawyer", question)
@@ -194,7 +195,7 @@ class CourtroomSimulationManager:
         elif self.current_phase == 'judgment':
             # Automatically generate judgment
             judge_agent = st.session_state.agents['judge']
-            judgment = judge_agent.give_judgment(str(self.case_data))
+            judgment = judge_agent.give_judgment(self.case_data)
             self.add_to_transcript("Judge", judgment)
             self.progress_phase()
     
@@ -0,0 +1,190 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import zipfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .simulation_manager import create_simulation
+from .trial_events import TrialEventLog, TrialMirror
+from .trial_runner import build_case_data, load_catalog_cases, run_observer_trial
+
+BUNDLE_DIR = os.path.join("data", "trial_bundles")
+
+# Sources whose changes alter what the agents would say: the prompts, and
+# the retrieval code and knowledge base data that ground them
+PROMPT_SOURCES = [
+    os.path.join("agents", "*.py"),
+    os.path.join("courtroom", "trial_runner.py"),
+    os.path.join("utils", "retrieval.py"),
+    os.path.join("utils", "search_index.py"),
+    os.path.join("utils", "statute_store.py"),
+    os.path.join("data", "precedents.json"),
+    os.path.join("data", "legal_principles.json"),
+    os.path.join("data", "kb_journal.jsonl"),
+    os.path.join("data", "legal_codes", "*.json"),
+]
+
+# Digests of unchanged files (path -> ((mtime, size), digest)), so checking a
+# bundle does not re-read large data files every time
+_file_digests: Dict[str, Any] = {}
+
+# Rough speaking rate of the TTS voices, used to pace playback
+WORDS_PER_SECOND = 2.5
+
+def _file_digest(path: str) -> str:
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_digests.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _file_digests[path] = (version, digest.hexdigest())
+    return digest.hexdigest()
+
+def prompt_fingerprint() -> str:
+    """Digest of the agent prompt sources and the legal data they retrieve from"""
+    digest = hashlib.sha256()
+    for pattern in PROMPT_SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            digest.update(path.encode("utf-8"))
+            digest.update(_file_digest(path).encode("utf-8"))
+    return digest.hexdigest()
+
+def case_fingerprint(case: Dict[str, Any]) -> str:
+    """Digest of a case definition plus the agent prompts it would be run with"""
+    digest = hashlib.sha256(json.dumps(case, sort_keys=True).encode("utf-8"))
+    digest.update(prompt_fingerprint().encode("utf-8"))
+    return digest.hexdigest()
+
+def bundle_path(case_id: str) -> str:
+    return os.path.join(BUNDLE_DIR, f"{case_id}.trial")
+
+class TrialBundle:
+    """A precomputed trial: the full event list plus the audio for each line.
+
+    Stored as a zip archive with a JSON manifest and one MP3 per utterance.
+    """
+
+    def __init__(self, path: str, manifest: Dict[str, Any]):
+        self.path = path
+        self.manifest = manifest
+        self.events: List[Dict[str, Any]] = manifest['events']
+
+    def read_audio(self, name: str) -> Optional[bytes]:
+        try:
+            with zipfile.ZipFile(self.path) as archive:
+                return archive.read(name)
+        except (KeyError, OSError, zipfile.BadZipFile) as e:
+            print(f"Error reading bundle audio {name}: {str(e)}")
+            return None
+
+def build_bundle(case: Dict[str, Any], tts_engine=None) -> str:
+    """Run a case once and save the transcript and audio as a trial bundle"""
+    os.makedirs(BUNDLE_DIR, exist_ok=True)
+    log = TrialEventLog()
+    audio_files = {}
+
+    def emit(event: Dict[str, Any]):
+        speak_text = event.pop('speak_text', None)
+        if event['type'] == 'utterance':
+            event['duration'] = round(len(event['content'].split()) / WORDS_PER_SECOND, 1)
+            if tts_engine is not None and speak_text:
+                filepath = tts_engine.generate_tts(speak_text, role=event['role'])
+                if filepath:
+                    name = f"audio/{len(audio_files):04d}{os.path.splitext(filepath)[1]}"
+                    audio_files[name] = filepath
+                    event['audio'] = name
+        log.append(event)
+
+    sim = create_simulation(build_case_data(case))
+    try:
+        run_observer_trial(sim, case, emit)
+    finally:
+        sim.close()
+
+    manifest = {
+        'case_id': case['case_id'],
+        'fingerprint': case_fingerprint(case),
+        'created_at': datetime.now().isoformat(),
+        'events': log.since(0)
+    }
+    path = bundle_path(case['case_id'])
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w") as archive:
+        archive.writestr("manifest.json", json.dumps(manifest), compress_type=zipfile.ZIP_DEFLATED)
+        for name, filepath in audio_files.items():
+            # MP3 is already compressed
+            archive.write(filepath, name, compress_type=zipfile.ZIP_STORED)
+    os.replace(tmp_path, path)
+    return path
+
+def load_bundle(case: Dict[str, Any]) -> Optional[TrialBundle]:
+    """Load the bundle for a case, or None if it is missing or stale"""
+    path = bundle_path(case.get('case_id', ''))
+    if not os.path.exists(path):
+        return None
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+    except (KeyError, ValueError, OSError, zipfile.BadZipFile) as e:
+        print(f"Error loading trial bundle {path}: {str(e)}")
+        return None
+    if manifest.get('fingerprint') != case_fingerprint(case):
+        return None
+    return TrialBundle(path, manifest)
+
+class BundlePlayback(TrialMirror):
+    """Replays a trial bundle one utterance per poll, with no LLM or TTS calls"""
+
+    def __init__(self, bundle: TrialBundle, case: Dict[str, Any]):
+        super().__init__(case)
+        self.bundle = bundle
+        self.status = 'running'
+
+    def poll(self) -> List[Dict[str, Any]]:
+        events = []
+        for event in self.bundle.events[self.cursor:]:
+            events.append(event)
+            if event['type'] == 'utterance':
+                break
+        self.apply(events)
+        if self.cursor >= len(self.bundle.events):
+            self.status = 'completed'
+        return events
+
+    def get_audio(self, event: Dict[str, Any]) -> Optional[bytes]:
+        if not event.get('audio'):
+            return None
+        return self.bundle.read_audio(event['audio'])
+
+    def pace(self) -> float:
+        if self.last_utterance is None:
+            return 0.0
+        return self.last_utterance.get('duration', 1.0) + 1.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute trial bundles for the case catalog")
+    parser.add_argument("--case", action="append", help="Only build these case ids")
+    parser.add_argument("--force", action="store_true", help="Rebuild bundles that are still valid")
+    parser.add_argument("--no-audio", action="store_true", help="Do not synthesize speech")
+    args = parser.parse_args()
+
+    tts_engine = None
+    if not args.no_audio:
+        from utils.tts import TTSEngine
+        tts_engine = TTSEngine()
+
+    for case in load_catalog_cases():
+        if args.case and case['case_id'] not in args.case:
+            continue
+        if not args.force and load_bundle(case) is not None:
+            print(f"{case['case_id']}: up to date")
+            continue
+        print(f"{case['case_id']}: building...")
+        print(f"{case['case_id']}: saved {build_bundle(case, tts_engine)}")
@@ -0,0 +1,117 @@
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+class TrialEventLog:
+    """Ordered, append-only log of the events a running trial produces.
+
+    Readers keep their own cursor (the number of events already seen) and
+    either poll with `since` or block with `wait_for` until something new
+    arrives, so any number of clients can follow the same trial.
+    """
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Append an event and wake up waiting readers. Returns its sequence number."""
+        with self._cond:
+            seq = len(self._events)
+            self._events.append({
+                **event,
+                'seq': seq,
+                'emitted_at': datetime.now().isoformat()
+            })
+            self._cond.notify_all()
+        return seq
+
+    def close(self):
+        """Mark the trial as finished; waiting readers return immediately"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def since(self, cursor: int = 0) -> List[Dict[str, Any]]:
+        """Get every event from `cursor` onwards without blocking"""
+        with self._cond:
+            return self._events[max(cursor, 0):]
+
+    def wait_for(self, cursor: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Block until there are events past `cursor`, the log closes or the timeout expires"""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._events) > cursor or self.closed, timeout=timeout)
+            return self._events[max(cursor, 0):]
+
+    def get(self, seq: int) -> Optional[Dict[str, Any]]:
+        """Get a single event by sequence number"""
+        with self._cond:
+            if 0 <= seq < len(self._events):
+                return self._events[seq]
+        return None
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._events)
+
+class TrialMirror(ABC):
+    """Client-side copy of a trial that is generated somewhere else.
+
+    Subclasses fetch new events in `poll`; the mirror keeps a transcript
+    shaped like the local simulation's so the UI can render either one.
+    """
+
+    def __init__(self, case: Dict[str, Any]):
+        self.case_data = case
+        self.transcript: List[Dict[str, str]] = []
+        self.cursor = 0
+        self.current_phase = 'opening'
+        self.status = 'pending'
+        self.last_utterance: Optional[Dict[str, Any]] = None
+
+    @abstractmethod
+    def poll(self) -> List[Dict[str, Any]]:
+        """Fetch events past the cursor and apply them"""
+        pass
+
+    def get_audio(self, event: Dict[str, Any]) -> Optional[bytes]:
+        """Get the synthesized audio for an utterance event, if any"""
+        return None
+
+    def pace(self) -> float:
+        """Seconds the UI should wait before polling again"""
+        return 1.0
+
+    def close(self):
+        """Detach from the trial (the viewer is done with it)"""
+        pass
+
+    def apply(self, events: List[Dict[str, Any]]):
+        """Apply a batch of events to the mirrored state"""
+        self.cursor += len(events)
+        for event in events:
+            if event['type'] == 'phase':
+                self.current_phase = event['phase']
+            elif event['type'] == 'utterance':
+                self.last_utterance = event
+                self.transcript.append({
+                    'speaker': event['speaker'],
+                    'content': event['content'],
+                    'timestamp': event['emitted_at'][11:19]
+                })
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed', 'stopped')
+
+    def get_simulation_state(self) -> Dict[str, Any]:
+        return {
+            'transcript': self.transcript,
+            'phase': self.current_phase,
+            'evidence_presented': [],
+            'selected_witness': None,
+            'current_speaker': None,
+            'auto_progress': True
+        }
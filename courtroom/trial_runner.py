@@ -0,0 +1,144 @@
+import json
+import os
+from typing import Dict, Any, Callable, List, Optional
+
+# Phases of the scripted Observer trial, in order
+OBSERVER_PHASES = [
+    'opening',
+    'examination_in_chief',
+    'cross_examination',
+    'evidence',
+    'objection',
+    'closing',
+    'judgment',
+    'completed'
+]
+
+def load_catalog_cases(cases_path: str = os.path.join("data", "cases.json")) -> List[Dict[str, Any]]:
+    """Load the fixed case catalog"""
+    if not os.path.exists(cases_path):
+        return []
+    with open(cases_path, "r") as f:
+        return json.load(f).get("cases", [])
+
+def build_case_data(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the simulation case data from a catalog or custom case"""
+    return {
+        "case_id": case["case_id"],
+        "title": case["title"],
+        "type": case["case_type"],
+        "plaintiff": case["parties"]["plaintiff"],
+        "defendant": case["parties"]["defendant"],
+        "description": case["description"],
+        "judge_data": {"name": "Justice Rao", "experience": "20 years", "specialization": "Civil Law"},
+        "plaintiff_lawyer_data": {"name": "Adv. Mehta", "experience": "15 years", "specialization": "Contracts"},
+        "defendant_lawyer_data": {"name": "Adv. Singh", "experience": "12 years", "specialization": "Contracts"},
+        "witnesses": case["witnesses"],
+        "evidence": case["evidence"]
+    }
+
+class ScriptLine:
+    """One line of the scripted Observer trial: who says it and how it is produced.
+
+    `generate(sim, previous, call)` returns the text, where `previous` is the
+    line spoken just before it (a witness answers the question put to them).
+    `stream(sim)`, if set, yields the same kind of text in chunks as it is
+    generated, for callers that show or speak it while it is being written.
+    """
+
+    def __init__(self, phase: str, speaker: str, role: str, generate: Callable,
+                 speak: Optional[Callable[[str], str]] = None, stream: Optional[Callable] = None):
+        self.phase = phase
+        self.speaker = speaker
+        self.role = role
+        self.generate = generate
+        self.speak = speak
+        self.stream = stream
+
+    def produce(self, sim, previous: Optional[str] = None, call: Optional[Callable] = None) -> str:
+        if call is None:
+            call = lambda fn, *args: fn(*args)
+        return self.generate(sim, previous, call)
+
+    def speak_text(self, content: str) -> str:
+        """The text to synthesize for this line (evidence is spoken without its prefix)"""
+        return self.speak(content) if self.speak is not None else content
+
+def observer_script(case: Dict[str, Any]) -> List[ScriptLine]:
+    """Every line of the Observer-mode trial for a case, in order"""
+    witness = case["witnesses"][0] if case["witnesses"] else {"name": "Witness"}
+    objection = "Objection, leading the witness!"
+    script = [
+        # Opening Statements
+        ScriptLine('opening', "Plaintiff Lawyer", "plaintiff",
+                   lambda sim, previous, call: call(sim.plaintiff_agent.generate_opening_statement, case)),
+        ScriptLine('opening', "Defendant Lawyer", "defendant",
+                   lambda sim, previous, call: call(sim.defendant_agent.generate_opening_statement, case)),
+        # Examination-in-Chief (Plaintiff's Witness)
+        ScriptLine('examination_in_chief', "Plaintiff Lawyer", "plaintiff",
+                   lambda sim, previous, call: call(sim.plaintiff_agent.generate_question, witness, case)),
+        ScriptLine('examination_in_chief', "Witness", "witness",
+                   lambda sim, previous, call: call(sim.witness_agent.give_testimony, previous, case)),
+        # Cross-Examination (Defendant's turn)
+        ScriptLine('cross_examination', "Defendant Lawyer", "defendant",
+                   lambda sim, previous, call: call(sim.defendant_agent.generate_question, witness, case)),
+        ScriptLine('cross_examination', "Witness", "witness",
+                   lambda sim, previous, call: call(sim.witness_agent.give_testimony, previous, case))
+    ]
+
+    # Evidence Presentation
+    for speaker, role in [("Plaintiff Lawyer", "plaintiff"), ("Defendant Lawyer", "defendant")]:
+        for evidence in case["evidence"]:
+            script.append(ScriptLine('evidence', speaker, role,
+                                     lambda sim, previous, call, evidence=evidence: f"Presenting evidence: {evidence}",
+                                     speak=lambda content, evidence=evidence: str(evidence)))
+
+    script += [
+        # Objections
+        ScriptLine('objection', "Defendant Lawyer", "defendant", lambda sim, previous, call: objection),
+        ScriptLine('objection', "Judge", "judge",
+                   lambda sim, previous, call: call(sim.judge_agent.rule_on_objection, previous, case)),
+        # Closing Arguments
+        ScriptLine('closing', "Plaintiff Lawyer", "plaintiff",
+                   lambda sim, previous, call: call(sim.plaintiff_agent.generate_closing_argument, case)),
+        ScriptLine('closing', "Defendant Lawyer", "defendant",
+                   lambda sim, previous, call: call(sim.defendant_agent.generate_closing_argument, case)),
+        # Judgment
+        ScriptLine('judgment', "Judge", "judge",
+                   lambda sim, previous, call: call(sim.judge_agent.give_judgment, case),
+                   stream=lambda sim: sim.judge_agent.give_judgment_stream(case))
+    ]
+    return script
+
+def run_observer_trial(sim, case: Dict[str, Any], emit: Callable[[Dict[str, Any]], None],
+                       call: Optional[Callable] = None):
+    """Run the whole Observer-mode trial without a UI.
+
+    Every utterance is added to the simulation transcript and then passed to
+    `emit` as an event dict (phase, speaker, role, content, speak_text).
+    `call(fn, *args)` is used for every LLM request so callers can route the
+    requests through a shared worker pool; by default they run inline.
+    """
+    def enter(phase: str):
+        sim.set_current_phase(phase)
+        emit({'type': 'phase', 'phase': phase})
+
+    phase = None
+    previous = None
+    for line in observer_script(case):
+        if line.phase != phase:
+            phase = line.phase
+            enter(phase)
+        content = line.produce(sim, previous, call)
+        sim.add_to_transcript(line.speaker, content)
+        emit({
+            'type': 'utterance',
+            'phase': line.phase,
+            'speaker': line.speaker,
+            'role': line.role,
+            'content': content,
+            'speak_text': line.speak_text(content)
+        })
+        previous = content
+
+    enter('completed')
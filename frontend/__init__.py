@@ -1,10 +1,12 @@
 # from .app import CourtroomFrontend
 from .components import CourtroomUI
+from .transcript_view import TranscriptView
 # from .animations import CourtroomAnimation
 # from .proceeding_animations import CourtroomProceedingAnimation
 
 __all__ = [
     'CourtroomUI',
+    'TranscriptView',
     'AnimationManager',
     'CourtProceedingAnimations'
 ] 
\ No newline at end of file
@@ -1,6 +1,23 @@
 import streamlit as st
 from typing import Dict, Any, List
 import time
+from utils.audio_playback import audio_duration, audio_mime_type
+
+def play_audio_bytes(data, container=None):
+    """Send in-memory speech to the browser and wait about as long as it plays"""
+    if not data:
+        return False
+    (container or st).audio(data, format=audio_mime_type(data), autoplay=True)
+    time.sleep(audio_duration(data))
+    return True
+
+def speak_and_wait(text: str, role: str = "judge"):
+    """Speak a line to the user and return once it has been played"""
+    engine = st.session_state.tts_engine
+    if engine.delivery == "browser":
+        # The server has no sound device; the clip plays in the page
+        return play_audio_bytes(engine.synthesize(text, role=role))
+    return engine.speak(text, role=role, wait=True)
 
 class CourtroomUI:
     def __init__(self):
@@ -73,7 +90,8 @@ class CourtroomUI:
             </style>
             ''', unsafe_allow_html=True)
     
-    def display_courtroom(self, simulation_state: Dict[str, Any], speaking_role: str = None):
+    def display_courtroom(self, simulation_state: Dict[str, Any], speaking_role: str = None,
+                          last_statements: Dict[str, Any] = None):
         # Layout: Judge | Plaintiff Lawyer | Witness | Defendant Lawyer
         col_judge, col_plaintiff, col_witness, col_defendant = st.columns([1.2, 1.5, 1.2, 1.5])
         avatars = {
@@ -88,8 +106,9 @@ class CourtroomUI:
             "defendant": "Defendant Lawyer",
             "witness": "Witness"
         }
-        # Get last utterances for each role
-        last_statements = self._get_last_statements(simulation_state.get('transcript', []))
+        # Get last utterances for each role (a TranscriptView keeps these up to date on append)
+        if last_statements is None:
+            last_statements = self._get_last_statements(simulation_state.get('transcript', []))
         # Judge
         with col_judge:
             st.markdown(f'<div class="courtroom-col {"speaking" if speaking_role=="judge" else ""}">', unsafe_allow_html=True)
@@ -191,8 +210,16 @@ class CourtroomUI:
         with col1:
             if st.button("Record Statement", key=f"record_statement_{role.lower().replace(' ', '_')}"):
                 with st.spinner("Recording..."):
-                    st.session_state.tts_engine.speak("Please deliver your opening statement.")
-                    user_input = st.session_state.stt_engine.process_microphone_input()
+                    # Played to the end before the microphone opens, so the prompt is not recorded
+                    speak_and_wait("Please deliver your opening statement.")
+                    # Show the words while the statement is still being spoken
+                    live_text = st.empty()
+                    finals = []
+                    for text, is_final in st.session_state.stt_engine.stream_microphone(timeout=3.0, max_utterances=None):
+                        if is_final:
+                            finals.append(text)
+                        live_text.markdown(" ".join(finals + ([] if is_final else [f"_{text}_"])))
+                    user_input = " ".join(finals)
                     st.success(f"Recorded: {user_input}")
         with col2:
             if st.button("Submit Opening Statement", key=f"submit_opening_{role.lower().replace(' ', '_')}"):
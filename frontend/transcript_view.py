@@ -0,0 +1,75 @@
+from collections import deque
+from typing import Dict, Any, Optional
+
+class TranscriptView:
+    """Incrementally maintained view of a transcript for the UI.
+
+    Rendered HTML fragments for the visible window and the latest statement
+    of each courtroom role are updated as entries are appended, so a rerun
+    only processes entries it has not seen yet.
+    """
+
+    ROLES = ["judge", "plaintiff", "defendant", "witness"]
+
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.cursor = 0
+        self.source_id = None
+        self.fragments = deque(maxlen=self.window)
+        self.last_statements: Dict[str, Optional[str]] = {role: None for role in self.ROLES}
+        self._html = None
+
+    @classmethod
+    def role_for(cls, speaker: str) -> Optional[str]:
+        """Map a transcript speaker label to a courtroom role"""
+        speaker = speaker.lower()
+        for role in cls.ROLES:
+            if role in speaker:
+                return role
+        return None
+
+    @staticmethod
+    def render_entry(entry: Dict[str, Any]) -> str:
+        return f'<span style="color:#e10600;font-weight:bold;">{entry["speaker"]}:</span> <span style="color:#fff;">{entry["content"]}</span><br>'
+
+    def append(self, entry: Dict[str, Any]):
+        """Apply one new transcript entry"""
+        self.fragments.append(self.render_entry(entry))
+        role = self.role_for(entry["speaker"])
+        if role:
+            self.last_statements[role] = entry["content"]
+        self.cursor += 1
+        self._html = None
+
+    def sync(self, transcript):
+        """Catch up with a transcript (list or transcript store) by reading only new entries"""
+        if self.source_id != id(transcript) or len(transcript) < self.cursor:
+            self.reset()
+            self.source_id = id(transcript)
+            # Only the visible window has to be rendered when (re)attaching
+            self.cursor = max(0, len(transcript) - self.window)
+            if self.cursor:
+                for role, content in self._scan_last_statements(transcript).items():
+                    self.last_statements[role] = content
+        for entry in transcript[self.cursor:]:
+            self.append(entry)
+
+    def _scan_last_statements(self, transcript) -> Dict[str, str]:
+        # One-off backwards scan for roles that have not spoken in the visible window
+        found = {}
+        for index in range(self.cursor - 1, -1, -1):
+            role = self.role_for(transcript[index]["speaker"])
+            if role and role not in found:
+                found[role] = transcript[index]["content"]
+                if len(found) == len(self.ROLES):
+                    break
+        return found
+
+    def render_html(self) -> str:
+        """HTML for the transcript sidebar (cached until the next append)"""
+        if self._html is None:
+            self._html = '<div class="transcript-sidebar"><b>Live Transcript</b><br>' + ''.join(self.fragments) + '</div>'
+        return self._html
@@ -1,6 +1,6 @@
 # llm/groq_api.py
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from groq import Groq
 from api_keys import GROQ_API_KEY
 
@@ -37,6 +37,28 @@ class GroqAPI:
                 "response": None
             }
 
+    def generate_response_stream(self, prompt: str, model: str = "llama-3.3-70b-versatile") -> Iterator[str]:
+        """Yield the response text in pieces as the model generates it"""
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "You are a legal expert assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1024,
+                top_p=1,
+                stream=True,
+                stop=None,
+            )
+            for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+        except Exception as e:
+            print(f"Error in Groq streaming API call: {str(e)}")
+
 # Global instance
 groq_api = GroqAPI()
 
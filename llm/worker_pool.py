@@ -0,0 +1,134 @@
+# llm/worker_pool.py
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+class FairWorkerPool:
+    """A fixed set of worker threads shared by every session.
+
+    Jobs are queued per session and the workers serve sessions round-robin,
+    so one long trial cannot starve the others of LLM/TTS capacity.
+    """
+
+    def __init__(self, num_workers: int = 8, max_pending_per_session: int = 64):
+        self.num_workers = num_workers
+        self.max_pending_per_session = max_pending_per_session
+        self._queues: Dict[str, deque] = {}
+        self._ready: deque = deque()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._running = False
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0
+        }
+
+    def start(self):
+        """Start the worker threads (called lazily on first submit)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"worker-pool-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, session_id: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue a job for a session and return a Future for its result"""
+        if not self._running:
+            self.start()
+        future = Future()
+        with self._cond:
+            queue = self._queues.get(session_id)
+            if queue is None:
+                queue = self._queues[session_id] = deque()
+                self._ready.append(session_id)
+            if len(queue) >= self.max_pending_per_session:
+                raise RuntimeError(f"Too many pending jobs for session {session_id}")
+            queue.append((future, fn, args, kwargs))
+            self.stats["submitted"] += 1
+            self._cond.notify()
+        return future
+
+    def run(self, session_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """Submit a job and block until it completes"""
+        return self.submit(session_id, fn, *args, **kwargs).result()
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancel every job a session still has waiting in the queue"""
+        with self._cond:
+            queue = self._queues.pop(session_id, None)
+            if not queue:
+                return 0
+            try:
+                self._ready.remove(session_id)
+            except ValueError:
+                pass
+        cancelled = 0
+        for future, _, _, _ in queue:
+            if future.cancel():
+                cancelled += 1
+        with self._cond:
+            self.stats["cancelled"] += cancelled
+        return cancelled
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        """Number of queued jobs, for one session or for the whole pool"""
+        with self._cond:
+            if session_id is not None:
+                return len(self._queues.get(session_id, ()))
+            return sum(len(q) for q in self._queues.values())
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers once the queued jobs have drained"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+
+    def _next_job(self):
+        with self._cond:
+            while self._running and not self._ready:
+                self._cond.wait()
+            if not self._ready:
+                return None
+            session_id = self._ready.popleft()
+            queue = self._queues[session_id]
+            job = queue.popleft()
+            if queue:
+                # Back of the line: other sessions get served before this one again
+                self._ready.append(session_id)
+            else:
+                del self._queues[session_id]
+            return job
+
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                with self._cond:
+                    self.stats["failed"] += 1
+            else:
+                future.set_result(result)
+                with self._cond:
+                    self.stats["completed"] += 1
+
+# Global instance shared by every session in the process
+worker_pool = FairWorkerPool(num_workers=int(os.environ.get("WORKER_POOL_SIZE", "8")))
@@ -0,0 +1,6 @@
+from .client import TrialClient, RemoteTrial
+
+__all__ = [
+    'TrialClient',
+    'RemoteTrial'
+]
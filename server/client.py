@@ -0,0 +1,58 @@
+# server/client.py
+
+import requests
+from typing import Dict, Any, List, Optional
+from courtroom.trial_events import TrialMirror
+
+class TrialClient:
+    """Thin HTTP client for the trial server"""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def start_trial(self, case: Dict[str, Any] = None, case_id: str = None) -> Dict[str, Any]:
+        """Start a trial for a custom case or a catalog case id"""
+        payload = {'case': case} if case is not None else {'case_id': case_id}
+        response = self.session.post(f"{self.base_url}/trials", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_events(self, trial_id: str, since: int = 0) -> Dict[str, Any]:
+        """Get the trial status plus every event from `since` onwards"""
+        response = self.session.get(f"{self.base_url}/trials/{trial_id}/events",
+                                    params={'since': since}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_audio(self, audio_url: str) -> Optional[bytes]:
+        """Fetch the audio clip for an utterance event"""
+        try:
+            response = self.session.get(f"{self.base_url}{audio_url}", timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+        except requests.RequestException as e:
+            print(f"Error fetching trial audio: {str(e)}")
+            return None
+
+class RemoteTrial(TrialMirror):
+    """Mirror of a trial hosted on the trial server"""
+
+    def __init__(self, client: TrialClient, case: Dict[str, Any]):
+        super().__init__(case)
+        self.client = client
+        self.trial_id = client.start_trial(case=case)['trial_id']
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Fetch new events from the server and apply them to the local mirror"""
+        data = self.client.get_events(self.trial_id, self.cursor)
+        events = data.get('items', [])
+        self.status = data.get('status', self.status)
+        self.apply(events)
+        return events
+
+    def get_audio(self, event: Dict[str, Any]) -> Optional[bytes]:
+        if not event.get('audio_url'):
+            return None
+        return self.client.get_audio(event['audio_url'])
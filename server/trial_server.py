@@ -0,0 +1,293 @@
+# server/trial_server.py
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from courtroom import create_simulation
+from courtroom.trial_events import TrialEventLog
+from courtroom.trial_runner import build_case_data, load_catalog_cases, run_observer_trial
+from llm.worker_pool import FairWorkerPool, worker_pool
+
+class HostedTrial:
+    """A trial running on the server and the events it has produced so far"""
+
+    def __init__(self, trial_id: str, case: Dict[str, Any]):
+        self.trial_id = trial_id
+        self.case = case
+        self.events = TrialEventLog()
+        # (file, text, role) per utterance, so audio evicted from the cache can be synthesized again
+        self.audio: List[Tuple[str, str, str]] = []
+        self.status = 'pending'
+        self.phase = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'trial_id': self.trial_id,
+            'case_id': self.case.get('case_id'),
+            'title': self.case.get('title'),
+            'status': self.status,
+            'phase': self.phase,
+            'events': len(self.events),
+            'error': self.error
+        }
+
+class TrialHost:
+    """Hosts many concurrent trials.
+
+    Each trial is driven by its own lightweight thread, but every LLM and TTS
+    request it makes goes through the shared, fair-queued worker pool, so
+    throughput is bounded by the pool size rather than by the number of
+    sessions.
+    """
+
+    def __init__(self, pool: FairWorkerPool = worker_pool, tts_engine=None,
+                 max_active_trials: int = 500, retention_seconds: int = 3600):
+        self.pool = pool
+        self.tts_engine = tts_engine
+        self.max_active_trials = max_active_trials
+        self.retention_seconds = retention_seconds
+        self.trials: Dict[str, HostedTrial] = {}
+        self._lock = threading.Lock()
+
+    def create_trial(self, case: Dict[str, Any]) -> HostedTrial:
+        """Start a new trial for the given case"""
+        self.reap_finished()
+        with self._lock:
+            active = sum(1 for t in self.trials.values() if t.status in ('pending', 'running'))
+            if active >= self.max_active_trials:
+                raise RuntimeError("Trial server is at capacity")
+            trial = HostedTrial(uuid.uuid4().hex[:12], case)
+            self.trials[trial.trial_id] = trial
+        threading.Thread(target=self._run, args=(trial,), name=f"trial-{trial.trial_id}", daemon=True).start()
+        return trial
+
+    def get_trial(self, trial_id: str) -> Optional[HostedTrial]:
+        with self._lock:
+            return self.trials.get(trial_id)
+
+    def reap_finished(self):
+        """Drop finished trials older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for trial_id in [t.trial_id for t in self.trials.values()
+                             if t.finished_at and t.finished_at < cutoff]:
+                del self.trials[trial_id]
+
+    def read_audio(self, trial: HostedTrial, index: int) -> Optional[Tuple[str, bytes]]:
+        """The file and bytes of an utterance's audio, synthesized again if the cache has evicted it"""
+        filepath, text, role = trial.audio[index]
+        try:
+            with open(filepath, "rb") as f:
+                return filepath, f.read()
+        except OSError:
+            pass
+        if self.tts_engine is None:
+            return None
+        try:
+            filepath = self.pool.run(trial.trial_id, self.tts_engine.generate_tts, text, role)
+            if not filepath:
+                return None
+            with open(filepath, "rb") as f:
+                data = f.read()
+        except Exception as e:
+            print(f"Error synthesizing audio {index} of trial {trial.trial_id}: {str(e)}")
+            return None
+        trial.audio[index] = (filepath, text, role)
+        return filepath, data
+
+    def _run(self, trial: HostedTrial):
+        trial.status = 'running'
+        call = lambda fn, *args: self.pool.run(trial.trial_id, fn, *args)
+
+        def emit(event: Dict[str, Any]):
+            if event['type'] == 'phase':
+                trial.phase = event['phase']
+            elif self.tts_engine is not None and event.get('speak_text'):
+                filepath = self.pool.run(trial.trial_id, self.tts_engine.generate_tts,
+                                         event['speak_text'], event['role'])
+                if filepath:
+                    trial.audio.append((filepath, event['speak_text'], event['role']))
+                    event['audio_url'] = f"/trials/{trial.trial_id}/audio/{len(trial.audio) - 1}"
+            event.pop('speak_text', None)
+            trial.events.append(event)
+
+        sim = None
+        try:
+            sim = call(create_simulation, build_case_data(trial.case))
+            run_observer_trial(sim, trial.case, emit, call=call)
+            trial.status = 'completed'
+        except Exception as e:
+            print(f"Error running trial {trial.trial_id}: {str(e)}")
+            trial.status = 'failed'
+            trial.error = str(e)
+            trial.events.append({'type': 'error', 'message': str(e)})
+        finally:
+            trial.finished_at = time.time()
+            trial.events.close()
+            if sim is not None:
+                sim.close()
+
+class TrialRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API for the trial host.
+
+    POST /trials                      start a trial ({"case_id": ...} or {"case": {...}})
+    GET  /trials/<id>                 trial status
+    GET  /trials/<id>/events?since=N  events from N onwards (polling)
+    GET  /trials/<id>/stream?since=N  events pushed as Server-Sent Events
+    GET  /trials/<id>/audio/<n>       synthesized audio for an utterance
+    GET  /cases                       the case catalog
+    """
+
+    host: TrialHost = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: Any, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _trial_or_404(self, trial_id: str) -> Optional[HostedTrial]:
+        trial = self.host.get_trial(trial_id)
+        if trial is None:
+            self._send_json({'error': f"Trial {trial_id} not found"}, 404)
+        return trial
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/trials":
+            self._send_json({'error': 'Not found'}, 404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json({'error': 'Invalid JSON body'}, 400)
+            return
+
+        case = payload.get('case')
+        if case is None:
+            case = next((c for c in load_catalog_cases() if c.get('case_id') == payload.get('case_id')), None)
+        if case is None:
+            self._send_json({'error': 'Unknown case'}, 400)
+            return
+
+        try:
+            trial = self.host.create_trial(case)
+        except RuntimeError as e:
+            self._send_json({'error': str(e)}, 503)
+            return
+        self._send_json(trial.summary(), 201)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            since = int(query.get('since', ['0'])[0])
+        except ValueError:
+            self._send_json({'error': 'since must be an integer'}, 400)
+            return
+
+        if url.path == "/cases":
+            self._send_json(load_catalog_cases())
+            return
+
+        match = re.fullmatch(r"/trials/(\w+)(?:/(events|stream|audio)(?:/(\d+))?)?", url.path)
+        if not match:
+            self._send_json({'error': 'Not found'}, 404)
+            return
+        trial = self._trial_or_404(match.group(1))
+        if trial is None:
+            return
+
+        action = match.group(2)
+        if action is None:
+            self._send_json(trial.summary())
+        elif action == "events":
+            self._send_json({**trial.summary(), 'items': trial.events.since(since)})
+        elif action == "stream":
+            self._stream_events(trial, since)
+        elif action == "audio" and match.group(3) is not None:
+            self._send_audio(trial, int(match.group(3)))
+        else:
+            self._send_json({'error': 'Not found'}, 404)
+
+    def _send_audio(self, trial: HostedTrial, index: int):
+        if index >= len(trial.audio):
+            self._send_json({'error': 'Audio not found'}, 404)
+            return
+        audio = self.host.read_audio(trial, index)
+        if audio is None:
+            self._send_json({'error': 'Audio not available'}, 404)
+            return
+        filepath, data = audio
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav" if filepath.endswith(".wav") else "audio/mpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, trial: HostedTrial, cursor: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                events = trial.events.wait_for(cursor, timeout=15)
+                if not events:
+                    if trial.events.closed:
+                        break
+                    # Keep idle connections open through proxies
+                    self.wfile.write(b": keepalive\n\n")
+                for event in events:
+                    self.wfile.write(f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+                cursor += len(events)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def serve(host: str = "127.0.0.1", port: int = 8765, audio: bool = True, max_active_trials: int = 500):
+    """Run the trial server until interrupted"""
+    tts_engine = None
+    if audio:
+        from utils.tts import TTSEngine
+        tts_engine = TTSEngine()
+    TrialRequestHandler.host = TrialHost(worker_pool, tts_engine, max_active_trials=max_active_trials)
+    httpd = ThreadingHTTPServer((host, port), TrialRequestHandler)
+    httpd.daemon_threads = True
+    print(f"Trial server listening on http://{host}:{port} with {worker_pool.num_workers} workers")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        worker_pool.shutdown(wait=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lex Orion multi-session trial server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=worker_pool.num_workers)
+    parser.add_argument("--max-trials", type=int, default=500)
+    parser.add_argument("--no-audio", action="store_true", help="Do not synthesize speech for events")
+    args = parser.parse_args()
+    worker_pool.num_workers = args.workers
+    serve(args.host, args.port, audio=not args.no_audio, max_active_trials=args.max_trials)
@@ -0,0 +1,189 @@
+# utils/audio_cache.py
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+AUDIO_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "audio_cache")
+
+def audio_key(text: str, language: str = "en", slow: bool = False, voice: str = "default") -> str:
+    """Stable digest of everything that changes the synthesized audio"""
+    return hashlib.sha256(f"{text}|{language}|{int(bool(slow))}|{voice}".encode("utf-8")).hexdigest()
+
+class AudioCache:
+    """Content-addressed store of synthesized speech on disk.
+
+    Files are named by their audio_key, so the same line spoken with the
+    same settings is synthesized once and reused across sessions and
+    restarts. The total size is capped; the least recently used files are
+    evicted first.
+    """
+
+    def __init__(self, directory: str = AUDIO_CACHE_DIR, max_bytes: int = 200 * 1024 * 1024, extension: str = "mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Oldest first, so the front of the dict is the next to evict
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith(f".{extension}"):
+                path = os.path.join(directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), name, os.path.getsize(path)))
+                except OSError:
+                    continue
+        self._entries: "OrderedDict[str, int]" = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self._total = sum(self._entries.values())
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.extension}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached audio, or None on a miss"""
+        name = f"{key}.{self.extension}"
+        path = self.path_for(key)
+        with self._lock:
+            if name in self._entries and os.path.exists(path):
+                self._entries.move_to_end(name)
+                self.hits += 1
+                hit = True
+            else:
+                self._total -= self._entries.pop(name, 0)
+                self.misses += 1
+                hit = False
+        if not hit:
+            return None
+        try:
+            # Keep the recency order across restarts
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def store(self, key: str, write: Callable[[str], None]) -> str:
+        """Write audio through `write(path)` into the cache and return its final path"""
+        path = self.path_for(key)
+        # A unique temporary file per writer, so threads and processes sharing the cache never collide
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{key}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        size = os.path.getsize(path)
+        name = os.path.basename(path)
+        with self._lock:
+            self._total += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            evicted = []
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_name, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old_name))
+            except OSError:
+                pass
+        return path
+
+    def get_or_create(self, key: str, write: Callable[[str], None]) -> str:
+        return self.get(key) or self.store(key, write)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 3)
+            }
+
+class MemoryAudioCache:
+    """Synthesized speech kept in memory for delivery straight to the browser.
+
+    Uses the same keys as AudioCache but never touches disk. The total size
+    is capped; the least recently used clips are dropped first.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._clips: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._clips.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._clips.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            old = self._clips.pop(key, None)
+            self._total += len(data) - (len(old) if old is not None else 0)
+            self._clips[key] = data
+            while self._total > self.max_bytes and len(self._clips) > 1:
+                _, evicted = self._clips.popitem(last=False)
+                self._total -= len(evicted)
+
+    def get_or_create(self, key: str, create: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = create()
+            self.put(key, data)
+        return data
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._clips),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 3)
+            }
+
+# Global instances shared by every TTS engine in the process
+audio_cache = AudioCache()
+# In-memory counterpart used when audio is delivered to the browser
+memory_audio_cache = MemoryAudioCache()
+_disk_caches: Dict[str, AudioCache] = {audio_cache.extension: audio_cache}
+_disk_caches_lock = threading.Lock()
+
+def get_audio_cache(extension: str = "mp3") -> AudioCache:
+    """The shared on-disk cache for one audio format (backends differ: MP3, WAV)"""
+    with _disk_caches_lock:
+        if extension not in _disk_caches:
+            _disk_caches[extension] = AudioCache(extension=extension)
+        return _disk_caches[extension]
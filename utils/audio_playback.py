@@ -0,0 +1,357 @@
+# utils/audio_playback.py
+
+import io
+import itertools
+import queue
+import threading
+import time
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import pygame
+
+# pygame.mixer.music is one stream per process, shared by every session's queue
+_mixer_lock = threading.Lock()
+_handle_ids = itertools.count(1)
+
+class PlaybackHandle:
+    """A line queued for speech. Returned immediately by TTSEngine.speak."""
+
+    def __init__(self, text: str, role: str, language: str):
+        self.id = next(_handle_ids)
+        self.text = text
+        self.role = role
+        self.language = language
+        self.status = "queued"
+        self.filepath: Optional[str] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[["PlaybackHandle"], None]] = []
+        self._lock = threading.Lock()
+        self._synthesis: Optional[Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == "done"
+
+    def cancel(self):
+        """Stop the line if it is playing, or drop it if it has not started"""
+        self._cancelled.set()
+        if self._synthesis is not None:
+            self._synthesis.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the line has finished (or was cancelled). Returns True if it played to the end."""
+        self.done.wait(timeout)
+        return self.succeeded
+
+    def add_done_callback(self, callback: Callable[["PlaybackHandle"], None]):
+        """Call `callback(handle)` when the line finishes, fails or is cancelled"""
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, status: str, error: Optional[str] = None):
+        with self._lock:
+            if self.done.is_set():
+                return
+            self.status = status
+            self.error = error
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in playback callback: {str(e)}")
+
+    def __bool__(self) -> bool:
+        # Old callers treated speak() as returning success
+        return not self.cancelled and self.status != "failed"
+
+    def __repr__(self) -> str:
+        return f"PlaybackHandle(id={self.id}, role={self.role!r}, status={self.status!r})"
+
+class PlaybackQueue:
+    """Background speech for one session.
+
+    Lines are synthesized ahead on a small thread pool while a single worker
+    thread plays them in order, so the caller never waits and the next clip
+    is usually ready when the current one ends.
+    """
+
+    def __init__(self, synthesize: Callable[[str, str, str], Optional[str]], prefetch: int = 2,
+                 on_complete: Optional[Callable[[PlaybackHandle], None]] = None, poll_interval: float = 0.05):
+        self.synthesize = synthesize
+        self.on_complete = on_complete
+        self.poll_interval = poll_interval
+        self._queue: "queue.Queue[Optional[PlaybackHandle]]" = queue.Queue()
+        self._synth_pool = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="tts-synth")
+        self._pending: List[PlaybackHandle] = []
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="tts-playback", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, text: str, role: str = "judge", language: str = "en") -> PlaybackHandle:
+        handle = PlaybackHandle(text, role, language)
+        handle.status = "synthesizing"
+        handle._synthesis = self._synth_pool.submit(self.synthesize, text, role, language)
+        with self._lock:
+            self._pending.append(handle)
+        self._queue.put(handle)
+        return handle
+
+    def cancel_all(self):
+        """Cancel everything queued and stop the line that is playing (undo, restart)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for handle in pending:
+            handle.cancel()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._queue.put(None)
+        self._synth_pool.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            handle = self._queue.get()
+            if handle is None:
+                return
+            try:
+                self._play(handle)
+            except Exception as e:
+                print(f"Error playing queued audio: {str(e)}")
+                handle._finish("failed", str(e))
+            finally:
+                with self._lock:
+                    if handle in self._pending:
+                        self._pending.remove(handle)
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(handle)
+                except Exception as e:
+                    print(f"Error in playback completion handler: {str(e)}")
+
+    def _play(self, handle: PlaybackHandle):
+        if handle.cancelled:
+            handle._finish("cancelled")
+            return
+        try:
+            # Usually done already: it was synthesized while the previous line played
+            filepath = handle._synthesis.result()
+        except Exception as e:
+            if handle.cancelled:
+                handle._finish("cancelled")
+            else:
+                handle._finish("failed", str(e))
+            return
+        if handle.cancelled:
+            handle._finish("cancelled")
+            return
+        if not filepath:
+            handle._finish("failed", "synthesis failed")
+            return
+        handle.filepath = filepath
+        handle.status = "playing"
+        with _mixer_lock:
+            pygame.mixer.music.load(filepath)
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy():
+                if handle.cancelled:
+                    pygame.mixer.music.stop()
+                    break
+                time.sleep(self.poll_interval)
+        handle._finish("cancelled" if handle.cancelled else "done")
+
+class PlaybackGroup:
+    """Several queued lines handled as one, e.g. the sentences of a streamed statement.
+
+    Offers the same interface as PlaybackHandle. Lines can be added until
+    the group is closed; it is done once it is closed and every line has
+    finished.
+    """
+
+    def __init__(self, role: str = "judge"):
+        self.role = role
+        self.handles: List[PlaybackHandle] = []
+        self.done = threading.Event()
+        self._closed = False
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[["PlaybackGroup"], None]] = []
+        self._lock = threading.Lock()
+
+    def add(self, handle: PlaybackHandle):
+        with self._lock:
+            self.handles.append(handle)
+        if self.cancelled:
+            handle.cancel()
+        handle.add_done_callback(lambda _: self._check())
+
+    def close(self):
+        """No more lines will be added"""
+        with self._lock:
+            self._closed = True
+        self._check()
+
+    def _check(self):
+        with self._lock:
+            if self.done.is_set() or not self._closed or not all(h.done.is_set() for h in self.handles):
+                return
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in playback callback: {str(e)}")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def status(self) -> str:
+        with self._lock:
+            handles = list(self.handles)
+        if self.cancelled:
+            return "cancelled"
+        if any(h.status == "failed" for h in handles):
+            return "failed"
+        if self.done.is_set():
+            return "done" if handles else "failed"
+        return "playing" if any(h.status == "playing" for h in handles) else "synthesizing"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == "done"
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            handles = list(self.handles)
+        for handle in handles:
+            handle.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.done.wait(timeout)
+        return self.succeeded
+
+    def add_done_callback(self, callback: Callable[["PlaybackGroup"], None]):
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def __bool__(self) -> bool:
+        return not self.cancelled and self.status != "failed"
+
+    def __repr__(self) -> str:
+        return f"PlaybackGroup(lines={len(self.handles)}, role={self.role!r}, status={self.status!r})"
+
+def mp3_duration(data: bytes, bitrate: int = 32000) -> float:
+    """Approximate playing time of an MP3 (gTTS writes a constant 32 kbit/s)"""
+    return len(data) * 8 / bitrate
+
+def audio_mime_type(data: bytes) -> str:
+    return "audio/wav" if data[:4] == b"RIFF" else "audio/mp3"
+
+def audio_duration(data: bytes) -> float:
+    """Playing time of a WAV or (approximately) an MP3 clip"""
+    if data[:4] == b"RIFF":
+        try:
+            with wave.open(io.BytesIO(data)) as clip:
+                return clip.getnframes() / float(clip.getframerate())
+        except (wave.Error, EOFError):
+            pass
+    return mp3_duration(data)
+
+def join_audio(parts: List[bytes]) -> bytes:
+    """Join clips into one. MP3 frames simply concatenate; WAV clips are merged under a single header."""
+    if not parts or parts[0][:4] != b"RIFF":
+        return b"".join(parts)
+    output = io.BytesIO()
+    writer = None
+    for part in parts:
+        with wave.open(io.BytesIO(part)) as clip:
+            if writer is None:
+                writer = wave.open(output, "wb")
+                writer.setparams(clip.getparams())
+            writer.writeframes(clip.readframes(clip.getnframes()))
+    writer.close()
+    return output.getvalue()
+
+class ClipCollector:
+    """Sentences synthesized into memory for the browser.
+
+    Has the same enqueue() as PlaybackQueue, so a SpeechStream can feed it:
+    each sentence is synthesized on a small pool while the text is still
+    being generated. ready() hands over the sentences finished so far, in
+    order, and collect() waits for the rest and joins them into one clip.
+    Handles are finished once their audio is handed over.
+    """
+
+    def __init__(self, synthesize: Callable[[str, str, str], Optional[bytes]], workers: int = 2):
+        self.synthesize = synthesize
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-clip")
+        self._handles: List[PlaybackHandle] = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, text: str, role: str = "judge", language: str = "en") -> PlaybackHandle:
+        handle = PlaybackHandle(text, role, language)
+        handle.status = "synthesizing"
+        handle._synthesis = self._pool.submit(self.synthesize, text, role, language)
+        with self._lock:
+            self._handles.append(handle)
+        return handle
+
+    def ready(self) -> List[bytes]:
+        """Audio of the leading sentences that are already synthesized, in order, without waiting"""
+        with self._lock:
+            count = 0
+            while count < len(self._handles) and self._handles[count]._synthesis.done():
+                count += 1
+            handles, self._handles = self._handles[:count], self._handles[count:]
+        return self._take(handles, None)
+
+    def collect(self, timeout: Optional[float] = None) -> bytes:
+        """Wait for every queued sentence and return their audio joined in order"""
+        with self._lock:
+            handles, self._handles = self._handles, []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return join_audio(self._take(handles, deadline))
+
+    @staticmethod
+    def _take(handles: List[PlaybackHandle], deadline: Optional[float]) -> List[bytes]:
+        parts = []
+        for handle in handles:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                data = handle._synthesis.result(remaining)
+            except Exception as e:
+                handle._finish("cancelled" if handle.cancelled else "failed", str(e))
+                continue
+            if handle.cancelled:
+                handle._finish("cancelled")
+            elif not data:
+                handle._finish("failed", "synthesis failed")
+            else:
+                parts.append(data)
+                handle._finish("done")
+        return parts
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,90 @@
+# utils/audio_prep.py
+
+import io
+import wave
+from typing import Tuple
+
+import numpy as np
+
+TARGET_RATE = 16000
+
+def decode_audio(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode an audio file held in memory to mono float32 samples in [-1, 1] and its sample rate.
+
+    PCM WAV is decoded with the standard library; anything else (FLAC,
+    OGG, ...) goes through soundfile if it is installed.
+    """
+    if data[:4] == b"RIFF":
+        try:
+            return _decode_wav(data)
+        except (wave.Error, EOFError, ValueError):
+            # e.g. float or compressed WAV, which soundfile can read
+            pass
+    import soundfile as sf
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return samples.mean(axis=1), rate
+
+def _decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    with wave.open(io.BytesIO(data)) as clip:
+        channels = clip.getnchannels()
+        width = clip.getsampwidth()
+        rate = clip.getframerate()
+        raw = clip.readframes(clip.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        # Sign-extend 24-bit little-endian samples into int32
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values).astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+def resample(samples: np.ndarray, rate: int, target_rate: int = TARGET_RATE) -> np.ndarray:
+    """Linear-interpolation resampling; plenty for speech recognition"""
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    duration = len(samples) / float(rate)
+    target_length = max(1, int(round(duration * target_rate)))
+    positions = np.linspace(0, len(samples) - 1, target_length)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def normalize(samples: np.ndarray, peak: float = 0.9) -> np.ndarray:
+    """Scale so the loudest sample reaches `peak` (quiet recordings recognize better)"""
+    loudest = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if loudest < 1e-4:
+        return samples
+    return (samples * (peak / loudest)).astype(np.float32)
+
+def trim_silence(samples: np.ndarray, rate: int, threshold_db: float = -35.0,
+                 frame_ms: int = 30, pad_ms: int = 150) -> np.ndarray:
+    """Drop leading and trailing frames quieter than threshold_db below the loudest frame"""
+    if len(samples) == 0 or float(np.max(np.abs(samples))) < 1e-4:
+        return samples[:0]
+    frame = max(1, rate * frame_ms // 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    energy = np.sqrt(np.mean(samples[:count * frame].reshape(count, frame) ** 2, axis=1))
+    loud = np.nonzero(energy > energy.max() * 10 ** (threshold_db / 20.0))[0]
+    if len(loud) == 0:
+        return samples[:0]
+    pad = rate * pad_ms // 1000
+    start = max(0, loud[0] * frame - pad)
+    stop = min(len(samples), (loud[-1] + 1) * frame + pad)
+    return samples[start:stop]
+
+def prepare_for_recognition(data: bytes, target_rate: int = TARGET_RATE) -> Tuple[bytes, int]:
+    """Uploaded audio bytes to trimmed, normalized 16-bit mono PCM at target_rate"""
+    samples, rate = decode_audio(data)
+    samples = resample(samples, rate, target_rate)
+    samples = normalize(trim_silence(samples, target_rate))
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return pcm, target_rate
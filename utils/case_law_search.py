@@ -0,0 +1,335 @@
+# utils/case_law_search.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.parse
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .importer import iter_json_array
+from .judgment_store import precedent_text
+from .kb_journal import read_journal_tail
+from .knowledge_base import DATA_DIR
+
+INDEX_PATH = os.path.join(DATA_DIR, "index", "case_law.sqlite3")
+QUERY_TERM = re.compile(r"\w+", re.UNICODE)
+
+def indiankanoon_url(title: str) -> str:
+    """Indian Kanoon search link for a judgment that has no stored URL"""
+    return f"https://indiankanoon.org/search/?formInput={urllib.parse.quote_plus(title)}"
+
+def _journal_precedents(f: TextIO) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash is skipped
+            continue
+        if entry.get("kind") == "precedent":
+            yield entry["record"]
+
+def precedent_key(precedent: Dict[str, Any]) -> str:
+    """Stable identity of a precedent record: its id, or a hash of its contents"""
+    if precedent.get("id"):
+        return str(precedent["id"])
+    return "sha1:" + hashlib.sha1(json.dumps(precedent, sort_keys=True).encode("utf-8")).hexdigest()
+
+class CaseLawIndex:
+    """Full-text search over precedents and imported judgments (SQLite FTS5).
+
+    The index lives on disk next to the other derived indexes and follows the
+    precedent files by itself: new journal entries are indexed from the byte
+    offset reached last time, and precedents.json is re-synced by record key
+    only when it changes (after a compaction nearly every record is already
+    there). Updates run in a background thread on their own connection, so a
+    search is a single local query and never waits for them, except to build
+    an index that was never built.
+    """
+
+    SCHEMA_VERSION = "2"
+    SYNC_BATCH = 1000
+
+    def __init__(self, path: str = INDEX_PATH, data_dir: str = DATA_DIR):
+        self.path = path
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._syncer: Optional[threading.Thread] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = self._connect(check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            if self._meta(self._conn, "version") != self.SCHEMA_VERSION:
+                # Built by an older version: start over
+                self._conn.execute("DROP TABLE IF EXISTS judgments")
+                self._conn.execute("DROP TABLE IF EXISTS judgment_keys")
+                self._conn.execute("DELETE FROM meta")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS judgments USING fts5("
+                "title, summary, body, court, year UNINDEXED, url UNINDEXED, tokenize='porter unicode61')"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS judgment_keys (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+            self._set_meta(self._conn, "version", self.SCHEMA_VERSION)
+        # What the index holds, as recorded by the last update
+        self._files = self._meta(self._conn, "files")
+        self._journal = self._meta(self._conn, "journal") or {"offset": 0, "inode": None}
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, **kwargs)
+        # Readers keep reading while the updater writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str) -> Any:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value: Any):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def precedents_path(self) -> str:
+        return os.path.join(self.data_dir, "precedents.json")
+
+    def journal_path(self) -> str:
+        return os.path.join(self.data_dir, "kb_journal.jsonl")
+
+    def compacting_path(self) -> str:
+        return self.journal_path() + ".compacting"
+
+    @staticmethod
+    def _file_signature(stat: os.stat_result) -> List[int]:
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _current_files(self) -> Dict[str, Optional[List[int]]]:
+        signatures = {}
+        for path in (self.precedents_path(), self.compacting_path()):
+            try:
+                signatures[os.path.basename(path)] = self._file_signature(os.stat(path))
+            except FileNotFoundError:
+                signatures[os.path.basename(path)] = None
+        return signatures
+
+    def _journal_behind(self) -> bool:
+        try:
+            stat = os.stat(self.journal_path())
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._journal["inode"] or stat.st_size != self._journal["offset"]
+
+    def is_current(self) -> bool:
+        return self._files == self._current_files() and not self._journal_behind()
+
+    def refresh(self, wait: bool = False) -> bool:
+        """Start bringing the index up to date if the precedent files changed. Returns True if an update is running."""
+        with self._sync_lock:
+            if self._syncer is None or not self._syncer.is_alive():
+                if self.is_current():
+                    return False
+                self._syncer = threading.Thread(target=self._sync, daemon=True)
+                self._syncer.start()
+            syncer = self._syncer
+        if wait:
+            syncer.join()
+        return True
+
+    def _sync(self):
+        conn = self._connect()
+        try:
+            # Files may change again while an update runs; go on while there is something new
+            while True:
+                progressed = False
+                if self._files != self._current_files():
+                    self._sync_files(conn)
+                    progressed = True
+                if self._journal_behind():
+                    indexed = self._journal
+                    self._index_journal(conn)
+                    # A line still being written is not progress
+                    progressed = progressed or self._journal != indexed
+                if not progressed:
+                    break
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Error updating case law index: {str(e)}")
+        finally:
+            conn.close()
+
+    def _row(self, precedent: Dict[str, Any]) -> Tuple:
+        return (
+            precedent.get("title", ""),
+            " ".join([precedent.get("summary", "")] + [str(x) for x in precedent.get("principles", [])]),
+            precedent_text(self.data_dir, precedent),
+            precedent.get("court", ""),
+            str(precedent.get("year", "")),
+            precedent.get("url", "")
+        )
+
+    def _insert(self, conn: sqlite3.Connection, precedents: Iterable[Dict[str, Any]], keys: Optional[set] = None):
+        """Index the precedents that are not in the index yet, adding every key to `keys`"""
+        for precedent in precedents:
+            key = precedent_key(precedent)
+            if keys is not None:
+                keys.add(key)
+            if conn.execute("SELECT 1 FROM judgment_keys WHERE key = ?", (key,)).fetchone():
+                continue
+            cursor = conn.execute(
+                "INSERT INTO judgments (title, summary, body, court, year, url) VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(precedent))
+            conn.execute("INSERT INTO judgment_keys (key, row) VALUES (?, ?)", (key, cursor.lastrowid))
+
+    def _index_journal(self, conn: sqlite3.Connection):
+        """Index the precedents journaled since the last call"""
+        entries, offset, inode = read_journal_tail(self.journal_path(), self._journal["offset"], self._journal["inode"])
+        state = {"offset": offset, "inode": inode}
+        with conn:
+            self._insert(conn, (record for kind, record in entries if kind == "precedent"))
+            self._set_meta(conn, "journal", state)
+        self._journal = state
+
+    def _sync_files(self, conn: sqlite3.Connection):
+        """Match the index to precedents.json plus the journals, adding new records and dropping removed ones"""
+        keys: set = set()
+        files: Dict[str, Optional[List[int]]] = {}
+        for path in (self.precedents_path(), self.compacting_path()):
+            name = os.path.basename(path)
+            try:
+                f = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                files[name] = None
+                continue
+            with f:
+                # The signature of the file actually read, not of whatever is at the path afterwards
+                files[name] = self._file_signature(os.fstat(f.fileno()))
+                if path == self.precedents_path():
+                    records = (item for item in iter_json_array(f) if isinstance(item, dict))
+                else:
+                    records = _journal_precedents(f)
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= self.SYNC_BATCH:
+                        with conn:
+                            self._insert(conn, batch, keys)
+                        batch = []
+                with conn:
+                    self._insert(conn, batch, keys)
+        # Entries still in the journal are kept; they are indexed by _index_journal
+        entries, _, _ = read_journal_tail(self.journal_path(), 0)
+        keys.update(precedent_key(record) for kind, record in entries if kind == "precedent")
+        stale = [(key, row) for key, row in conn.execute("SELECT key, row FROM judgment_keys") if key not in keys]
+        with conn:
+            for key, row in stale:
+                conn.execute("DELETE FROM judgments WHERE rowid = ?", (row,))
+                conn.execute("DELETE FROM judgment_keys WHERE key = ?", (key,))
+            self._set_meta(conn, "files", files)
+        self._files = files
+
+    @staticmethod
+    def match_expression(query: str, operator: str = "AND") -> str:
+        # Quote every term so user input cannot use FTS5 query syntax
+        terms = [f'"{term}"' for term in QUERY_TERM.findall(query)]
+        return f" {operator} ".join(terms)
+
+    def search(self, case_name: str, year: str = "", max_results: int = 5) -> List[Dict[str, Any]]:
+        """Judgments matching a case name (all terms, then any term), best first"""
+        # Updates run in the background; only a first build is waited for
+        self.refresh(wait=self._files is None)
+        year = str(year or "").strip()
+        results: List[Dict[str, Any]] = []
+        for operator in ("AND", "OR"):
+            expression = self.match_expression(case_name, operator)
+            if not expression:
+                return []
+            sql = (
+                "SELECT title, url, court, year, snippet(judgments, -1, '', '', ' ... ', 24) "
+                "FROM judgments WHERE judgments MATCH ?"
+            )
+            params: Tuple = (expression,)
+            if year:
+                sql += " AND year = ?"
+                params += (year,)
+            # Title matches count most, then the summary, then the full text
+            sql += " ORDER BY bm25(judgments, 10.0, 3.0, 1.0, 1.0) LIMIT ?"
+            with self._lock:
+                rows = self._conn.execute(sql, params + (max_results,)).fetchall()
+            if rows:
+                for title, url, court, row_year, snippet in rows:
+                    results.append({
+                        "title": title,
+                        "url": url or indiankanoon_url(title),
+                        "snippet": snippet,
+                        "court": court,
+                        "year": row_year,
+                        "source": "local"
+                    })
+                break
+        return results
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class WebCaseLawSearch:
+    """Optional fallback: Indian Kanoon results through DuckDuckGo's HTML endpoint.
+
+    Pages are fetched through the shared research fetcher and the parsed
+    results are cached on disk, so a repeated search touches neither the
+    network nor the HTML parser.
+    """
+
+    SEARCH_URL = "https://html.duckduckgo.com/html/?q={query}"
+    # Parse (and cache) this many results; callers get a prefix
+    PARSE_LIMIT = 10
+
+    def search(self, case_name: str, year: str = "", max_results: int = 5) -> List[Dict[str, Any]]:
+        # Only needed when the fallback is used
+        from .research_fetch import get_research_fetcher, normalize_query
+        fetcher = get_research_fetcher()
+        key = normalize_query(case_name, year)
+        results = fetcher.cache.get("results", key)
+        if results is None:
+            query = urllib.parse.quote_plus(f"{case_name} {year} site:indiankanoon.org")
+            results = self.parse(fetcher.get_text(self.SEARCH_URL.format(query=query)))
+            fetcher.cache.put("results", key, results)
+        return results[:max_results]
+
+    def parse(self, html: str) -> List[Dict[str, Any]]:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+        results = []
+        for result in soup.find_all("div", class_="result", limit=self.PARSE_LIMIT):
+            link = result.find("a", class_="result__a")
+            if link is None:
+                continue
+            snippet = result.find(class_="result__snippet")
+            results.append({
+                "title": link.get_text(strip=True),
+                "url": link.get("href", ""),
+                "snippet": snippet.get_text(" ", strip=True) if snippet else "",
+                "source": "web"
+            })
+        return results
+
+# Global instances
+case_law_index = None
+web_case_law_search = WebCaseLawSearch()
+_index_lock = threading.Lock()
+
+def get_case_law_index() -> CaseLawIndex:
+    global case_law_index
+    with _index_lock:
+        if case_law_index is None:
+            case_law_index = CaseLawIndex()
+        return case_law_index
+
+def search_case_law(case_name: str, year: str = "", max_results: int = 5,
+                    web_fallback: bool = False) -> List[Dict[str, Any]]:
+    """Search the local case-law index, falling back to the web only if asked and nothing was found"""
+    results = get_case_law_index().search(case_name, year, max_results)
+    if not results and web_fallback:
+        results = web_case_law_search.search(case_name, year, max_results)
+    return results
@@ -0,0 +1,458 @@
+# utils/corpus_mmap.py
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+from collections import Counter
+from typing import Dict, Any, Callable, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .search_index import CorpusStats, document_text, tokenize
+from .statute_store import StatuteStore, normalize_section, section_path, _sort_key
+
+CORPUS_MAGIC = b"LEXCORP1"
+CORPUS_VERSION = 1
+CORPUS_FILE = "corpus.lexc"
+NO_STRING = 0xFFFFFFFF
+
+# Fields kept in the fixed section table; anything else goes in a JSON "extra" string
+SECTION_COLUMNS = ["number", "title", "text"]
+
+# Layout:
+#   magic (8 bytes) | version (u32) | header length (u32) | header JSON | padding
+#   followed by 8-byte aligned arrays whose offsets, dtypes and shapes are
+#   listed in the header. Strings are interned once in a pool (an offset
+#   table plus UTF-8 data) and referenced everywhere else by their id.
+
+def corpus_path(data_dir: str) -> str:
+    return os.path.join(data_dir, "index", CORPUS_FILE)
+
+def source_signature(paths: List[str]) -> List[List[Any]]:
+    """(name, size, mtime) of each source file, used to tell whether a compiled corpus is stale"""
+    signature = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+def statute_sources(data_dir: str) -> List[str]:
+    codes_dir = os.path.join(data_dir, "legal_codes")
+    return glob.glob(os.path.join(codes_dir, "*.json")) + glob.glob(os.path.join(codes_dir, "*.jsonl"))
+
+def precedent_sources(data_dir: str) -> List[str]:
+    return [os.path.join(data_dir, "precedents.json")]
+
+class _StringPool:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value.encode("utf-8"))
+        return sid
+
+def _build_postings(docs: List[str], pool: _StringPool) -> Dict[str, np.ndarray]:
+    """BM25 inputs for one index: document lengths, sorted terms and their postings"""
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    lengths = np.zeros(len(docs), dtype=np.uint32)
+    for doc, text in enumerate(docs):
+        terms = Counter(tokenize(text))
+        lengths[doc] = sum(terms.values())
+        for term, frequency in terms.items():
+            postings.setdefault(term, []).append((doc, frequency))
+    terms = sorted(postings)
+    starts = np.zeros(len(terms) + 1, dtype=np.uint64)
+    pairs = []
+    for i, term in enumerate(terms):
+        pairs.extend(postings[term])
+        starts[i + 1] = len(pairs)
+    return {
+        "lengths": lengths,
+        "term_ids": np.array([pool.intern(term) for term in terms], dtype=np.uint32),
+        "starts": starts,
+        "postings": np.array(pairs, dtype=np.uint32).reshape(-1, 2)
+    }
+
+def build_corpus(data_dir: str, output_path: Optional[str] = None) -> Dict[str, Any]:
+    """Compile the statutes and precedents under data_dir into one memory-mappable file"""
+    from .knowledge_base import PRECEDENT_FIELDS, STATUTE_FIELDS
+    output_path = output_path or corpus_path(data_dir)
+    store = StatuteStore(os.path.join(data_dir, "legal_codes"))
+    try:
+        with open(os.path.join(data_dir, "precedents.json"), "r") as f:
+            precedents = json.load(f)
+    except FileNotFoundError:
+        precedents = []
+
+    pool = _StringPool()
+    act_keys = sorted(store.acts)
+    act_rows = {key: row for row, key in enumerate(act_keys)}
+    section_keys = sorted(store.sections, key=lambda key: (key[0], key[1]))
+    sections = np.zeros((len(section_keys), 5), dtype=np.uint32)
+    statute_docs = []
+    for row, key in enumerate(section_keys):
+        section = store.sections[key]
+        extra = {k: v for k, v in section.items() if k not in SECTION_COLUMNS and k != "act"}
+        sections[row] = [
+            act_rows[key[0]],
+            pool.intern(key[1]),
+            pool.intern(section.get("title")),
+            pool.intern(str(section.get("text", ""))),
+            pool.intern(json.dumps(extra, ensure_ascii=False)) if extra else NO_STRING
+        ]
+        statute_docs.append(document_text(section, STATUTE_FIELDS))
+    precedent_rows = np.array(
+        [pool.intern(json.dumps(p, ensure_ascii=False, sort_keys=True)) for p in precedents], dtype=np.uint32)
+
+    arrays = {"sections": sections, "precedents": precedent_rows}
+    for name, index in (("statutes", _build_postings(statute_docs, pool)),
+                        ("precedent_index", _build_postings(
+                            [document_text(p, PRECEDENT_FIELDS) for p in precedents], pool))):
+        for part, array in index.items():
+            arrays[f"{name}.{part}"] = array
+    arrays["strings.offsets"] = np.zeros(len(pool.strings) + 1, dtype=np.uint64)
+    arrays["strings.offsets"][1:] = np.cumsum([len(s) for s in pool.strings], dtype=np.uint64)
+    arrays["strings.data"] = np.frombuffer(b"".join(pool.strings), dtype=np.uint8)
+
+    header = {
+        "acts": [store.acts[key] for key in act_keys],
+        "aliases": store.aliases,
+        "statute_total_length": int(arrays["statutes.lengths"].sum()),
+        "precedent_total_length": int(arrays["precedent_index.lengths"].sum()),
+        "statute_sources": source_signature(statute_sources(data_dir)),
+        "precedent_sources": source_signature(precedent_sources(data_dir)),
+        "built_at": time.time(),
+        "arrays": {}
+    }
+    # Offsets depend on the header size, so lay the arrays out after a generous reservation
+    header_bytes = b""
+    reserved = 4096
+    while True:
+        offset = reserved
+        for name, array in arrays.items():
+            header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+            offset += (array.nbytes + 7) & ~7
+        header_bytes = json.dumps(header).encode("utf-8")
+        if 16 + len(header_bytes) <= reserved:
+            break
+        reserved = (16 + len(header_bytes) + 4095) & ~4095
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CORPUS_MAGIC + struct.pack("<II", CORPUS_VERSION, len(header_bytes)) + header_bytes)
+        for name, array in arrays.items():
+            f.seek(header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+    return {"path": output_path, "acts": len(act_keys), "sections": len(section_keys),
+            "precedents": len(precedents), "strings": len(pool.strings), "bytes": offset}
+
+class MappedIndex:
+    """Read-only BM25 index over postings stored in a mapped corpus.
+
+    Mirrors InvertedIndex.search; postings are read straight from the
+    mapped pages and scored with NumPy.
+    """
+
+    def __init__(self, corpus: "MappedCorpus", name: str, total_length: int,
+                 doc_key: Optional[Callable[[int], Hashable]] = None, k1: float = 1.5, b: float = 0.75):
+        self.corpus = corpus
+        self.lengths = corpus.array(f"{name}.lengths")
+        self.term_ids = corpus.array(f"{name}.term_ids")
+        self.starts = corpus.array(f"{name}.starts")
+        self.postings = corpus.array(f"{name}.postings")
+        self.total_length = total_length
+        self.doc_key = doc_key or (lambda doc: doc)
+        self.k1 = k1
+        self.b = b
+
+    def _find_term(self, term: str) -> int:
+        lo, hi = 0, len(self.term_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.corpus.string(int(self.term_ids[mid])) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.term_ids) and self.corpus.string(int(self.term_ids[lo])) == term:
+            return lo
+        return -1
+
+    def document_frequency(self, term: str) -> int:
+        position = self._find_term(term)
+        return int(self.starts[position + 1] - self.starts[position]) if position >= 0 else 0
+
+    def stats(self) -> CorpusStats:
+        return CorpusStats(len(self.lengths), self.total_length, self.document_frequency)
+
+    def search(self, query: str, top_k: int = 10, stats: Optional[CorpusStats] = None) -> List[Tuple[Hashable, float]]:
+        doc_count = len(self.lengths)
+        if not doc_count:
+            return []
+        stats = stats or self.stats()
+        avg_length = stats.avg_length or 1.0
+        scores = np.zeros(doc_count, dtype=np.float64)
+        for term in set(tokenize(query)):
+            position = self._find_term(term)
+            if position < 0:
+                continue
+            block = self.postings[int(self.starts[position]):int(self.starts[position + 1])]
+            docs, frequencies = block[:, 0], block[:, 1].astype(np.float64)
+            idf = stats.idf(term)
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[docs] / avg_length)
+            scores[docs] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        return [(self.doc_key(int(doc)), float(scores[doc])) for doc in top]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+class MappedCorpus:
+    """Compiled statute and precedent corpus, memory-mapped on first use.
+
+    Opening only reads the small header; section texts, precedents and
+    postings stay in the page cache, which is shared by every process that
+    maps the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        with open(path, "rb") as f:
+            magic = f.read(8)
+            version, header_length = struct.unpack("<II", f.read(8))
+            if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+                raise ValueError(f"{path} is not a version {CORPUS_VERSION} corpus file")
+            self.header = json.loads(f.read(header_length))
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def _map(self) -> mmap.mmap:
+        if self._mmap is None:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def array(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            spec = self.header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+            array = np.frombuffer(self._map(), dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+            self._arrays[name] = array
+        return array
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        offsets = self.array("strings.offsets")
+        start = self.header["arrays"]["strings.data"]["offset"] + int(offsets[sid])
+        return self._map()[start:start + int(offsets[sid + 1] - offsets[sid])].decode("utf-8")
+
+    def is_current(self, kind: str, paths: List[str]) -> bool:
+        return self.header.get(f"{kind}_sources") == source_signature(paths)
+
+    # --- Statutes ---
+
+    def section_count(self) -> int:
+        return len(self.array("sections"))
+
+    def section_key(self, row: int) -> Tuple[str, str]:
+        act, number = self.array("sections")[row][:2]
+        return self.header["acts"][int(act)]["key"], self.string(int(number))
+
+    def section(self, row: int) -> Dict[str, Any]:
+        act, number, title, text, extra = (int(value) for value in self.array("sections")[row])
+        record = json.loads(self.string(extra)) if extra != NO_STRING else {}
+        record.update({"number": self.string(number), "text": self.string(text),
+                       "act": self.header["acts"][act]["name"]})
+        if title != NO_STRING:
+            record["title"] = self.string(title)
+        return record
+
+    def lower_bound(self, key: Tuple[str, str]) -> int:
+        """First row whose (act key, number) is not less than `key` (the table is sorted)"""
+        lo, hi = 0, self.section_count()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.section_key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find_section(self, act_key: str, number: str) -> int:
+        """Row of a section, or -1"""
+        row = self.lower_bound((act_key, number))
+        if row < self.section_count() and self.section_key(row) == (act_key, number):
+            return row
+        return -1
+
+    def statute_index(self) -> MappedIndex:
+        return MappedIndex(self, "statutes", self.header["statute_total_length"], doc_key=self.section_key)
+
+    # --- Precedents ---
+
+    def precedent_count(self) -> int:
+        return len(self.array("precedents"))
+
+    def precedent(self, row: int) -> Dict[str, Any]:
+        return json.loads(self.string(int(self.array("precedents")[row])))
+
+    def precedent_index(self) -> MappedIndex:
+        return MappedIndex(self, "precedent_index", self.header["precedent_total_length"])
+
+    def close(self):
+        self._arrays = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+class MappedSections:
+    """Read-only mapping (act key, section number) -> section, backed by the corpus"""
+
+    def __init__(self, corpus: MappedCorpus):
+        self.corpus = corpus
+
+    def get(self, key: Tuple[str, str], default=None):
+        row = self.corpus.find_section(*key)
+        return self.corpus.section(row) if row >= 0 else default
+
+    def __getitem__(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        section = self.get(key)
+        if section is None:
+            raise KeyError(key)
+        return section
+
+    def __contains__(self, key) -> bool:
+        return self.corpus.find_section(*key) >= 0
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return (self.corpus.section_key(row) for row in range(self.corpus.section_count()))
+
+    def items(self) -> Iterator[Tuple[Tuple[str, str], Dict[str, Any]]]:
+        return ((self.corpus.section_key(row), self.corpus.section(row)) for row in range(self.corpus.section_count()))
+
+    def __len__(self) -> int:
+        return self.corpus.section_count()
+
+class MappedPrecedents:
+    """Precedent list backed by the corpus rows, plus the records added since the corpus was built.
+
+    Rows are decoded when they are accessed, so only the additions are held
+    in memory.
+    """
+
+    def __init__(self, corpus: MappedCorpus):
+        self.corpus = corpus
+        self.added: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return self.corpus.precedent_count() + len(self.added)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        count = self.corpus.precedent_count()
+        if 0 <= index < count:
+            return self.corpus.precedent(index)
+        if index < 0:
+            raise IndexError("precedent index out of range")
+        return self.added[index - count]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self.corpus.precedent_count()):
+            yield self.corpus.precedent(row)
+        # By position, so records appended while iterating are picked up instead of raising
+        i = 0
+        while i < len(self.added):
+            yield self.added[i]
+            i += 1
+
+    def append(self, record: Dict[str, Any]):
+        self.added.append(record)
+
+    def extend(self, records: List[Dict[str, Any]]):
+        self.added.extend(records)
+
+class MappedStatuteStore(StatuteStore):
+    """StatuteStore served from a compiled corpus instead of the JSON files"""
+
+    def __init__(self, corpus: MappedCorpus):
+        self.corpus = corpus
+        super().__init__(os.path.dirname(corpus.path))
+
+    def load(self):
+        # Only the act list and alias table are read up front
+        self.acts = {act["key"]: act for act in self.corpus.header["acts"]}
+        self.aliases = dict(self.corpus.header["aliases"])
+        self.sections = MappedSections(self.corpus)
+        self.tries = {}
+
+    def add_act(self, name: str, sections: List[Dict[str, Any]], extra_aliases: List[str] = None) -> str:
+        raise RuntimeError("A compiled statute corpus is read-only; rebuild it with python -m utils.corpus_mmap")
+
+    def get_subsections(self, act_name: str, section_number: Any) -> List[Dict[str, Any]]:
+        act_key = self.resolve_act(act_name)
+        if act_key is None:
+            return []
+        path = section_path(section_number)
+        # Sub-sections share the section's leading number, so they sit in one sorted run
+        prefix = normalize_section(section_number)
+        found = []
+        for row in range(self.corpus.lower_bound((act_key, prefix)), self.corpus.section_count()):
+            key = self.corpus.section_key(row)
+            if key[0] != act_key or not key[1].startswith(path[0] if path else ""):
+                break
+            if section_path(key[1])[:len(path)] == path:
+                found.append((section_path(key[1]), row))
+        return [self.corpus.section(row) for _, row in sorted(found, key=lambda item: _sort_key(item[0]))]
+
+def open_corpus(data_dir: str) -> Optional[MappedCorpus]:
+    """Open the compiled corpus if it exists and is up to date with the statute files"""
+    path = corpus_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        corpus = MappedCorpus(path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening compiled corpus {path}: {str(e)}")
+        return None
+    if not corpus.is_current("statute", statute_sources(data_dir)):
+        print(f"Compiled corpus {path} is out of date; run python -m utils.corpus_mmap to rebuild it")
+        return None
+    return corpus
+
+def main():
+    from .knowledge_base import DATA_DIR
+    parser = argparse.ArgumentParser(description="Compile statutes and precedents into a memory-mapped corpus file")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    started = time.time()
+    stats = build_corpus(args.data_dir, args.output)
+    print(f"Wrote {stats['path']}: {stats['acts']} acts, {stats['sections']} sections, "
+          f"{stats['precedents']} precedents, {stats['bytes']} bytes in {time.time() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+# utils/importer.py
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .corpus_mmap import build_corpus, corpus_path
+from .judgment_store import JudgmentTextStore, judgment_store_path
+from .kb_journal import KnowledgeJournal, write_json_array_atomic, write_json_atomic
+from .knowledge_base import DATA_DIR
+from .statute_store import StatuteStore, normalize_section
+
+# Column names seen in public statute and judgment dumps, in order of preference
+ACT_KEYS = ["act", "act_name", "statute", "code", "law"]
+NUMBER_KEYS = ["number", "section", "section_number", "section_no", "sec"]
+TEXT_KEYS = ["text", "content", "section_text", "body", "description"]
+TITLE_KEYS = ["title", "heading", "section_title", "marginal_note"]
+CASE_TITLE_KEYS = ["title", "case_name", "name", "case_title", "parties"]
+SUMMARY_KEYS = ["summary", "headnote", "abstract", "description"]
+
+READ_CHUNK = 1 << 16
+# Larger array items are skipped rather than buffered
+MAX_ITEM_CHARS = 1 << 24
+
+def _first(record: Dict[str, Any], keys: List[str]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _clean(value: Any) -> str:
+    return " ".join(str(value).split())
+
+def _as_list(value: Any) -> List[str]:
+    if value in (None, ""):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [_clean(item) for item in value if item not in (None, "")]
+    # CSV cells hold lists as "a; b" or "a | b"
+    return [_clean(item) for item in re.split(r"[;|]", str(value)) if item.strip()]
+
+# --- Streaming readers ---
+
+class _JsonScanner:
+    """Walks the structure of a JSON text read in chunks, without parsing or buffering whole values"""
+
+    WHITESPACE = re.compile(r"[ \t\r\n]*")
+    STRING_SPECIAL = re.compile(r'["\\]')
+    NESTED_SPECIAL = re.compile(r'["\[\]{}]')
+    SCALAR_END = re.compile(r'[ \t\r\n,\]}\[{"]')
+
+    def __init__(self, fp: TextIO):
+        self.fp = fp
+        self.buffer = ""
+        self.position = 0
+        self.offset = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read the next chunk, dropping what was consumed. False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(READ_CHUNK)
+        self.offset += self.position
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at the end of the file), without consuming it"""
+        while True:
+            self.position = self.WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, allowed: str) -> str:
+        char = self.peek()
+        if not char or char not in allowed:
+            found = repr(char) if char else "end of file"
+            raise ValueError(f"Expected one of {allowed!r} at character {self.offset + self.position}, found {found}")
+        self.position += 1
+        return char
+
+    def value(self, limit: int = MAX_ITEM_CHARS) -> Optional[str]:
+        """Consume the next value and return its raw text, or None if it is longer than `limit`.
+
+        Only brackets and strings are tracked, so a malformed value is still
+        consumed up to its end and can be skipped.
+        """
+        self.peek()
+        pieces: Optional[List[str]] = []
+        size = 0
+        depth = 0
+        in_string = False
+        scalar = False
+        start = i = self.position
+        first = self.buffer[i:i + 1]
+        if first in ("[", "{"):
+            depth, i = 1, i + 1
+        elif first == '"':
+            in_string, i = True, i + 1
+        else:
+            scalar = True
+        while True:
+            end = None
+            if in_string:
+                match = self.STRING_SPECIAL.search(self.buffer, i)
+                if match and match.group() == "\\" and match.end() < len(self.buffer):
+                    i = match.end() + 1
+                    continue
+                if match and match.group() == '"':
+                    in_string = False
+                    i = match.end()
+                    if depth == 0:
+                        end = i
+                    else:
+                        continue
+                elif match:
+                    # A backslash at the end of the buffer: read on before deciding what it escapes
+                    i = match.start()
+            elif scalar:
+                match = self.SCALAR_END.search(self.buffer, i)
+                if match:
+                    end = match.start()
+                elif self.eof:
+                    end = len(self.buffer)
+            else:
+                match = self.NESTED_SPECIAL.search(self.buffer, i)
+                if match:
+                    char = match.group()
+                    i = match.end()
+                    if char == '"':
+                        in_string = True
+                    elif char in "[{":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            end = i
+                    if end is None:
+                        continue
+            if end is not None:
+                if pieces is not None:
+                    pieces.append(self.buffer[start:end])
+                self.position = end
+                return "".join(pieces) if pieces is not None else None
+            # The value continues past the buffer: keep what was scanned (up to the limit) and read on
+            consumed = i if match else len(self.buffer)
+            if pieces is not None:
+                size += consumed - start
+                if size <= limit:
+                    pieces.append(self.buffer[start:consumed])
+                else:
+                    pieces = None
+            self.position = consumed
+            if not self.fill():
+                raise ValueError(f"Unexpected end of file at character {self.offset + self.position}")
+            start = i = self.position
+
+def _open_array(scanner: _JsonScanner, path: List[str], search: bool) -> bool:
+    """Advance past the '[' of the array to import. False if the document has none."""
+    char = scanner.peek()
+    if char == "[" and not path:
+        scanner.position += 1
+        return True
+    if char != "{" or not (path or search):
+        found = repr(char) if char else "end of file"
+        raise ValueError(f"Expected a JSON {'object' if path else 'array'}, found {found}")
+    scanner.position += 1
+    if scanner.peek() == "}":
+        scanner.position += 1
+    else:
+        while True:
+            key = json.loads(scanner.value() or '""')
+            scanner.expect(":")
+            if path and key == path[0]:
+                return _open_array(scanner, path[1:], False)
+            if not path and scanner.peek() == "[":
+                scanner.position += 1
+                return True
+            # Skipped without buffering, however large it is
+            scanner.value(limit=0)
+            if scanner.expect(",}") == "}":
+                break
+    if path:
+        raise ValueError(f"No {path[0]!r} key in the JSON object")
+    return False
+
+def iter_json_array(fp: TextIO, path: Optional[List[str]] = None,
+                    on_error: Optional[Callable[[int, str], None]] = None) -> Iterator[Any]:
+    """Yield the items of a JSON array one at a time without loading the whole file.
+
+    The array is the top-level value, the value at `path` (a list of keys
+    through nested objects), or else the first array-valued key of a
+    top-level object (e.g. {"sections": [...]}). Items that are not valid
+    JSON or longer than MAX_ITEM_CHARS are skipped and reported to
+    `on_error` with their position; a missing separator between items ends
+    the import with a ValueError.
+    """
+    scanner = _JsonScanner(fp)
+    if not _open_array(scanner, path or [], path is None):
+        return
+    if scanner.peek() == "]":
+        return
+    index = 0
+    while True:
+        text = scanner.value()
+        if text is None:
+            if on_error:
+                on_error(index, f"longer than {MAX_ITEM_CHARS} characters")
+        else:
+            try:
+                item = json.loads(text)
+            except ValueError as e:
+                if on_error:
+                    on_error(index, str(e))
+            else:
+                yield item
+        index += 1
+        if scanner.expect(",]") == "]":
+            return
+
+def iter_records(path: str, fmt: Optional[str] = None, json_path: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from a JSON array, JSON Lines or CSV file (`json_path`: see iter_json_array)"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    with open(path, "r", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        if fmt in ("jsonl", "ndjson"):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"Skipping bad line {line_number} in {path}")
+        elif fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "json":
+            skip = lambda index, error: print(f"Skipping bad item {index} in {path}: {error}")
+            for item in iter_json_array(f, json_path, skip):
+                if isinstance(item, dict):
+                    yield item
+        else:
+            raise ValueError(f"Unsupported import format: {fmt}")
+
+# --- Normalization ---
+
+def normalize_statute(record: Dict[str, Any], default_act: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Map a raw statute record to the data/legal_codes section schema (plus its act name)"""
+    act = _first(record, ACT_KEYS) or default_act
+    number = _first(record, NUMBER_KEYS)
+    text = _first(record, TEXT_KEYS)
+    if not act or number is None or not text:
+        return None
+    section = {"act": _clean(act), "number": normalize_section(number), "text": _clean(text)}
+    title = _first(record, TITLE_KEYS)
+    if title:
+        section["title"] = _clean(title)
+    return section
+
+def normalize_precedent(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map a raw judgment record to the data/precedents.json schema"""
+    title = _first(record, CASE_TITLE_KEYS)
+    summary = _first(record, SUMMARY_KEYS)
+    if not title or not (summary or record.get("text")):
+        return None
+    precedent = {"title": _clean(title), "summary": _clean(summary or "")}
+    year = _first(record, ["year", "date", "decided_on", "judgment_date"])
+    if year:
+        match = re.search(r"\b(1[6-9]|20)\d\d\b", str(year))
+        if match:
+            precedent["year"] = int(match.group(0))
+    for field, keys in (("case_type", ["case_type", "type", "category"]),
+                        ("court", ["court", "court_name", "bench"]),
+                        ("url", ["url", "link", "source_url"]),
+                        ("citation", ["citation", "cite"])):
+        value = _first(record, keys)
+        if value:
+            precedent[field] = _clean(value)
+    principles = _as_list(record.get("principles"))
+    if principles:
+        precedent["principles"] = principles
+    if record.get("text"):
+        precedent["text"] = str(record["text"]).strip()
+    if record.get("id"):
+        precedent["id"] = str(record["id"])
+    return precedent
+
+def content_hash(record: Dict[str, Any]) -> bytes:
+    """sha256 of a normalized record, ignoring its id"""
+    canonical = json.dumps({k: v for k, v in record.items() if k != "id"}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).digest()
+
+class SeenHashes:
+    """On-disk set of imported content hashes, so memory stays flat on huge dumps"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.created = not os.path.exists(path)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (kind TEXT NOT NULL, hash BLOB NOT NULL, PRIMARY KEY (kind, hash))")
+
+    def __contains__(self, key: Tuple[str, bytes]) -> bool:
+        return self._conn.execute("SELECT 1 FROM seen WHERE kind = ? AND hash = ?", key).fetchone() is not None
+
+    def add(self, kind: str, digest: bytes) -> bool:
+        """Record a hash; False if it was already there"""
+        cursor = self._conn.execute("INSERT OR IGNORE INTO seen (kind, hash) VALUES (?, ?)", (kind, digest))
+        return cursor.rowcount == 1
+
+    def add_many(self, kind: str, digests: Iterable[bytes]):
+        self._conn.executemany("INSERT OR IGNORE INTO seen (kind, hash) VALUES (?, ?)", ((kind, d) for d in digests))
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        # Hashes are committed with the batch they belong to; anything else is dropped
+        self._conn.rollback()
+        self._conn.close()
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.time()
+        self.read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.time() - self.started, 1e-9)
+
+    @property
+    def records_per_second(self) -> float:
+        return self.read / self.elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "read": self.read,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "seconds": round(self.elapsed, 2),
+            "records_per_second": round(self.records_per_second, 1)
+        }
+
+    def __str__(self) -> str:
+        return (f"{self.read} read, {self.imported} imported, {self.duplicates} duplicates, "
+                f"{self.invalid} invalid in {self.elapsed:.1f}s ({self.records_per_second:.0f} records/s)")
+
+class _ActTable(StatuteStore):
+    """The acts and aliases of data/legal_codes without their sections, to file imported sections by act"""
+
+    def add_section(self, act_key: str, section: Dict[str, Any]):
+        pass
+
+class KnowledgeImporter:
+    """Streams statute and judgment dumps into the knowledge base files.
+
+    Records are read one at a time, normalized, deduplicated by content hash
+    and written in batches: statute sections are appended to one JSON Lines
+    file per act in data/legal_codes, precedents to the knowledge base's
+    journal with their full texts in the on-disk judgment store. Nothing
+    imported is kept in memory; running apps pick the records up from the
+    files, and closing the importer streams the journal into
+    data/precedents.json.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, batch_size: int = 1000):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        codes_dir = os.path.join(data_dir, "legal_codes")
+        self.journal = KnowledgeJournal(os.path.join(data_dir, "kb_journal.jsonl"))
+        self.seen = SeenHashes(os.path.join(data_dir, "index", "import_hashes.sqlite3"))
+        self.texts = JudgmentTextStore(judgment_store_path(data_dir))
+        if self.seen.created:
+            self._seed_seen(codes_dir)
+        self.acts = _ActTable(codes_dir)
+        self._act_files: Dict[str, TextIO] = {}
+
+    def _seed_seen(self, codes_dir: str):
+        # Records that were already in the knowledge base before the first import
+        for _, section in StatuteStore(codes_dir).sections.items():
+            normalized = normalize_statute(section)
+            if normalized:
+                self.seen.add("statute", content_hash(normalized))
+        journaled = (record for kind, record, _ in self.journal.replay() if kind == "precedent")
+        for precedent in itertools.chain(self._stored_precedents(), journaled):
+            normalized = normalize_precedent(precedent)
+            if normalized:
+                self.seen.add("precedent", content_hash(normalized))
+        self.seen.commit()
+
+    def _stored_precedents(self) -> Iterator[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.data_dir, "precedents.json"), "r", encoding="utf-8") as f:
+                yield from iter_json_array(f)
+        except FileNotFoundError:
+            return
+
+    def _act_file(self, act_key: str) -> TextIO:
+        slug = act_key.replace(" ", "_") or "imported"
+        fp = self._act_files.get(slug)
+        if fp is None:
+            codes_dir = os.path.join(self.data_dir, "legal_codes")
+            os.makedirs(codes_dir, exist_ok=True)
+            fp = self._act_files[slug] = open(os.path.join(codes_dir, f"{slug}.jsonl"), "a", encoding="utf-8")
+        return fp
+
+    def _flush_statutes(self, batch: List[Dict[str, Any]]):
+        for section in batch:
+            # Every alias of an act ("IPC", "Indian Penal Code, 1860") resolves to the same act key, and file
+            act_key = self.acts.add_act(section["act"], [])
+            self._act_file(act_key).write(json.dumps(section, ensure_ascii=False) + "\n")
+        for fp in self._act_files.values():
+            fp.flush()
+
+    def _flush_precedents(self, batch: List[Dict[str, Any]]):
+        texts = []
+        for precedent in batch:
+            precedent.setdefault("id", "IMP-" + content_hash(precedent).hex()[:12])
+            # The knowledge base keeps judgment metadata; bodies stay on disk
+            text = precedent.pop("text", None)
+            if text:
+                texts.append((precedent["id"], text))
+        self.texts.put_many(texts)
+        self.journal.append_many("precedent", batch)
+
+    def import_file(self, path: str, kind: str, fmt: Optional[str] = None, default_act: Optional[str] = None,
+                    progress: Optional[Callable[[ImportStats], None]] = None, progress_every: int = 10000,
+                    json_path: Optional[List[str]] = None) -> ImportStats:
+        """Import one file of statute sections (kind='statutes') or judgments (kind='precedents')"""
+        if kind == "statutes":
+            normalize = lambda record: normalize_statute(record, default_act)
+            flush = self._flush_statutes
+        elif kind == "precedents":
+            normalize = normalize_precedent
+            flush = self._flush_precedents
+        else:
+            raise ValueError(f"Unknown import kind: {kind}")
+
+        def flush_batch():
+            # Hashes are recorded only once their records are written, so a failed batch is not
+            # mistaken for imported on the next run
+            flush(batch)
+            self.seen.add_many(seen_kind, digests)
+            self.seen.commit()
+            stats.imported += len(batch)
+
+        seen_kind = kind.rstrip("s")
+        stats = ImportStats()
+        batch: List[Dict[str, Any]] = []
+        digests: Set[bytes] = set()
+        for record in iter_records(path, fmt, json_path):
+            stats.read += 1
+            normalized = normalize(record) if isinstance(record, dict) else None
+            digest = content_hash(normalized) if normalized is not None else None
+            if normalized is None:
+                stats.invalid += 1
+            elif digest in digests or (seen_kind, digest) in self.seen:
+                stats.duplicates += 1
+            else:
+                batch.append(normalized)
+                digests.add(digest)
+                if len(batch) >= self.batch_size:
+                    flush_batch()
+                    batch, digests = [], set()
+            if progress and stats.read % progress_every == 0:
+                progress(stats)
+        if batch:
+            flush_batch()
+        return stats
+
+    def compact(self):
+        """Fold the journal into data/precedents.json and data/legal_principles.json.
+
+        Does what KnowledgeBase compaction does, but streams precedents.json
+        and the journal into the new file instead of loading either.
+        """
+        # Entries of an interrupted compaction may already be in the JSON files
+        recovered = {json.dumps(record, sort_keys=True) for _, record in self.journal.recovered()}
+        if not self.journal.rotate():
+            return
+        written: Set[str] = set()
+        principles_path = os.path.join(self.data_dir, "legal_principles.json")
+        try:
+            with open(principles_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            principles = data.get("principles", []) if isinstance(data, dict) else data
+        except FileNotFoundError:
+            principles = []
+
+        def mark_written(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for record in records:
+                if recovered:
+                    key = json.dumps(record, sort_keys=True)
+                    if key in recovered:
+                        written.add(key)
+                yield record
+
+        def journaled(kind: str) -> Iterator[Dict[str, Any]]:
+            for entry_kind, record in self.journal.recovered():
+                if entry_kind == kind and json.dumps(record, sort_keys=True) not in written:
+                    yield record
+
+        principles = list(mark_written(principles))
+        try:
+            write_json_array_atomic(os.path.join(self.data_dir, "precedents.json"),
+                                    itertools.chain(mark_written(self._stored_precedents()), journaled("precedent")))
+            write_json_atomic(principles_path, {"principles": principles + list(journaled("principle"))})
+        except OSError as e:
+            # The rotated journal is kept and replayed on the next load
+            print(f"Error compacting knowledge base: {str(e)}")
+            return
+        self.journal.finish_compaction()
+
+    def close(self):
+        """Close the act files and fold the journaled precedents into data/precedents.json"""
+        for fp in self._act_files.values():
+            fp.close()
+        self._act_files = {}
+        try:
+            self.compact()
+        finally:
+            self.seen.close()
+            self.texts.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Import statute or judgment dumps into the knowledge base")
+    parser.add_argument("kind", choices=["statutes", "precedents"])
+    parser.add_argument("paths", nargs="+", help="JSON array, JSON Lines or CSV files")
+    parser.add_argument("--format", choices=["json", "jsonl", "csv"], default=None,
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--act", default=None, help="Act name for statute records that do not carry one")
+    parser.add_argument("--path", default=None, metavar="KEY[.KEY...]",
+                        help="Key of the array inside a JSON object (default: the top-level array, "
+                             "or the first array-valued key)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    importer = KnowledgeImporter(data_dir=args.data_dir, batch_size=args.batch_size)
+    try:
+        for path in args.paths:
+            stats = importer.import_file(path, args.kind, args.format, args.act,
+                                         progress=lambda s: print(f"  {s}", flush=True),
+                                         json_path=args.path.split(".") if args.path else None)
+            print(f"{path}: {stats}")
+    finally:
+        importer.close()
+    if os.path.exists(corpus_path(args.data_dir)):
+        # Otherwise the next start falls back to parsing the JSON files the import just rewrote
+        print("Rebuilding the compiled corpus", flush=True)
+        stats = build_corpus(args.data_dir)
+        print(f"Wrote {stats['path']}: {stats['sections']} sections, {stats['precedents']} precedents")
+
+if __name__ == "__main__":
+    main()
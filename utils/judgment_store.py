@@ -0,0 +1,66 @@
+# utils/judgment_store.py
+
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+JUDGMENT_STORE_FILE = "judgments.sqlite3"
+
+def judgment_store_path(data_dir: str) -> str:
+    return os.path.join(data_dir, JUDGMENT_STORE_FILE)
+
+class JudgmentTextStore:
+    """Full judgment texts on disk (zlib-compressed), keyed by precedent id.
+
+    The knowledge base keeps only judgment metadata in memory; a body is
+    read from here when it is needed, one judgment at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS judgments (id TEXT PRIMARY KEY, text BLOB NOT NULL)")
+        self._conn.commit()
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> int:
+        """Store (precedent id, text) pairs in one transaction. Returns the number stored."""
+        rows = [(str(pid), zlib.compress(text.encode("utf-8"))) for pid, text in items]
+        if rows:
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO judgments (id, text) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def get(self, precedent_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM judgments WHERE id = ?", (str(precedent_id),)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# One store per data directory, shared by every knowledge base snapshot in the process
+_stores: Dict[str, JudgmentTextStore] = {}
+_stores_lock = threading.Lock()
+
+def get_judgment_store(data_dir: str) -> Optional[JudgmentTextStore]:
+    """The shared store for a data directory, or None if nothing has been imported into it"""
+    path = judgment_store_path(data_dir)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None and os.path.exists(path):
+            store = _stores[path] = JudgmentTextStore(path)
+        return store
+
+def precedent_text(data_dir: str, precedent: Dict[str, Any]) -> str:
+    """Full text of a judgment: inline for hand-written precedents, from the judgment store for imported ones"""
+    if precedent.get("text"):
+        return precedent["text"]
+    store = get_judgment_store(data_dir)
+    if store is None or precedent.get("id") is None:
+        return ""
+    return store.get(precedent["id"]) or ""
@@ -0,0 +1,190 @@
+# utils/kb_journal.py
+
+import contextlib
+import json
+import os
+import tempfile
+import textwrap
+import threading
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+JOURNAL_PATH = os.path.join("data", "kb_journal.jsonl")
+
+@contextlib.contextmanager
+def _atomic_file(path: str) -> Iterator[TextIO]:
+    """A text file that replaces `path` atomically when the block completes, and is removed if it fails.
+
+    Each writer gets its own temporary file, so concurrent writers (the app,
+    the importer, the TTS warm-up) cannot clobber each other's output.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        # mkstemp files are private; keep the permissions the file had
+        try:
+            os.fchmod(fd, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_json_atomic(path: str, data: Any, indent: int = 4):
+    """Write a JSON file through a temporary file and an atomic rename, so readers never see a torn file"""
+    with _atomic_file(path) as f:
+        json.dump(data, f, indent=indent)
+
+def write_json_array_atomic(path: str, items: Iterable[Any], indent: int = 4):
+    """Like write_json_atomic for a list, written one item at a time so it never has to be in memory at once"""
+    prefix = " " * indent
+    with _atomic_file(path) as f:
+        separator = "[\n"
+        for item in items:
+            f.write(separator + textwrap.indent(json.dumps(item, indent=indent), prefix))
+            separator = ",\n"
+        f.write("[]" if separator == "[\n" else "\n]")
+
+def read_journal_tail(path: str, offset: int, inode: Optional[int] = None
+                      ) -> Tuple[List[Tuple[str, Dict[str, Any]]], int, Optional[int]]:
+    """(kind, record) entries of a journal file after byte `offset`, the offset after them and the file's inode.
+
+    Reading starts over from the beginning if the file was replaced since
+    `offset` was taken (a different `inode`, or a file shorter than the
+    offset). A line still being written is left for the next call.
+    """
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < offset or (inode is not None and stat.st_ino != inode):
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0, None
+    end = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:end].splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash is skipped
+            continue
+        entries.append((entry["kind"], entry["record"]))
+    return entries, offset + end, stat.st_ino
+
+class KnowledgeJournal:
+    """Append-only log of knowledge base additions.
+
+    Each addition is one JSON line {"kind": ..., "record": ...}, flushed and
+    fsynced before the call returns. The full JSON files are only rewritten
+    by compaction, which first rotates the journal to `<path>.compacting`
+    so that additions made while it runs go to a fresh journal.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self._lock = threading.Lock()
+        self._count = sum(1 for _ in self._read(self.path))
+
+    def append(self, kind: str, record: Dict[str, Any]):
+        self.append_many(kind, [record])
+
+    def append_many(self, kind: str, records: Iterable[Dict[str, Any]]) -> int:
+        """Append records with a single fsync. Returns the number written."""
+        lines = [json.dumps({"kind": kind, "record": record}, ensure_ascii=False) + "\n" for record in records]
+        if not lines:
+            return 0
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._count += len(lines)
+        return len(lines)
+
+    def replay(self) -> Iterator[Tuple[str, Dict[str, Any], bool]]:
+        """Yield (kind, record, recovered) for every journaled addition, oldest first.
+
+        `recovered` is True for entries from an interrupted compaction, which
+        may already be part of the JSON files.
+        """
+        for kind, record in self.recovered():
+            yield kind, record, True
+        for kind, record in self.tail(0)[0]:
+            yield kind, record, False
+
+    def recovered(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(kind, record) for the entries of an interrupted compaction"""
+        for entry in self._read(self.compacting_path):
+            yield entry["kind"], entry["record"]
+
+    def tail(self, offset: int) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """(kind, record) entries of the current journal after byte `offset`, and the offset after them.
+
+        Lets a reader pick up additions made since it last looked (by this or
+        another process) without replaying the whole journal.
+        """
+        entries, offset, _ = read_journal_tail(self.path, offset)
+        return entries, offset
+
+    def rotate(self) -> bool:
+        """Move the current journal aside for compaction. Returns False if it is empty."""
+        with self._lock:
+            if os.path.exists(self.compacting_path):
+                # A previous compaction did not finish; fold the new entries into it
+                with open(self.compacting_path, "a", encoding="utf-8") as out:
+                    out.writelines(self._lines(self.path))
+                    out.flush()
+                    os.fsync(out.fileno())
+                self._remove(self.path)
+            elif self._count:
+                os.replace(self.path, self.compacting_path)
+            else:
+                return False
+            self._count = 0
+            return True
+
+    def finish_compaction(self):
+        """Drop the rotated journal once its entries are in the JSON files"""
+        self._remove(self.compacting_path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _lines(path: str) -> Iterator[str]:
+        # Streamed, since a bulk import can journal more than fits in memory
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield line
+        except FileNotFoundError:
+            return
+
+    @classmethod
+    def _read(cls, path: str) -> Iterator[Dict[str, Any]]:
+        for line in cls._lines(path):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A line cut short by a crash is skipped
+                continue
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
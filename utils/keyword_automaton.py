@@ -0,0 +1,80 @@
+# utils/keyword_automaton.py
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton for matching many keywords in one pass.
+
+    Keywords are compiled into a trie with failure links; scanning a text
+    walks it once, character by character, and reports the owners of every
+    keyword that occurs as a substring. The cost of a scan depends on the
+    length of the text and the number of matches, not on how many keywords
+    are registered.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+        self._keywords: List[Tuple[str, Hashable]] = []
+        self._compiled = True
+
+    def add(self, keyword: str, owner: Hashable):
+        """Register a keyword; scans report `owner` when it is found"""
+        keyword = str(keyword).lower()
+        if not keyword:
+            return
+        self._keywords.append((keyword, owner))
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            node = child
+        self._output[node].add(owner)
+        self._compiled = False
+
+    def add_all(self, keywords: Iterable[str], owner: Hashable):
+        for keyword in keywords:
+            self.add(keyword, owner)
+
+    def compile(self):
+        """Compute failure links (breadth-first) and merge outputs along them"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] |= self._output[self._fail[child]]
+                queue.append(child)
+        self._compiled = True
+
+    def scan(self, text: str) -> Set[Hashable]:
+        """Owners of every keyword that occurs in the text (case-insensitive)"""
+        if not self._compiled:
+            self.compile()
+        found: Set[Hashable] = set()
+        node = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in str(text).lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+        return found
+
+    def __len__(self) -> int:
+        return len(self._keywords)
@@ -1,44 +1,217 @@
 # utils/knowledge_base.py
 
+import itertools
 import json
 import os
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from .corpus_mmap import (MappedCorpus, MappedPrecedents, MappedStatuteStore, corpus_path, open_corpus,
+                          precedent_sources, statute_sources)
+from .judgment_store import precedent_text
+from .kb_journal import KnowledgeJournal, write_json_array_atomic, write_json_atomic
+from .keyword_automaton import KeywordAutomaton
+from .search_index import InvertedIndex, LayeredIndex, document_text
+from .similarity import SimilarityEngine
+from .statute_store import StatuteStore, normalize_section
+
+PRINCIPLE_FIELDS = ["title", "description", "keywords", "key_principles"]
+PRECEDENT_FIELDS = ["title", "case_type", "summary", "principles"]
+STATUTE_FIELDS = ["act", "title", "text"]
+
+# Anchored to the package so the data is found whatever the working directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
 class KnowledgeBase:
-    def __init__(self):
+    def __init__(self, data_dir: str = DATA_DIR, compact_threshold: int = 100, read_only: bool = False):
+        self.data_dir = data_dir
+        self.precedents_path = os.path.join(data_dir, 'precedents.json')
+        self.principles_path = os.path.join(data_dir, 'legal_principles.json')
+        self.read_only = read_only
         self.precedents = []
         self.legal_principles = []
+        self.principles_by_id: Dict[str, Dict[str, Any]] = {}
+        self.principle_index = InvertedIndex()
+        self.precedent_index = InvertedIndex()
+        self.statute_index = InvertedIndex()
+        self.keyword_automaton = KeywordAutomaton()
+        self.similarity = SimilarityEngine(os.path.join(data_dir, 'index'))
+        self.statutes: Optional[StatuteStore] = None
+        self._similarity_stale = True
+        self.corpus: Optional[MappedCorpus] = None
+        # Additions go to an append-only journal; the JSON files are rewritten by compaction
+        self.journal = KnowledgeJournal(os.path.join(data_dir, 'kb_journal.jsonl'))
+        # Bytes of the current journal already applied to the in-memory records
+        self.journal_offset = 0
+        # Bumped whenever records are added in place, so caches of search results can tell
+        self.version = 0
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
         self.load_knowledge_base()
         
     def load_knowledge_base(self):
         """Load legal knowledge from JSON files"""
-        try:
-            with open('data/precedents.json', 'r') as f:
-                self.precedents = json.load(f)
-        except FileNotFoundError:
-            self.precedents = []
+        # A compiled corpus (python -m utils.corpus_mmap) replaces parsing and indexing the statute JSON
+        self.corpus = open_corpus(self.data_dir)
+        if self.corpus is not None and self.corpus.is_current('precedent', precedent_sources(self.data_dir)):
+            # ...and precedents.json: its rows are read from the mapped file as they are needed
+            self.precedents = MappedPrecedents(self.corpus)
+        else:
+            try:
+                with open(self.precedents_path, 'r') as f:
+                    self.precedents = json.load(f)
+            except FileNotFoundError:
+                self.precedents = []
             
         try:
-            with open('data/legal_principles.json', 'r') as f:
-                self.legal_principles = json.load(f)
+            with open(self.principles_path, 'r') as f:
+                data = json.load(f)
+            # The file wraps the list as {"principles": [...]}
+            self.legal_principles = data.get('principles', []) if isinstance(data, dict) else data
         except FileNotFoundError:
             self.legal_principles = []
+
+        self._replay_journal()
+        if self.corpus is not None:
+            self.statutes = MappedStatuteStore(self.corpus)
+        else:
+            self.statutes = StatuteStore(os.path.join(self.data_dir, 'legal_codes'))
+        self.build_indexes()
+
+    def build_indexes(self):
+        """Build the id lookup table and the search indexes"""
+        self._build_principle_indexes(self.legal_principles)
+        self._build_precedent_index()
+        if self.corpus is not None:
+            self.statute_index = self.corpus.statute_index()
+        else:
+            self.statute_index = InvertedIndex()
+            for key, section in self.statutes.sections.items():
+                self.statute_index.add(key, document_text(section, STATUTE_FIELDS))
+        self._similarity_stale = True
+
+    def _build_precedent_index(self):
+        # Built aside and then published, so readers never search a half-built index
+        if isinstance(self.precedents, MappedPrecedents):
+            # The compiled postings cover the corpus rows; only journaled precedents are indexed in memory
+            corpus = self.precedents.corpus
+            index = LayeredIndex(corpus.precedent_index())
+            rows = enumerate(self.precedents.added, corpus.precedent_count())
+        else:
+            index = InvertedIndex()
+            rows = enumerate(self.precedents)
+        for i, precedent in rows:
+            index.add(i, document_text(precedent, PRECEDENT_FIELDS))
+        self.precedent_index = index
+
+    def _build_principle_indexes(self, principles: List[Dict[str, Any]]):
+        principles_by_id = {}
+        index = InvertedIndex()
+        automaton = KeywordAutomaton()
+        for i, principle in enumerate(principles):
+            if principle.get('id') is not None:
+                principles_by_id[principle['id']] = principle
+            index.add(i, document_text(principle, PRINCIPLE_FIELDS))
+            automaton.add_all(principle.get('keywords', []), i)
+        automaton.compile()
+        # The list goes first, so an index never refers to a row the list does not have yet
+        self.legal_principles = principles
+        self.principles_by_id, self.principle_index, self.keyword_automaton = principles_by_id, index, automaton
+
+    def _replay_journal(self):
+        """Apply journaled additions that have not been compacted into the JSON files yet"""
+        written = None
+        for kind, record in self.journal.recovered():
+            # An interrupted compaction may already have written these records
+            if written is None:
+                written = {json.dumps(r, sort_keys=True) for r in itertools.chain(self.precedents, self.legal_principles)}
+            key = json.dumps(record, sort_keys=True)
+            if key in written:
+                continue
+            written.add(key)
+            self._append_record(kind, record)
+        entries, self.journal_offset = self.journal.tail(0)
+        for kind, record in entries:
+            self._append_record(kind, record)
+
+    def _append_record(self, kind: str, record: Dict[str, Any]):
+        if kind == 'precedent':
+            self.precedents.append(record)
+        elif kind == 'principle':
+            self.legal_principles.append(record)
+
+    def apply_journal(self) -> int:
+        """Apply journal entries written since the last load or call, by this or another process.
+
+        Records are added to the live lists and indexes in place, so readers of
+        this instance see them without a reload. Returns the number applied.
+        """
+        with self._lock:
+            entries, self.journal_offset = self.journal.tail(self.journal_offset)
+            precedents = [record for kind, record in entries if kind == 'precedent']
+            principles = [record for kind, record in entries if kind == 'principle']
+            if precedents:
+                start = len(self.precedents)
+                # Rows are appended before they are indexed, so a search never returns a missing row
+                self.precedents.extend(precedents)
+                for i, precedent in enumerate(precedents, start):
+                    self.precedent_index.add(i, document_text(precedent, PRECEDENT_FIELDS))
+            if principles:
+                # Few and small: rebuilt aside and swapped in, since the keyword automaton cannot grow in place
+                self._build_principle_indexes(self.legal_principles + principles)
+            if entries:
+                self._similarity_stale = True
+                self.version += 1
+            return len(entries)
             
     def get_section(self, section_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific legal section"""
-        for principle in self.legal_principles:
-            if principle.get('id') == section_id:
-                return principle
-        return None
+        return self.principles_by_id.get(section_id)
         
-    def search_principles(self, query: str) -> List[Dict[str, Any]]:
-        """Search for legal principles matching the query"""
-        return [
-            principle for principle in self.legal_principles
-            if query.lower() in principle.get('title', '').lower() or
-            query.lower() in principle.get('description', '').lower()
-        ]
+    def get_section_text(self, act_name: str, section_number: Any) -> Optional[str]:
+        """Get the text of a statute section, e.g. ("ICA", "2(h)") or ("Indian Evidence Act", 60)"""
+        return self.statutes.get_section_text(act_name, section_number)
+
+    def get_statute_section(self, act_name: str, section_number: Any) -> Optional[Dict[str, Any]]:
+        """Get a statute section record including its act name"""
+        return self.statutes.get_section(act_name, section_number)
+
+    def search_principles(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Search for legal principles matching the query, best matches first (BM25)"""
+        return [self.legal_principles[i] for i, _ in self.principle_index.search(query, top_k)]
+
+    def search_precedents(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Search for precedents matching the query, best matches first (BM25)"""
+        return [self.precedents[i] for i, _ in self.precedent_index.search(query, top_k)]
+
+    def search_statutes(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Search statute sections from data/legal_codes, best matches first (BM25)"""
+        return [self.statutes.sections[key] for key, _ in self.statute_index.search(query, top_k)]
         
+    def find_similar_precedents(self, case: Dict[str, Any], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Precedents whose summary and principles are most similar to a case's facts (TF-IDF cosine)"""
+        self._ensure_similarity()
+        return [self.precedents[i] for i, _ in self.similarity.similar_precedents(case, top_k)]
+
+    def find_similar_principles(self, case: Dict[str, Any], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Legal principles most similar to a case's facts (TF-IDF cosine)"""
+        self._ensure_similarity()
+        return [self.legal_principles[i] for i, _ in self.similarity.similar_principles(case, top_k)]
+
+    def _ensure_similarity(self):
+        # Built on first use after a change, so bulk additions pay for it once.
+        # TF-IDF matrices are read from data/index when the records have not changed.
+        with self._lock:
+            if self._similarity_stale:
+                self.similarity.build(self.precedents, self.legal_principles)
+                self._similarity_stale = False
+
+    def get_precedent_text(self, precedent: Dict[str, Any]) -> str:
+        """Full text of a judgment: inline for hand-written precedents, from the judgment store for imported ones"""
+        return precedent_text(self.data_dir, precedent)
+
     def get_relevant_precedents(self, case_type: str) -> List[Dict[str, Any]]:
         """Get precedents relevant to a case type"""
         return [
@@ -48,13 +221,56 @@ class KnowledgeBase:
         
     def add_precedent(self, precedent: Dict[str, Any]):
         """Add a new precedent"""
-        self.precedents.append(precedent)
-        self.save_knowledge_base()
-        
+        self.add_precedents([precedent])
+
+    def add_precedents(self, precedents: Iterable[Dict[str, Any]]) -> int:
+        """Add many precedents, persisted with a single journal write. Returns the number added."""
+        self._check_writable()
+        precedents = list(precedents)
+        if not precedents:
+            return 0
+        with self._lock:
+            self.journal.append_many('precedent', precedents)
+            self.apply_journal()
+        self._maybe_compact()
+        return len(precedents)
+
     def add_legal_principle(self, principle: Dict[str, Any]):
         """Add a new legal principle"""
-        self.legal_principles.append(principle)
-        self.save_knowledge_base()
+        self.add_legal_principles([principle])
+
+    def add_legal_principles(self, principles: Iterable[Dict[str, Any]]) -> int:
+        """Add many legal principles, persisted with a single journal write. Returns the number added."""
+        self._check_writable()
+        principles = list(principles)
+        if not principles:
+            return 0
+        with self._lock:
+            self.journal.append_many('principle', principles)
+            self.apply_journal()
+        self._maybe_compact()
+        return len(principles)
+
+    def add_statute_sections(self, sections: Iterable[Dict[str, Any]]) -> int:
+        """Index statute sections (each with an 'act' field) that were written to data/legal_codes"""
+        self._check_writable()
+        count = 0
+        with self._lock:
+            if self.corpus is not None:
+                # The compiled corpus is now stale; fall back to the JSON files, which include the new sections
+                self.corpus = None
+                self.statutes = StatuteStore(os.path.join(self.data_dir, 'legal_codes'))
+                self.statute_index = InvertedIndex()
+                for key, section in self.statutes.sections.items():
+                    self.statute_index.add(key, document_text(section, STATUTE_FIELDS))
+            for section in sections:
+                act_key = self.statutes.add_act(section['act'], [])
+                self.statutes.add_section(act_key, {k: v for k, v in section.items() if k != 'act'})
+                key = (act_key, normalize_section(section['number']))
+                self.statute_index.add(key, document_text(self.statutes.sections[key], STATUTE_FIELDS))
+                count += 1
+            self.version += 1
+        return count
         
     def get_legal_advice(self, case_facts: Dict[str, Any]) -> Dict[str, Any]:
         """Get legal advice based on case facts"""
@@ -62,18 +278,19 @@ class KnowledgeBase:
         applicable_precedents = []
         legal_principles = []
         
-        # Find relevant sections
-        for principle in self.legal_principles:
-            if any(keyword in case_facts.get('description', '').lower()
-                  for keyword in principle.get('keywords', [])):
-                relevant_sections.append(principle)
+        # Find relevant sections with a single pass over the description
+        matches = self.keyword_automaton.scan(case_facts.get('description', ''))
+        relevant_sections = [self.legal_principles[i] for i in sorted(matches)]
                 
         # Find applicable precedents
         applicable_precedents = self.get_relevant_precedents(case_facts.get('case_type', ''))
+        if not applicable_precedents:
+            # Broad case types like "Civil" match nothing by name; rank by the facts instead
+            applicable_precedents = self.find_similar_precedents(case_facts)
         
         # Extract legal principles
         for section in relevant_sections:
-            legal_principles.extend(section.get('principles', []))
+            legal_principles.extend(section.get('key_principles', section.get('principles', [])))
             
         return {
             'relevant_sections': relevant_sections,
@@ -81,23 +298,193 @@ class KnowledgeBase:
             'legal_principles': legal_principles
         }
         
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("The shared knowledge base snapshot is read-only; add records through shared_knowledge_base")
+
     def save_knowledge_base(self):
         """Save the knowledge base to JSON files"""
-        os.makedirs('data', exist_ok=True)
-        
-        with open('data/precedents.json', 'w') as f:
-            json.dump(self.precedents, f, indent=4)
-            
-        with open('data/legal_principles.json', 'w') as f:
-            json.dump(self.legal_principles, f, indent=4)
+        self._compact(force=True)
+
+    def compact(self, wait: bool = False):
+        """Fold the journal into the JSON files, in a background thread unless `wait` is set"""
+        if wait:
+            self._compact()
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self._compact, daemon=True)
+            self._compactor.start()
+
+    def _maybe_compact(self):
+        if len(self.journal) >= self.compact_threshold:
+            self.compact()
+
+    def _compact(self, force: bool = False):
+        with self._compact_lock:
+            with self._lock:
+                # Pick up entries other processes journaled, so the rewrite does not drop them
+                self.apply_journal()
+                # Later additions go to a fresh journal and are not part of this snapshot
+                if not self.journal.rotate() and not force:
+                    return
+                self.journal_offset = 0
+                # Additions only ever append, so this prefix is a stable snapshot to stream from
+                precedents, count = self.precedents, len(self.precedents)
+                principles = list(self.legal_principles)
+            try:
+                write_json_array_atomic(self.precedents_path, (precedents[i] for i in range(count)))
+                write_json_atomic(self.principles_path, {'principles': principles})
+            except OSError as e:
+                # The rotated journal is kept and replayed on the next load
+                print(f"Error compacting knowledge base: {str(e)}")
+                return
+            self.journal.finish_compaction()
+
+class SharedKnowledgeBase:
+    """One read-only knowledge base snapshot shared by every session and agent.
+
+    Readers get the current snapshot without locking. When the data files
+    change on disk (checked at most every `check_interval` seconds), the
+    first reader to notice updates it while the others keep reading: new
+    journal entries are applied to the live snapshot in place, and only a
+    change to the other files loads a new snapshot and swaps it in.
+    Additions are journaled and applied the same way; compaction runs in a
+    background thread.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = 2.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._snapshot: Optional[KnowledgeBase] = None
+        self._signature: Tuple = ()
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+    def journal_path(self) -> str:
+        return os.path.join(self.data_dir, 'kb_journal.jsonl')
 
-# Create a global instance
-knowledge_base = KnowledgeBase()
+    def signature(self) -> Tuple:
+        """(path, mtime, size) of every file the knowledge base is loaded from"""
+        paths = [
+            os.path.join(self.data_dir, 'precedents.json'),
+            os.path.join(self.data_dir, 'legal_principles.json'),
+            self.journal_path(),
+            os.path.join(self.data_dir, 'kb_journal.jsonl.compacting'),
+            corpus_path(self.data_dir)
+        ] + sorted(statute_sources(self.data_dir))
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                continue
+        return tuple(signature)
+
+    def get(self) -> KnowledgeBase:
+        """The current snapshot, updated first if the files have changed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._load()
+                return self._snapshot
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            # Only one thread updates; the others keep reading the snapshot as it is
+            if self._reload_lock.acquire(blocking=False):
+                try:
+                    self._checked_at = time.monotonic()
+                    self._refresh()
+                finally:
+                    self._reload_lock.release()
+        return self._snapshot
+
+    def reload(self) -> KnowledgeBase:
+        """Load a fresh snapshot now"""
+        with self._reload_lock:
+            self._load()
+            return self._snapshot
+
+    def _load(self):
+        signature = self.signature()
+        # Build the new snapshot completely before publishing it
+        self._snapshot = KnowledgeBase(self.data_dir, read_only=True)
+        self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _refresh(self):
+        """Bring the snapshot up to date with the files (called with the reload lock held)"""
+        if self._compacting():
+            # The JSON files are being rewritten from this snapshot; only new journal entries are news.
+            # The compactor records the signature when it is done.
+            self._snapshot.apply_journal()
+            return
+        signature = self.signature()
+        if signature == self._signature:
+            return
+        journal = self.journal_path()
+        if ([entry for entry in signature if entry[0] != journal] == [entry for entry in self._signature if entry[0] != journal]
+                and any(entry[0] == journal for entry in signature)):
+            # Only the journal grew: apply its new entries instead of loading everything again
+            self._snapshot.apply_journal()
+            self._signature = signature
+        else:
+            self._load()
+
+    def add_precedents(self, precedents: Iterable[Dict[str, Any]]) -> int:
+        """Journal new precedents and apply them to the shared snapshot"""
+        return self._add('precedent', precedents)
+
+    def add_legal_principles(self, principles: Iterable[Dict[str, Any]]) -> int:
+        """Journal new legal principles and apply them to the shared snapshot"""
+        return self._add('principle', principles)
+
+    def _add(self, kind: str, records: Iterable[Dict[str, Any]]) -> int:
+        with self._reload_lock:
+            if self._snapshot is None:
+                self._load()
+            snapshot = self._snapshot
+            count = snapshot.journal.append_many(kind, records)
+            if not count:
+                return 0
+            self._refresh()
+            if len(snapshot.journal) >= snapshot.compact_threshold and not self._compacting():
+                self._compactor = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+                self._compactor.start()
+            return count
+
+    def _compact(self, snapshot: KnowledgeBase):
+        # The snapshot holds every journaled record, so it can be written out as is
+        snapshot._compact()
+        with self._reload_lock:
+            if self._snapshot is snapshot:
+                # The rewrite does not change the contents, so it must not trigger a reload;
+                # entries journaled while it ran are applied before the files are marked as seen
+                signature = self.signature()
+                snapshot.apply_journal()
+                self._signature = signature
+
+# Process-wide shared instance
+shared_knowledge_base = SharedKnowledgeBase()
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Get the shared, read-only knowledge base snapshot"""
+    return shared_knowledge_base.get()
 
 def load_laws():
-    """Load laws using the global knowledge base instance"""
-    knowledge_base.load_knowledge_base()
+    """Reload the shared knowledge base"""
+    shared_knowledge_base.reload()
 
 def get_legal_advice(case_facts: Dict[str, Any]) -> Dict[str, Any]:
-    """Get legal advice using the global knowledge base instance"""
-    return knowledge_base.get_legal_advice(case_facts)
+    """Get legal advice using the shared knowledge base"""
+    return get_knowledge_base().get_legal_advice(case_facts)
+
+def get_section_text(act_name: str, section_number: Any) -> Optional[str]:
+    """Get the text of a statute section using the shared knowledge base"""
+    return get_knowledge_base().get_section_text(act_name, section_number)
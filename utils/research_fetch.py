@@ -0,0 +1,172 @@
+# utils/research_fetch.py
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .knowledge_base import DATA_DIR
+
+CACHE_DIR = os.path.join(DATA_DIR, "index", "research_cache")
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Version/13.1.2 Safari/537.36"
+
+def normalize_query(query: str, year: Any = "") -> str:
+    """Cache key for a search: lowercase words plus the year, so spacing and case do not matter"""
+    words = re.findall(r"\w+", str(query).lower())
+    return f"{' '.join(words)}|{str(year or '').strip()}"
+
+class ResearchCache:
+    """On-disk cache of fetched pages and parsed results, with a TTL and a size cap.
+
+    Entries are JSON files named by the hash of their key. A hit refreshes
+    the file's mtime, so eviction (oldest mtime first) is least recently used.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = 7 * 24 * 3600, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                try:
+                    self._sizes[name] = os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    continue
+        self._total = sum(self._sizes.values())
+
+    def _name(self, namespace: str, key: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{key}".encode("utf-8")).hexdigest() + ".json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        name = self._name(namespace, key)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl or entry.get("key") != key:
+            self._remove(name)
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry["value"]
+
+    def put(self, namespace: str, key: str, value: Any):
+        name = self._name(namespace, key)
+        data = json.dumps({"key": key, "stored_at": time.time(), "value": value}, ensure_ascii=False).encode("utf-8")
+        path = os.path.join(self.directory, name)
+        try:
+            # A unique temporary file per writer, so threads and processes sharing the cache never collide
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{name}.", suffix=".tmp")
+            try:
+                os.fchmod(fd, 0o644)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            print(f"Error writing research cache entry: {str(e)}")
+            return
+        with self._lock:
+            self._total += len(data) - self._sizes.get(name, 0)
+            self._sizes[name] = len(data)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        with self._lock:
+            names = list(self._sizes)
+        entries = []
+        for name in names:
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+            except OSError:
+                self._forget(name)
+        # Drop least recently used entries until the cache is at 90% of its cap
+        for _, name in sorted(entries):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            self._remove(name)
+
+    def _remove(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+        self._forget(name)
+
+    def _forget(self, name: str):
+        with self._lock:
+            self._total -= self._sizes.pop(name, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._sizes), "bytes": self._total, "hits": self.hits, "misses": self.misses}
+
+class ResearchFetcher:
+    """Shared HTTP client for legal research: one pooled session, timeouts, retries and a response cache"""
+
+    def __init__(self, cache: Optional[ResearchCache] = None, pool_size: int = 8,
+                 timeout: Tuple[float, float] = (3.05, 10.0), retries: int = 2):
+        self.cache = cache or ResearchCache()
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["GET"]))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_text(self, url: str, use_cache: bool = True) -> str:
+        """GET a page through the pooled session, served from the response cache when fresh"""
+        if use_cache:
+            cached = self.cache.get("response", url)
+            if cached is not None:
+                return cached
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        if use_cache:
+            self.cache.put("response", url, response.text)
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+# Global instance shared by every session
+_fetcher: Optional[ResearchFetcher] = None
+_fetcher_lock = threading.Lock()
+
+def get_research_fetcher() -> ResearchFetcher:
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ResearchFetcher()
+        return _fetcher
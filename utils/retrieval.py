@@ -0,0 +1,187 @@
+# utils/retrieval.py
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .knowledge_base import KnowledgeBase, get_knowledge_base
+
+# Procedural terms for what each kind of turn argues about; the substantive
+# terms come from the case itself (see case_terms)
+PHASE_TERMS = {
+    "opening": "suit claim cause of action jurisdiction",
+    "examination": "oral evidence witness examination-in-chief",
+    "cross_examination": "cross-examination witness credibility contradiction",
+    "testimony": "oral evidence witness",
+    "evidence": "evidence documentary proof electronic record",
+    "objection": "evidence relevance admissible leading question",
+    "closing": "burden of proof liability relief",
+    "judgment": "relief decree finding burden of proof"
+}
+
+# Vocabulary of the statutes and precedents for each kind of case, matched
+# against the case type and description
+CASE_TYPE_TERMS = {
+    "contract": "contract agreement breach damages compensation",
+    "commercial": "contract agreement breach damages compensation",
+    "specific performance": "specific performance contract agreement",
+    "property": "property possession title ownership transfer",
+    "injunction": "injunction restraint possession",
+    "family": "marriage maintenance custody divorce",
+    "consumer": "consumer deficiency service unfair trade practice compensation",
+    "tort": "negligence duty care damages compensation",
+    "negligence": "negligence duty care damages compensation",
+    "criminal": "offence accused prosecution guilt punishment",
+    "cheque": "cheque dishonour negotiable instrument",
+    "defamation": "defamation reputation imputation"
+}
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def _clip(text: str, max_words: int) -> str:
+    words = str(text).split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return " ".join(words[:max_words]) + " ..."
+
+def format_case_brief(case: Dict[str, Any]) -> str:
+    """Compact description of a case for prompts, instead of dumping the whole dict"""
+    parties = case.get("parties") or {}
+    plaintiff = parties.get("plaintiff", case.get("plaintiff", "Unknown"))
+    defendant = parties.get("defendant", case.get("defendant", "Unknown"))
+    lines = [
+        f"Title: {case.get('title', 'Untitled')}",
+        f"Type: {case.get('case_type', case.get('type', 'Unknown'))}",
+        f"Plaintiff: {plaintiff}; Defendant: {defendant}",
+        f"Description: {case.get('description', '')}"
+    ]
+    if case.get("facts"):
+        lines.append(f"Facts: {case['facts']}")
+    evidence = [e.get("description", str(e)) if isinstance(e, dict) else str(e) for e in case.get("evidence", [])]
+    if evidence:
+        lines.append("Evidence: " + "; ".join(evidence))
+    witnesses = [
+        f"{w.get('name', 'Witness')} ({w.get('role', 'witness')})" if isinstance(w, dict) else str(w)
+        for w in case.get("witnesses", [])
+    ]
+    if witnesses:
+        lines.append("Witnesses: " + "; ".join(witnesses))
+    return "\n".join(lines)
+
+class LegalRetriever:
+    """Picks the statute sections and precedents most relevant to an agent turn.
+
+    Results are ranked with the knowledge base's BM25 indexes, trimmed to a
+    token budget and cached per (case, phase). Without an explicit knowledge
+    base the shared snapshot is used. The cache is dropped when a new
+    snapshot is published or records are added to the current one.
+    """
+
+    def __init__(self, kb: KnowledgeBase = None, top_k_sections: int = 3, top_k_precedents: int = 2,
+                 token_budget: int = 350, snippet_words: int = 60, cache_size: int = 256):
+        self._kb = kb
+        # The knowledge base and its version the cached results were retrieved from
+        self._cache_state: Optional[Tuple[KnowledgeBase, int]] = None
+        self.top_k_sections = top_k_sections
+        self.top_k_precedents = top_k_precedents
+        self.token_budget = token_budget
+        self.snippet_words = snippet_words
+        self.cache_size = cache_size
+        # (case key, phase) -> retrieval result, least recently used first
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def kb(self) -> KnowledgeBase:
+        return self._kb or get_knowledge_base()
+
+    @staticmethod
+    def case_key(case: Dict[str, Any]) -> str:
+        # Custom cases all share the id "custom", so key on the content
+        return hashlib.sha1(json.dumps(case, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def case_terms(case: Dict[str, Any]) -> str:
+        """Statute vocabulary for the kind of case, from its type and description"""
+        text = f"{case.get('case_type', case.get('type', ''))} {case.get('title', '')} {case.get('description', '')}".lower()
+        terms = [words for kind, words in CASE_TYPE_TERMS.items() if kind in text]
+        return " ".join(dict.fromkeys(" ".join(terms).split()))
+
+    def build_query(self, case: Dict[str, Any], phase: str) -> str:
+        evidence = [e.get("description", "") if isinstance(e, dict) else str(e) for e in case.get("evidence", [])]
+        parts = [
+            case.get("title", ""),
+            case.get("case_type", case.get("type", "")),
+            case.get("description", ""),
+            str(case.get("facts", "")),
+            " ".join(evidence),
+            self.case_terms(case),
+            PHASE_TERMS.get(phase, "")
+        ]
+        return " ".join(part for part in parts if part)
+
+    def retrieve(self, case: Dict[str, Any], phase: str) -> Dict[str, Any]:
+        """Get the snippets for a case and phase (cached)"""
+        kb = self.kb
+        # Read before searching, so a result is never cached against additions it did not see
+        state = (kb, kb.version)
+        key = (self.case_key(case), phase)
+        with self._lock:
+            if state != self._cache_state:
+                self._cache.clear()
+                self._cache_state = state
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        query = self.build_query(case, phase)
+        sections = kb.search_statutes(query, self.top_k_sections)
+        precedents = kb.search_precedents(query, self.top_k_precedents)
+
+        snippets, used = [], 0
+        candidates = [
+            f"{s['act']}, Section {s['number']}: {_clip(s.get('text', ''), self.snippet_words)}"
+            for s in sections
+        ] + [
+            f"{p.get('title')} ({p.get('year', 'n.d.')}): {_clip(p.get('summary', ''), self.snippet_words)}"
+            for p in precedents
+        ]
+        for snippet in candidates:
+            cost = estimate_tokens(snippet)
+            if used + cost > self.token_budget:
+                continue
+            snippets.append(snippet)
+            used += cost
+
+        result = {"snippets": snippets, "tokens": used, "query": query}
+        with self._lock:
+            if state != self._cache_state:
+                return result
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def format_context(self, case: Dict[str, Any], phase: str) -> str:
+        """Prompt block with the case brief and the retrieved legal material"""
+        snippets = self.retrieve(case, phase)["snippets"]
+        context = f"Case Brief:\n{format_case_brief(case)}\n"
+        if snippets:
+            context += "\nRelevant Law and Precedents (cite only these when referring to law):\n"
+            context += "\n".join(f"- {snippet}" for snippet in snippets) + "\n"
+        return context
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+# Global instance shared by all agents
+legal_retriever = LegalRetriever()
+
+def get_legal_context(case: Dict[str, Any], phase: str) -> str:
+    """Get the retrieval-augmented prompt context using the global retriever"""
+    return legal_retriever.format_context(case, phase)
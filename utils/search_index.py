@@ -0,0 +1,149 @@
+# utils/search_index.py
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "to", "was", "were", "which", "with"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase a text and split it into search terms"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class CorpusStats:
+    """BM25 collection statistics: document count, total length and document frequency per term.
+
+    Passed to the search of several indexes so they score as one collection.
+    """
+
+    def __init__(self, doc_count: int, total_length: int, document_frequency: Callable[[str], int]):
+        self.doc_count = doc_count
+        self.total_length = total_length
+        self.document_frequency = document_frequency
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 0.0
+
+    def idf(self, term: str) -> float:
+        frequency = self.document_frequency(term)
+        return math.log(1 + (self.doc_count - frequency + 0.5) / (frequency + 0.5))
+
+class InvertedIndex:
+    """In-memory inverted index with BM25 ranking.
+
+    Documents are added as text under a hashable id; a query only touches
+    the posting lists of its own terms, so search cost grows with the number
+    of matching documents rather than with the size of the corpus.
+    Searches may run while one writer adds documents.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.doc_lengths: Dict[Hashable, int] = {}
+        self.doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: Hashable, text: str):
+        """Index a document, replacing any earlier version with the same id"""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        # The length goes in before the postings, so a concurrent search can score every posting it sees
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = tuple(terms)
+        self.total_length += length
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+
+    def remove(self, doc_id: Hashable):
+        """Remove a document from the index"""
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.doc_terms.pop(doc_id, ()):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def stats(self) -> CorpusStats:
+        return CorpusStats(len(self.doc_lengths), self.total_length, self.document_frequency)
+
+    def search(self, query: str, top_k: int = 10, stats: Optional[CorpusStats] = None) -> List[Tuple[Hashable, float]]:
+        """Rank documents against a query and return the top-k (doc_id, score) pairs.
+
+        `stats` replaces this index's own collection statistics, e.g. with
+        those of several indexes searched together.
+        """
+        if not self.doc_lengths:
+            return []
+        stats = stats or self.stats()
+        avg_length = stats.avg_length or 1.0
+        scores: Dict[Hashable, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = stats.idf(term)
+            for doc_id, frequency in list(postings.items()):
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+class LayeredIndex:
+    """A read-only base index (e.g. the compiled corpus) plus an in-memory index of later additions.
+
+    Both layers are scored with the statistics of the two together, so the
+    merged ranking is the one a single index over all documents would give.
+    """
+
+    def __init__(self, base, added: InvertedIndex = None):
+        self.base = base
+        self.added = added or InvertedIndex()
+
+    def add(self, doc_id: Hashable, text: str):
+        self.added.add(doc_id, text)
+
+    def stats(self) -> CorpusStats:
+        return CorpusStats(
+            len(self.base) + len(self.added),
+            self.base.total_length + self.added.total_length,
+            lambda term: self.base.document_frequency(term) + self.added.document_frequency(term)
+        )
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[Hashable, float]]:
+        stats = self.stats()
+        results = self.base.search(query, top_k, stats) + self.added.search(query, top_k, stats)
+        return heapq.nlargest(top_k, results, key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.added)
+
+def document_text(record: Dict[str, Any], fields: Iterable[str]) -> str:
+    """Flatten the given fields of a record (strings or lists of strings) into one text"""
+    parts = []
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(item) for item in value)
+        elif value is not None:
+            parts.append(str(value))
+    return " ".join(parts)
@@ -0,0 +1,179 @@
+# utils/similarity.py
+
+import hashlib
+import math
+import os
+import tempfile
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .search_index import document_text, tokenize
+
+INDEX_DIR = os.path.join("data", "index")
+
+def corpus_fingerprint(texts: List[str]) -> str:
+    """Hash of the documents a matrix was built from, used to detect stale files"""
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class TfidfMatrix:
+    """Documents embedded as L2-normalized TF-IDF rows, stored sparsely.
+
+    Only non-zero weights are kept, compressed by term: the documents
+    containing term t are `indices[indptr[t]:indptr[t + 1]]`, with their
+    weights at the same positions in `data`. Scoring a query touches only
+    the postings of its own terms and gives the cosine similarity of every
+    document to the query.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, indptr: np.ndarray,
+                 indices: np.ndarray, data: np.ndarray, n_rows: int, fingerprint: str):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_rows = n_rows
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "TfidfMatrix":
+        """Embed a list of documents"""
+        vocabulary: Dict[str, int] = {}
+        rows, columns, weights = array("i"), array("i"), array("f")
+        for row, text in enumerate(texts):
+            for term, frequency in Counter(tokenize(text)).items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                weights.append(1.0 + math.log(frequency))
+        rows = np.frombuffer(rows, dtype=np.int32)
+        columns = np.frombuffer(columns, dtype=np.int32)
+        weights = np.frombuffer(weights, dtype=np.float32).copy()
+
+        # Smoothed idf, as in most TF-IDF implementations
+        document_frequency = np.bincount(columns, minlength=len(vocabulary)).astype(np.float32)
+        idf = np.log((1.0 + len(texts)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+        weights *= idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=len(texts)))
+        norms[norms == 0] = 1.0
+        weights /= norms[rows].astype(np.float32)
+
+        # Group the entries by term
+        order = np.argsort(columns, kind="stable")
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency.astype(np.int64), out=indptr[1:])
+        return cls(vocabulary, idf, indptr, rows[order], weights[order], len(texts), corpus_fingerprint(texts))
+
+    def query_weights(self, text: str) -> List[Tuple[int, float]]:
+        """(term column, weight) pairs of a query embedded in the same space as the documents"""
+        weights = []
+        for term, frequency in Counter(tokenize(text)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                weights.append((column, (1.0 + math.log(frequency)) * float(self.idf[column])))
+        norm = math.sqrt(sum(weight * weight for _, weight in weights))
+        return [(column, weight / norm) for column, weight in weights] if norm else []
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of the text to every document"""
+        scores = np.zeros(self.n_rows, dtype=np.float32)
+        for column, weight in self.query_weights(text):
+            start, stop = self.indptr[column], self.indptr[column + 1]
+            # A document appears at most once per term, so the scatter-add has no repeats
+            scores[self.indices[start:stop]] += weight * self.data[start:stop]
+        return scores
+
+    def top_k(self, text: str, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """(row, score) pairs of the best matching documents, best first"""
+        scores = self.scores(text)
+        if not len(scores):
+            return []
+        top_k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(row), float(scores[row])) for row in ranked if scores[row] > min_score]
+
+    def save(self, path: str):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        # A private temporary file, so concurrent builders cannot clobber each other's output
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, indptr=self.indptr, indices=self.indices, data=self.data, idf=self.idf,
+                         n_rows=np.array(self.n_rows), terms=np.array(terms, dtype=str),
+                         fingerprint=np.array(self.fingerprint))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfMatrix":
+        with np.load(path, allow_pickle=False) as data:
+            vocabulary = {str(term): column for column, term in enumerate(data["terms"])}
+            return cls(vocabulary, data["idf"], data["indptr"], data["indices"], data["data"],
+                       int(data["n_rows"]), str(data["fingerprint"]))
+
+def load_or_build(name: str, texts: List[str], index_dir: str = INDEX_DIR) -> TfidfMatrix:
+    """Load a persisted matrix if it was built from the same texts, otherwise build and save it"""
+    path = os.path.join(index_dir, f"{name}.npz")
+    fingerprint = corpus_fingerprint(texts)
+    if os.path.exists(path):
+        try:
+            matrix = TfidfMatrix.load(path)
+            if matrix.fingerprint == fingerprint:
+                return matrix
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading similarity index {path}: {str(e)}")
+    matrix = TfidfMatrix.build(texts)
+    try:
+        matrix.save(path)
+    except OSError as e:
+        print(f"Error saving similarity index {path}: {str(e)}")
+    return matrix
+
+def case_text(case: Dict[str, Any]) -> str:
+    """The parts of a case that describe what it is about"""
+    facts = case.get("facts", "")
+    if isinstance(facts, (list, tuple)):
+        facts = " ".join(str(fact) for fact in facts)
+    return " ".join(str(part) for part in (case.get("title", ""), case.get("description", ""), facts) if part)
+
+class SimilarityEngine:
+    """TF-IDF similarity over the knowledge base's precedents and principles"""
+
+    PRECEDENT_FIELDS = ["title", "summary", "principles"]
+    PRINCIPLE_FIELDS = ["title", "description", "key_principles"]
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        self.precedents: Optional[TfidfMatrix] = None
+        self.principles: Optional[TfidfMatrix] = None
+
+    def build(self, precedents: List[Dict[str, Any]], principles: List[Dict[str, Any]]):
+        """(Re)load or build both matrices for the given records"""
+        self.precedents = load_or_build(
+            "precedents", [document_text(p, self.PRECEDENT_FIELDS) for p in precedents], self.index_dir)
+        self.principles = load_or_build(
+            "principles", [document_text(p, self.PRINCIPLE_FIELDS) for p in principles], self.index_dir)
+
+    def similar_precedents(self, case: Dict[str, Any], top_k: int = 5, min_score: float = 0.05) -> List[Tuple[int, float]]:
+        if self.precedents is None:
+            return []
+        return self.precedents.top_k(case_text(case), top_k, min_score)
+
+    def similar_principles(self, case: Dict[str, Any], top_k: int = 5, min_score: float = 0.05) -> List[Tuple[int, float]]:
+        if self.principles is None:
+            return []
+        return self.principles.top_k(case_text(case), top_k, min_score)
@@ -9,9 +9,9 @@ import random
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from .knowledge_base import KnowledgeBase
 from .tts import TTSEngine
 from .stt import STTEngine
+from .transcript_store import open_transcript_store
 from agents.witness_agent import WitnessAgent
 import json
 import os
@@ -22,12 +22,12 @@ class Simulation:
         self.state = {
             'status': 'not_started',
             'current_phase': None,
-            'transcript': [],
+            'transcript': open_transcript_store(),
             'evidence_presented': [],
             'objections': [],
             'active_speaker': None
         }
-        self.knowledge_base = knowledge_base.KnowledgeBase()
+        self.knowledge_base = knowledge_base.get_knowledge_base()
     
     def start(self):
         """Start the simulation"""
@@ -40,14 +40,15 @@ class Simulation:
         """End the simulation"""
         self.state['status'] = 'completed'
         self.add_to_transcript("Judge", "Court is adjourned")
+        self.close()
+    
+    def close(self):
+        """Release the transcript file (it can still be read)"""
+        self.state['transcript'].close()
     
     def add_to_transcript(self, speaker: str, content: str):
         """Add an entry to the transcript"""
-        self.state['transcript'].append({
-            'speaker': speaker,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        })
+        self.state['transcript'].append(speaker, content, datetime.now().isoformat())
     
     def present_evidence(self, evidence_id: str, presenter: str):
         """Present evidence in court"""
@@ -96,7 +97,7 @@ class Simulation:
     
     def save_state(self, filepath: str):
         """Save the simulation state to a file"""
-        state = self.get_state()
+        state = {**self.get_state(), 'transcript': self.state['transcript'].to_list()}
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         with open(filepath, 'w') as f:
             json.dump(state, f, indent=4)
@@ -105,7 +106,11 @@ class Simulation:
         """Load the simulation state from a file"""
         with open(filepath, 'r') as f:
             state = json.load(f)
-        self.state = state
+        self.close()
+        transcript = open_transcript_store()
+        for entry in state.get('transcript', []):
+            transcript.append(**entry)
+        self.state = {**state, 'transcript': transcript}
         self.case_data = state['case_info']
 
 def run_simulation(case_data: dict, llm_provider: str = "OpenAI", user_role: str = None):
@@ -0,0 +1,219 @@
+# utils/statute_store.py
+
+import glob
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+LEGAL_CODES_DIR = os.path.join("data", "legal_codes")
+
+# Common short forms that cannot be derived from the act name
+KNOWN_ALIASES = {
+    "cpc": "code of civil procedure",
+    "civil procedure code": "code of civil procedure",
+    "ica": "indian contract act",
+    "contract act": "indian contract act",
+    "iea": "indian evidence act",
+    "evidence act": "indian evidence act",
+    "ipc": "indian penal code",
+    "penal code": "indian penal code",
+    "bns": "bharatiya nyaya sanhita",
+    "bsa": "bharatiya sakshya adhiniyam",
+    "crpc": "code of criminal procedure",
+}
+
+SECTION_PREFIX = re.compile(r"^(section|sec\.?|s\.)\s*", re.IGNORECASE)
+SECTION_PART = re.compile(r"\(([^()]*)\)|([^()]+)")
+SKIP_WORDS = {"of", "the", "and", "for"}
+
+def normalize_act_name(name: str) -> str:
+    """Lowercase an act name and drop punctuation and the year"""
+    name = re.sub(r"[^a-z0-9 ]", " ", str(name).lower())
+    name = re.sub(r"\b(1[89]|20)\d\d\b", " ", name)
+    return " ".join(name.split())
+
+def normalize_section(number: Any) -> str:
+    """Normalize a section number: 73 -> '73', 'Section 2 (h)' -> '2(h)'"""
+    number = SECTION_PREFIX.sub("", str(number).strip())
+    return re.sub(r"\s+", "", number).lower()
+
+def section_path(number: Any) -> Tuple[str, ...]:
+    """Split a section number into its parts: '2(h)(i)' -> ('2', 'h', 'i')"""
+    parts = []
+    for nested, plain in SECTION_PART.findall(normalize_section(number)):
+        part = nested or plain
+        if part:
+            parts.append(part)
+    return tuple(parts)
+
+def _sort_key(path: Tuple[str, ...]):
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in path]
+
+class SectionTrie:
+    """Prefix tree over section paths, used to list sub-sections"""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, path: Tuple[str, ...], section_key: str):
+        node = self.root
+        for part in path:
+            node = node.setdefault(part, {})
+        node[None] = section_key
+
+    def under(self, path: Tuple[str, ...]) -> List[str]:
+        """All section keys at or below a path, in natural order"""
+        node = self.root
+        for part in path:
+            node = node.get(part)
+            if node is None:
+                return []
+        found = []
+        stack = [(path, node)]
+        while stack:
+            prefix, current = stack.pop()
+            if None in current:
+                found.append((prefix, current[None]))
+            for part, child in current.items():
+                if part is not None:
+                    stack.append((prefix + (part,), child))
+        return [key for _, key in sorted(found, key=lambda item: _sort_key(item[0]))]
+
+class StatuteStore:
+    """All acts from data/legal_codes, indexed for constant-time section lookup.
+
+    Acts are keyed by their normalized name and can be looked up through
+    aliases ("ICA", "Contract Act", "Indian Contract Act, 1872"). Files that
+    describe the same act are merged.
+    """
+
+    def __init__(self, codes_dir: str = LEGAL_CODES_DIR):
+        self.codes_dir = codes_dir
+        self.acts: Dict[str, Dict[str, Any]] = {}
+        self.aliases: Dict[str, str] = {}
+        self.sections: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.tries: Dict[str, SectionTrie] = {}
+        self.load()
+
+    def load(self):
+        """Load every act file once"""
+        self.acts, self.aliases, self.sections, self.tries = {}, {}, {}, {}
+        for path in sorted(glob.glob(os.path.join(self.codes_dir, "*.jsonl"))):
+            self._load_jsonl(path)
+        for path in sorted(glob.glob(os.path.join(self.codes_dir, "*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    act = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error loading legal code {path}: {str(e)}")
+                continue
+            stem = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+            self.add_act(act.get("name", stem), act.get("sections", []), extra_aliases=[stem])
+
+    def _load_jsonl(self, path: str):
+        # Imported codes: one section per line, each carrying its act name
+        stem = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+        act_keys: Dict[str, str] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    section = json.loads(line)
+                except ValueError:
+                    print(f"Skipping bad line {line_number} in {path}")
+                    continue
+                name = section.pop("act", None) or stem
+                if name not in act_keys:
+                    act_keys[name] = self.add_act(name, [], extra_aliases=[stem])
+                self.add_section(act_keys[name], section)
+
+    def add_act(self, name: str, sections: List[Dict[str, Any]], extra_aliases: List[str] = None) -> str:
+        """Add (or merge) an act and index its sections. Returns the act key.
+
+        A name that resolves to a known act ("IPC" once the Indian Penal Code
+        is loaded) is merged into that act rather than starting a new one.
+        """
+        normalized = normalize_act_name(name)
+        act_key = self.resolve_act(name) or KNOWN_ALIASES.get(normalized, normalized)
+        act = self.acts.setdefault(act_key, {"name": name, "key": act_key, "section_count": 0})
+        self.tries.setdefault(act_key, SectionTrie())
+        for alias in self._aliases_for(name) + (extra_aliases or []):
+            self.aliases.setdefault(normalize_act_name(alias), act_key)
+        for section in sections:
+            self.add_section(act_key, section)
+        return act_key
+
+    def add_section(self, act_key: str, section: Dict[str, Any]):
+        """Index a single section of a known act"""
+        section_key = normalize_section(section.get("number", ""))
+        if not section_key:
+            return
+        existing = self.sections.get((act_key, section_key))
+        if existing is None:
+            self.sections[(act_key, section_key)] = {
+                **section,
+                "number": section_key,
+                "act": self.acts[act_key]["name"]
+            }
+            self.tries[act_key].insert(section_path(section_key), section_key)
+            self.acts[act_key]["section_count"] += 1
+        else:
+            # Merging a duplicate file: keep the fuller text and fill in missing fields
+            for field, value in section.items():
+                if field == "number":
+                    continue
+                if field not in existing or (field == "text" and len(str(value)) > len(str(existing[field]))):
+                    existing[field] = value
+
+    def _aliases_for(self, name: str) -> List[str]:
+        normalized = normalize_act_name(name)
+        aliases = [name, normalized]
+        if normalized.startswith("indian "):
+            aliases.append(normalized[len("indian "):])
+        words = [w for w in normalized.split() if w not in SKIP_WORDS]
+        if len(words) > 1:
+            aliases.append("".join(w[0] for w in words))
+        aliases.extend(alias for alias, target in KNOWN_ALIASES.items() if target == normalized)
+        return aliases
+
+    def resolve_act(self, act_name: str) -> Optional[str]:
+        """Resolve an act name or alias to its act key"""
+        normalized = normalize_act_name(act_name)
+        if normalized in self.acts:
+            return normalized
+        if normalized in self.aliases:
+            return self.aliases[normalized]
+        target = KNOWN_ALIASES.get(normalized)
+        if target in self.acts:
+            return target
+        return None
+
+    def get_section(self, act_name: str, section_number: Any) -> Optional[Dict[str, Any]]:
+        """Look up a section by act (name or alias) and section number"""
+        act_key = self.resolve_act(act_name)
+        if act_key is None:
+            return None
+        return self.sections.get((act_key, normalize_section(section_number)))
+
+    def get_section_text(self, act_name: str, section_number: Any) -> Optional[str]:
+        section = self.get_section(act_name, section_number)
+        if section is None:
+            return None
+        text = section.get("text", "")
+        if section.get("title") and not text.startswith(section["title"]):
+            return f"{section['title']}: {text}"
+        return text
+
+    def get_subsections(self, act_name: str, section_number: Any) -> List[Dict[str, Any]]:
+        """A section and all its sub-sections, e.g. '2' -> 2(a), 2(h), ..."""
+        act_key = self.resolve_act(act_name)
+        if act_key is None:
+            return []
+        keys = self.tries[act_key].under(section_path(section_number))
+        return [self.sections[(act_key, key)] for key in keys]
+
+    def list_acts(self) -> List[Dict[str, Any]]:
+        return list(self.acts.values())
+
+    def __len__(self) -> int:
+        return len(self.sections)
@@ -1,45 +1,48 @@
 # utils/stt.py
 
-import os
-import tempfile
+import queue
 import speech_recognition as sr
 import platform
 import threading
 import time
+import uuid
 import streamlit as st
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, Tuple
+from .audio_prep import prepare_for_recognition
+from .stt_backends import STTBackend, get_stt_backend, select_stt_backend, stt_pool, timed_recognize
+from .stt_stream import StreamingRecognizer
 
 class STTEngine:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.temp_dir = tempfile.mkdtemp()
+    def __init__(self, backend: Optional[str] = None, session_id: Optional[str] = None):
+        # None picks a backend per language (offline first, see stt_backends)
+        self.backend_name = backend
+        # Recognition runs on the shared STT pool, queued under this session
+        self.session_id = session_id or f"stt-{uuid.uuid4().hex}"
         self.language_settings = {
             "en": "en-US",  # English
             "hi": "hi-IN"   # Hindi
         }
+        self.stats = {"requests": 0, "audio_seconds": 0.0, "processing_seconds": 0.0, "last_rtf": None}
+        self._stats_lock = threading.Lock()
+        self._listener: Optional[StreamingRecognizer] = None
+        self._listener_lock = threading.Lock()
     
     def process_audio(self, audio_data: bytes, language: str = "en") -> Optional[str]:
-        """Process audio data and convert to text"""
+        """Process audio data and convert to text.
+
+        The audio is decoded, resampled, trimmed and normalized in memory, so
+        concurrent calls share no files and only the speech itself is sent
+        for recognition.
+        """
         try:
-            # Save audio data to temporary file
-            filename = "temp_audio.wav"
-            filepath = os.path.join(self.temp_dir, filename)
-            
-            with open(filepath, "wb") as f:
-                f.write(audio_data)
-            
-            # Process audio file
-            with sr.AudioFile(filepath) as source:
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(
-                    audio,
-                    language=self.language_settings.get(language, "en-US")
-                )
-            
+            pcm, sample_rate = prepare_for_recognition(audio_data)
+            if not pcm:
+                print("No speech found in audio")
+                return None
+            text = self._recognize(pcm, sample_rate, language)
+            if text is None:
+                print("Speech Recognition could not understand audio")
             return text
-        except sr.UnknownValueError:
-            print("Speech Recognition could not understand audio")
-            return None
         except sr.RequestError as e:
             print(f"Could not request results from Speech Recognition service; {e}")
             return None
@@ -47,36 +50,145 @@ class STTEngine:
             print(f"Error processing audio: {str(e)}")
             return None
     
-    def process_microphone_input(self, language: str = "en") -> Optional[str]:
-        """Process audio from microphone and convert to text"""
+    def recognize_pcm(self, pcm: bytes, sample_rate: int, language: str = "en") -> Optional[str]:
+        """Recognize raw 16-bit mono audio, e.g. one utterance from the microphone stream"""
         try:
-            with sr.Microphone() as source:
-                print("Listening...")
-                audio = self.recognizer.listen(source)
-                text = self.recognizer.recognize_google(
-                    audio,
-                    language=self.language_settings.get(language, "en-US")
-                )
-                return text
-        except sr.UnknownValueError:
-            print("Speech Recognition could not understand audio")
-            return None
+            return self._recognize(pcm, sample_rate, language)
         except sr.RequestError as e:
             print(f"Could not request results from Speech Recognition service; {e}")
             return None
+        except Exception as e:
+            print(f"Error recognizing speech: {str(e)}")
+            return None
+
+    def backend_for(self, language: str = "en") -> STTBackend:
+        """The configured backend if it supports the language's code, else the best available one"""
+        code = self.language_settings.get(language, "en-US")
+        if self.backend_name:
+            backend = get_stt_backend(self.backend_name)
+            if backend.is_available(code):
+                return backend
+        return select_stt_backend(code)
+
+    def _recognize(self, pcm: bytes, sample_rate: int, language: str = "en") -> Optional[str]:
+        code = self.language_settings.get(language, "en-US")
+        backend = self.backend_for(language)
+        text, rtf = stt_pool.run(self.session_id, timed_recognize, backend, pcm, sample_rate, code)
+        duration = len(pcm) / 2.0 / sample_rate
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["audio_seconds"] += duration
+            self.stats["processing_seconds"] += rtf * duration
+            self.stats["last_rtf"] = round(rtf, 3)
+        print(f"STT ({backend.name}, {code}): {duration:.1f}s of audio, real-time factor {rtf:.2f}")
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Recognition requests so far and their real-time factor (processing time / audio duration)"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["mean_rtf"] = round(stats["processing_seconds"] / stats["audio_seconds"], 3) if stats["audio_seconds"] else None
+        return stats
+
+    def _streaming_recognizer(self, language: str, callback: Callable[[str, bool], None],
+                              **kwargs) -> StreamingRecognizer:
+        # Partial results re-recognize the whole utterance every interval on the shared pool;
+        # with a slow backend they would hold up everyone's final results
+        try:
+            partials = self.backend_for(language).partials
+        except RuntimeError:
+            partials = False
+        if not partials:
+            kwargs["partial_interval"] = None
+        return StreamingRecognizer(lambda pcm, rate: self.recognize_pcm(pcm, rate, language), callback, **kwargs)
+
+    def stream_microphone(self, language: str = "en", timeout: float = 5.0,
+                          max_utterances: Optional[int] = 1) -> Iterator[Tuple[str, bool]]:
+        """Listen to the microphone and yield (text, is_final) on the calling thread as results arrive.
+
+        Partial results are yielded while the speaker is still talking. Listening
+        ends after max_utterances utterances (None for no limit), or once nobody
+        has spoken for `timeout` seconds.
+        """
+        results: "queue.Queue[Tuple[str, bool]]" = queue.Queue()
+        listener = self._streaming_recognizer(
+            language, lambda text, is_final: results.put((text, is_final)), max_utterances=max_utterances
+        )
+        try:
+            listener.start()
+        except Exception as e:
+            print(f"Error opening microphone: {str(e)}")
+            listener.stop()
+            return
+        started = time.time()
+        try:
+            while not (listener.finished.is_set() and results.empty()):
+                try:
+                    yield results.get(timeout=0.1)
+                except queue.Empty:
+                    quiet_since = listener.last_speech_time or started
+                    if not listener.segmenter.in_speech and time.time() - quiet_since > timeout:
+                        break
+        finally:
+            listener.stop()
+        # Finals recognized while the stream was being closed
+        while not results.empty():
+            yield results.get()
+
+    def recognize_from_microphone(self, language: str = "en", timeout: float = 5.0,
+                                  on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Record one utterance (ended by a pause) and return its text"""
+        try:
+            finals = []
+            for text, is_final in self.stream_microphone(language, timeout):
+                if is_final:
+                    finals.append(text)
+                elif on_partial is not None:
+                    on_partial(text)
+            return " ".join(finals) or None
         except Exception as e:
             print(f"Error processing microphone input: {str(e)}")
             return None
+
+    def process_microphone_input(self, language: str = "en") -> Optional[str]:
+        """Process audio from microphone and convert to text"""
+        return self.recognize_from_microphone(language)
+
+    def recognize_from_file(self, file_path: str, language: str = "en") -> Optional[str]:
+        """Recognize speech in an audio file"""
+        try:
+            with open(file_path, "rb") as f:
+                return self.process_audio(f.read(), language)
+        except OSError as e:
+            print(f"Error reading audio file: {str(e)}")
+            return None
+
+    def start_continuous_listening(self, callback_fn: Callable[[str, bool], None], language: str = "en",
+                                   device=None) -> bool:
+        """Listen until stopped, calling callback_fn(text, is_final) from a background thread"""
+        with self._listener_lock:
+            if self._listener is not None:
+                return False
+            try:
+                listener = self._streaming_recognizer(language, callback_fn)
+                listener.start(device)
+            except Exception as e:
+                print(f"Error starting continuous listening: {str(e)}")
+                return False
+            self._listener = listener
+            return True
+
+    def stop_continuous_listening(self) -> bool:
+        with self._listener_lock:
+            listener, self._listener = self._listener, None
+        if listener is None:
+            return False
+        listener.stop()
+        return True
     
     def cleanup(self):
-        """Clean up temporary files"""
-        try:
-            for filename in os.listdir(self.temp_dir):
-                filepath = os.path.join(self.temp_dir, filename)
-                os.remove(filepath)
-            os.rmdir(self.temp_dir)
-        except Exception as e:
-            print(f"Error cleaning up STT files: {str(e)}")
+        """Stop any continuous listening"""
+        self.stop_continuous_listening()
     
     def set_language_code(self, language: str, code: str):
         """Set language code for a specific language"""
@@ -111,5 +223,5 @@ def stop_listening():
     return stt_engine.stop_continuous_listening()
 
 def cleanup():
-    """Clean temporary files."""
+    """Stop live listening."""
     return stt_engine.cleanup()
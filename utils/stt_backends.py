@@ -0,0 +1,196 @@
+# utils/stt_backends.py
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from llm.worker_pool import FairWorkerPool
+from .knowledge_base import DATA_DIR
+
+MODEL_DIR = os.path.join(DATA_DIR, "models")
+
+class STTBackend(ABC):
+    """A speech recognizer STTEngine can use. Input is 16-bit mono PCM."""
+
+    name = "backend"
+    offline = False
+    # Whether re-recognizing an utterance every second or two (for live partial results) is affordable
+    partials = True
+
+    @abstractmethod
+    def is_available(self, language_code: str = "en-US") -> bool:
+        """Whether the backend can recognize this language (from STTEngine.language_settings) here"""
+        pass
+
+    @abstractmethod
+    def recognize(self, pcm: bytes, sample_rate: int, language_code: str = "en-US") -> Optional[str]:
+        """Text of the speech, or None if nothing was understood"""
+        pass
+
+class GoogleSTTBackend(STTBackend):
+    """Google's web speech API through speech_recognition (needs internet)"""
+
+    name = "google"
+    offline = False
+
+    def __init__(self):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def is_available(self, language_code: str = "en-US") -> bool:
+        return True
+
+    def recognize(self, pcm: bytes, sample_rate: int, language_code: str = "en-US") -> Optional[str]:
+        try:
+            return self.recognizer.recognize_google(self.sr.AudioData(pcm, sample_rate, 2), language=language_code)
+        except self.sr.UnknownValueError:
+            return None
+
+class VoskBackend(STTBackend):
+    """Offline Kaldi models through Vosk; one model per language, loaded once per process.
+
+    Models are unpacked under data/models/vosk/ (or VOSK_MODEL_DIR) from
+    https://alphacephei.com/vosk/models.
+    """
+
+    name = "vosk"
+    offline = True
+    MODELS = {
+        "en-US": "vosk-model-small-en-us-0.15",
+        "en-IN": "vosk-model-small-en-in-0.4",
+        "hi-IN": "vosk-model-small-hi-0.22"
+    }
+    _models: Dict[str, Any] = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_dir: Optional[str] = None):
+        self.model_dir = model_dir or os.environ.get("VOSK_MODEL_DIR", os.path.join(MODEL_DIR, "vosk"))
+
+    def model_path(self, language_code: str) -> Optional[str]:
+        name = self.MODELS.get(language_code)
+        return os.path.join(self.model_dir, name) if name else None
+
+    def is_available(self, language_code: str = "en-US") -> bool:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        path = self.model_path(language_code)
+        return path is not None and os.path.isdir(path)
+
+    def model(self, language_code: str):
+        path = self.model_path(language_code)
+        with self._models_lock:
+            if path not in self._models:
+                from vosk import Model, SetLogLevel
+                SetLogLevel(-1)
+                print(f"Loading Vosk model {path}")
+                self._models[path] = Model(path)
+            return self._models[path]
+
+    def recognize(self, pcm: bytes, sample_rate: int, language_code: str = "en-US") -> Optional[str]:
+        from vosk import KaldiRecognizer
+        # Recognizers are cheap and not thread-safe; the model is shared
+        recognizer = KaldiRecognizer(self.model(language_code), sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        return text or None
+
+class WhisperBackend(STTBackend):
+    """Offline multilingual recognition with faster-whisper on the CPU (int8), loaded once per process.
+
+    Only a model already on disk is used, never a download: a converted
+    model (e.g. https://huggingface.co/Systran/faster-whisper-small) is
+    unpacked under data/models/whisper/<size> (or WHISPER_MODEL_DIR), or
+    WHISPER_MODEL points at its directory. Recognition takes a sizeable
+    fraction of real time, so no partial results are requested from it.
+    """
+
+    name = "whisper"
+    offline = True
+    partials = False
+    _model = None
+    _model_lock = threading.Lock()
+
+    def __init__(self, model_size: Optional[str] = None, model_dir: Optional[str] = None):
+        self.model_size = model_size or os.environ.get("WHISPER_MODEL", "small")
+        self.model_dir = model_dir or os.environ.get("WHISPER_MODEL_DIR", os.path.join(MODEL_DIR, "whisper"))
+
+    def model_path(self) -> str:
+        if os.path.isdir(self.model_size):
+            return self.model_size
+        return os.path.join(self.model_dir, self.model_size)
+
+    def is_available(self, language_code: str = "en-US") -> bool:
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            return False
+        return os.path.isdir(self.model_path())
+
+    def model(self):
+        with self._model_lock:
+            if WhisperBackend._model is None:
+                from faster_whisper import WhisperModel
+                path = self.model_path()
+                print(f"Loading Whisper model {path}")
+                WhisperBackend._model = WhisperModel(path, device="cpu", compute_type="int8")
+            return WhisperBackend._model
+
+    def recognize(self, pcm: bytes, sample_rate: int, language_code: str = "en-US") -> Optional[str]:
+        from .audio_prep import resample
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        samples = resample(samples, sample_rate, 16000)
+        segments, _ = self.model().transcribe(samples, language=language_code.split("-")[0], beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text or None
+
+BACKENDS = {
+    "google": GoogleSTTBackend,
+    "vosk": VoskBackend,
+    "whisper": WhisperBackend
+}
+
+# Preferred order when choosing automatically: offline first
+AUTO_ORDER = ("vosk", "whisper", "google")
+
+_backends: Dict[str, STTBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_stt_backend(name: str) -> STTBackend:
+    """The process-wide instance of a backend"""
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+def select_stt_backend(language_code: str = "en-US") -> STTBackend:
+    """STT_BACKEND=google|vosk|whisper if set and usable, else the first available offline backend, else Google"""
+    forced = os.environ.get("STT_BACKEND")
+    names = ((forced,) if forced in BACKENDS else ()) + AUTO_ORDER
+    for name in names:
+        try:
+            backend = get_stt_backend(name)
+        except ImportError:
+            continue
+        if backend.is_available(language_code):
+            return backend
+    raise RuntimeError("No speech recognition backend is available")
+
+# CPU-bound models: a small pool shared by every session, served round-robin
+stt_pool = FairWorkerPool(num_workers=int(os.environ.get("STT_POOL_SIZE", "2")))
+
+def timed_recognize(backend: STTBackend, pcm: bytes, sample_rate: int,
+                    language_code: str = "en-US") -> Tuple[Optional[str], float]:
+    """Recognize and return (text, real-time factor): processing time over audio duration"""
+    start = time.perf_counter()
+    text = backend.recognize(pcm, sample_rate, language_code)
+    elapsed = time.perf_counter() - start
+    duration = len(pcm) / 2.0 / sample_rate
+    return text, (elapsed / duration if duration else 0.0)
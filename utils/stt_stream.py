@@ -0,0 +1,248 @@
+# utils/stt_stream.py
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+class UtteranceSegmenter:
+    """Energy-based voice activity detection over fixed-size int16 frames.
+
+    The noise floor adapts during silence, so a noisy room raises the bar
+    for speech. An utterance starts after a few loud frames (with a little
+    pre-roll so the first syllable is kept) and ends after a pause, or when
+    it reaches max_utterance_s so long arguments are recognized in pieces.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, threshold_ratio: float = 3.0,
+                 min_energy: float = 300.0, start_ms: int = 90, end_silence_ms: int = 700,
+                 preroll_ms: int = 300, min_utterance_ms: int = 250, max_utterance_s: float = 15.0):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.threshold_ratio = threshold_ratio
+        self.min_energy = min_energy
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_utterance_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 // frame_ms)
+        self.noise_floor = min_energy / threshold_ratio
+        self.in_speech = False
+        self._preroll: deque = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._frames = []
+        self._loud_run = 0
+        self._quiet_run = 0
+        self._speech_frames = 0
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        energy = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2))) if len(frame) else 0.0
+        speech = energy > max(self.min_energy, self.noise_floor * self.threshold_ratio)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+        return speech
+
+    def feed(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Add one frame; returns the samples of an utterance when one has just ended"""
+        speech = self.is_speech(frame)
+        if not self.in_speech:
+            self._preroll.append(frame)
+            self._loud_run = self._loud_run + 1 if speech else 0
+            if self._loud_run >= self.start_frames:
+                self.in_speech = True
+                self._frames = list(self._preroll)
+                self._preroll.clear()
+                self._quiet_run = 0
+                self._speech_frames = self._loud_run
+            return None
+        self._frames.append(frame)
+        if speech:
+            self._quiet_run = 0
+            self._speech_frames += 1
+        else:
+            self._quiet_run += 1
+        if self._quiet_run >= self.end_frames or len(self._frames) >= self.max_frames:
+            return self._end()
+        return None
+
+    def current(self) -> Optional[np.ndarray]:
+        """Samples of the utterance in progress, for partial recognition"""
+        return np.concatenate(self._frames) if self.in_speech and self._frames else None
+
+    @property
+    def speech_seconds(self) -> float:
+        return self._speech_frames * self.frame_ms / 1000.0 if self.in_speech else 0.0
+
+    def flush(self) -> Optional[np.ndarray]:
+        """End the utterance in progress (the stream is stopping)"""
+        return self._end() if self.in_speech else None
+
+    def _end(self) -> Optional[np.ndarray]:
+        frames, speech_frames = self._frames, self._speech_frames
+        self.in_speech = False
+        self._frames = []
+        self._loud_run = 0
+        self._quiet_run = 0
+        self._speech_frames = 0
+        if speech_frames < self.min_speech_frames:
+            # A cough or a click
+            return None
+        return np.concatenate(frames)
+
+class StreamingRecognizer:
+    """Live speech recognition from small microphone frames.
+
+    Frames from a sounddevice input stream are endpointed by an
+    UtteranceSegmenter; each utterance is recognized as soon as it ends
+    and delivered as `callback(text, True)`. While someone is still
+    speaking, the utterance so far is recognized every partial_interval
+    seconds and delivered as `callback(text, False)`, so the text appears
+    before they pause (partial_interval=None turns this off, for slow
+    recognizers). Callbacks run on background threads.
+    """
+
+    def __init__(self, recognize: Callable[[bytes, int], Optional[str]], callback: Callable[[str, bool], None],
+                 sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, partial_interval: Optional[float] = 1.5,
+                 max_utterances: Optional[int] = None, segmenter: Optional[UtteranceSegmenter] = None):
+        self.recognize = recognize
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.partial_interval = partial_interval
+        self.max_utterances = max_utterances
+        self.segmenter = segmenter or UtteranceSegmenter(sample_rate, frame_ms)
+        self.finished = threading.Event()
+        self.last_speech_time: Optional[float] = None
+        self._frames: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        # One worker keeps final results in order; partials never queue behind each other
+        self._final_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-final")
+        self._partial_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-partial")
+        self._partial_busy = threading.Event()
+        self._utterance = 0
+        self._finalized = -1
+        self._delivered = 0
+        self._lock = threading.Lock()
+        self._stream = None
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def heard_speech(self) -> bool:
+        return self.last_speech_time is not None
+
+    def start(self, device=None):
+        """Open the microphone and start listening"""
+        self._start_worker()
+        import sounddevice as sd
+        self._stream = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                      blocksize=self.frame_size, device=device, callback=self._on_audio)
+        self._stream.start()
+
+    def feed(self, samples: np.ndarray):
+        """Push audio from another source (int16 mono at sample_rate) instead of the microphone"""
+        self._start_worker()
+        samples = np.asarray(samples, dtype=np.int16)
+        for i in range(0, len(samples) - self.frame_size + 1, self.frame_size):
+            self._frames.put(samples[i:i + self.frame_size])
+
+    def stop(self):
+        """Stop listening; the utterance in progress is still recognized"""
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception as e:
+                print(f"Error closing microphone stream: {str(e)}")
+            self._stream = None
+        if self._worker is not None:
+            self._frames.put(None)
+            self._worker.join()
+            self._worker = None
+        self._final_pool.shutdown(wait=True)
+        self._partial_pool.shutdown(wait=False)
+        self.finished.set()
+
+    def _start_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="stt-stream", daemon=True)
+            self._worker.start()
+
+    def _on_audio(self, indata, frames, time_info, status):
+        # Runs on the audio thread: hand the frame over and return at once
+        if status:
+            print(f"Microphone status: {status}")
+        self._frames.put(indata[:, 0].copy())
+
+    def _run(self):
+        last_partial = 0.0
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                utterance = self.segmenter.flush()
+                if utterance is not None:
+                    self._submit_final(utterance)
+                return
+            if self.max_utterances is not None and self._utterance >= self.max_utterances:
+                continue
+            utterance = self.segmenter.feed(frame)
+            if self.segmenter.in_speech:
+                self.last_speech_time = time.time()
+            if utterance is not None:
+                last_partial = 0.0
+                self._submit_final(utterance)
+            elif (self.partial_interval is not None and self.segmenter.in_speech
+                  and self.segmenter.speech_seconds - last_partial >= self.partial_interval
+                  and not self._partial_busy.is_set()):
+                last_partial = self.segmenter.speech_seconds
+                self._submit_partial(self.segmenter.current())
+
+    def _submit_final(self, samples: np.ndarray):
+        with self._lock:
+            utterance = self._utterance
+            self._utterance += 1
+        self._final_pool.submit(self._recognize_final, utterance, samples.tobytes())
+
+    def _submit_partial(self, samples: Optional[np.ndarray]):
+        if samples is None:
+            return
+        self._partial_busy.set()
+        self._partial_pool.submit(self._recognize_partial, self._utterance, samples.tobytes())
+
+    def _recognize_final(self, utterance: int, pcm: bytes):
+        text = self._safe_recognize(pcm)
+        with self._lock:
+            self._finalized = utterance
+            self._delivered += 1
+            done = self.max_utterances is not None and self._delivered >= self.max_utterances
+        if text:
+            self._deliver(text, True)
+        if done:
+            self.finished.set()
+
+    def _recognize_partial(self, utterance: int, pcm: bytes):
+        try:
+            text = self._safe_recognize(pcm)
+            with self._lock:
+                # Dropped if the utterance's final result is already out
+                current = utterance > self._finalized
+            if text and current:
+                self._deliver(text, False)
+        finally:
+            self._partial_busy.clear()
+
+    def _safe_recognize(self, pcm: bytes) -> Optional[str]:
+        try:
+            return self.recognize(pcm, self.sample_rate)
+        except Exception as e:
+            print(f"Error recognizing speech: {str(e)}")
+            return None
+
+    def _deliver(self, text: str, is_final: bool):
+        try:
+            self.callback(text, is_final)
+        except Exception as e:
+            print(f"Error in speech callback: {str(e)}")
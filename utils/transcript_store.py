@@ -0,0 +1,325 @@
+# utils/transcript_store.py
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional, TextIO
+
+TRANSCRIPT_DIR = os.path.join("data", "transcripts")
+
+# Finished transcripts are kept for a while (utils/tts_warmup learns frequent
+# lines from them), then pruned by age and count
+RETENTION_DAYS = float(os.environ.get("TRANSCRIPT_RETENTION_DAYS", "7"))
+MAX_TRANSCRIPTS = int(os.environ.get("TRANSCRIPT_MAX_FILES", "1000"))
+PRUNE_INTERVAL = 3600
+
+# Backing files of stores that are still open, which pruning never touches
+_open_paths = set()
+_open_lock = threading.Lock()
+_last_prune = 0.0
+
+def _track_open(path: str, is_open: bool):
+    with _open_lock:
+        if is_open:
+            _open_paths.add(os.path.abspath(path))
+        else:
+            _open_paths.discard(os.path.abspath(path))
+
+class TranscriptStore(ABC):
+    """Append-only court transcript kept on disk.
+
+    Entries are plain dicts (speaker, content, timestamp, plus any extra
+    fields). Only a short tail is cached in memory, so a long trial costs a
+    fixed amount of memory and readers fetch just the page they display.
+    The store also behaves like a read-only sequence (len, indexing,
+    slicing, iteration) so it can stand in for the old transcript lists.
+    """
+
+    def __init__(self, tail_cache: int = 50):
+        self._lock = threading.RLock()
+        self._tail = deque(maxlen=tail_cache)
+
+    # --- Backend hooks ---
+
+    @abstractmethod
+    def _write(self, entry: Dict[str, Any]):
+        """Persist one entry"""
+        pass
+
+    @abstractmethod
+    def _read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Entries start..stop from the backing file"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def close(self):
+        """Release the backing file handle. The store can still be read, and
+        reopens the file if something is appended later."""
+        pass
+
+    def delete(self):
+        """Close the store and remove its backing file"""
+        self.close()
+
+    # --- Public API ---
+
+    def append(self, speaker: str, content: str, timestamp: str = None, **extra) -> int:
+        """Append an entry and return its index"""
+        entry = {
+            'speaker': speaker,
+            'content': content,
+            'timestamp': timestamp or datetime.now().strftime("%H:%M:%S"),
+            **extra
+        }
+        with self._lock:
+            index = len(self)
+            self._write(entry)
+            self._tail.append(entry)
+        return index
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Read up to `limit` entries starting at `offset`"""
+        with self._lock:
+            total = len(self)
+            start = max(0, min(offset, total))
+            stop = max(start, min(start + limit, total))
+            cached_from = total - len(self._tail)
+            if start >= cached_from:
+                return list(self._tail)[start - cached_from:stop - cached_from]
+            return self._read(start, stop)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Read the last `n` entries"""
+        with self._lock:
+            return self.page(max(0, len(self) - n), n)
+
+    def follow(self, cursor: int) -> List[Dict[str, Any]]:
+        """Read every entry appended since `cursor` (the number already seen)"""
+        with self._lock:
+            return self.page(cursor, len(self) - cursor)
+
+    def iter_entries(self, batch_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """Stream every entry in order, one page at a time"""
+        offset = 0
+        while True:
+            batch = self.page(offset, batch_size)
+            if not batch:
+                return
+            yield from batch
+            offset += len(batch)
+
+    def export_text(self, fp: TextIO):
+        """Stream the transcript as 'Speaker: content' lines into a file object"""
+        for entry in self.iter_entries():
+            fp.write(f"{entry['speaker']}: {entry['content']}\n")
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self.iter_entries())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_entries()
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, key):
+        total = len(self)
+        if isinstance(key, slice):
+            start, stop, step = key.indices(total)
+            if step != 1:
+                return self.page(start, max(0, stop - start))[::step]
+            return self.page(start, max(0, stop - start))
+        if key < 0:
+            key += total
+        if not 0 <= key < total:
+            raise IndexError("transcript index out of range")
+        return self.page(key, 1)[0]
+
+class JsonlTranscriptStore(TranscriptStore):
+    """Transcript backed by an append-only JSON Lines file.
+
+    Keeps only the byte offset of each line in memory (8 bytes per entry).
+    """
+
+    def __init__(self, path: str, tail_cache: int = 50):
+        super().__init__(tail_cache)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._offsets = array('Q')
+        # Reopening an existing transcript rebuilds the offset index
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    self._offsets.append(offset)
+                    offset += len(line)
+            self._tail.extend(self._read(max(0, len(self._offsets) - self._tail.maxlen), len(self._offsets)))
+        self._file = None
+        self._open()
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            _track_open(self.path, True)
+
+    def _write(self, entry: Dict[str, Any]):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        self._open()
+        self._offsets.append(self._file.tell())
+        self._file.write(line)
+        self._file.flush()
+
+    def _read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        if start >= stop:
+            return []
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[start])
+            for _ in range(stop - start):
+                entries.append(json.loads(f.readline()))
+        return entries
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                _track_open(self.path, False)
+
+    def delete(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+class SqliteTranscriptStore(TranscriptStore):
+    """Transcript backed by a SQLite table with the entry index as primary key"""
+
+    def __init__(self, path: str, tail_cache: int = 50):
+        super().__init__(tail_cache)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = None
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcript (seq INTEGER PRIMARY KEY, entry TEXT NOT NULL)"
+        )
+        self._count = conn.execute("SELECT COUNT(*) FROM transcript").fetchone()[0]
+        self._tail.extend(self._read(max(0, self._count - self._tail.maxlen), self._count))
+
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                _track_open(self.path, True)
+            return self._conn
+
+    def _write(self, entry: Dict[str, Any]):
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO transcript (seq, entry) VALUES (?, ?)",
+            (self._count, json.dumps(entry, ensure_ascii=False))
+        )
+        conn.commit()
+        self._count += 1
+
+    def _read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT entry FROM transcript WHERE seq >= ? AND seq < ? ORDER BY seq",
+            (start, stop)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                _track_open(self.path, False)
+
+    def delete(self):
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+def prune_transcripts(directory: str = TRANSCRIPT_DIR, max_age_days: float = RETENTION_DAYS,
+                      max_files: int = MAX_TRANSCRIPTS) -> int:
+    """Delete transcripts not written to for max_age_days, then the oldest beyond max_files.
+
+    Transcripts that are still open are left alone. Returns the number deleted.
+    """
+    groups: Dict[str, List[str]] = {}
+    for path in glob.glob(os.path.join(directory, "*.jsonl")) + glob.glob(os.path.join(directory, "*.sqlite3*")):
+        # A SQLite transcript is the database plus its -wal and -shm files
+        base = path.split(".sqlite3")[0] + ".sqlite3" if ".sqlite3" in path else path
+        groups.setdefault(base, []).append(path)
+    with _open_lock:
+        open_paths = set(_open_paths)
+    ages = []
+    for base, paths in groups.items():
+        if os.path.abspath(base) in open_paths:
+            continue
+        try:
+            ages.append((max(os.path.getmtime(path) for path in paths), base))
+        except OSError:
+            continue
+    ages.sort()
+    cutoff = time.time() - max_age_days * 86400
+    excess = len(groups) - max_files
+    deleted = 0
+    for mtime, base in ages:
+        if mtime >= cutoff and deleted >= excess:
+            break
+        for path in groups[base]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        deleted += 1
+    return deleted
+
+def _maybe_prune(directory: str):
+    global _last_prune
+    with _open_lock:
+        if time.time() - _last_prune < PRUNE_INTERVAL:
+            return
+        _last_prune = time.time()
+    try:
+        prune_transcripts(directory)
+    except Exception as e:
+        print(f"Error pruning transcripts: {str(e)}")
+
+def open_transcript_store(session_id: Optional[str] = None, backend: str = None,
+                          directory: str = TRANSCRIPT_DIR) -> TranscriptStore:
+    """Open (or create) the transcript for a session; old transcripts are pruned now and then"""
+    _maybe_prune(directory)
+    session_id = session_id or uuid.uuid4().hex
+    backend = backend or os.environ.get("TRANSCRIPT_BACKEND", "jsonl")
+    if backend == "sqlite":
+        return SqliteTranscriptStore(os.path.join(directory, f"{session_id}.sqlite3"))
+    elif backend == "jsonl":
+        return JsonlTranscriptStore(os.path.join(directory, f"{session_id}.jsonl"))
+    else:
+        raise ValueError(f"Unknown transcript backend: {backend}")
@@ -1,35 +1,60 @@
 # utils/tts.py
 
 import os
-import tempfile
-from typing import Dict, Any, Optional
-from gtts import gTTS
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Union
 import base64
 import time
 import pygame
+from .audio_cache import audio_cache, audio_key, get_audio_cache, memory_audio_cache
+from .audio_playback import ClipCollector, PlaybackGroup, PlaybackHandle, PlaybackQueue
+from .tts_backends import TTSBackend, get_backend
+from .tts_pipeline import SpeechStream
 
-# pip install gtts requests
+# pip install gtts requests (or install espeak-ng for offline speech)
 
 class TTSEngine:
-    def __init__(self):
+    def __init__(self, delivery: str = "server", backend: Optional[TTSBackend] = None):
+        # "server" plays through pygame on this machine; "browser" returns audio
+        # bytes for the client to play, so the server needs no sound device
+        self.delivery = delivery
+        # Chosen on first use (see tts_backends.get_backend) unless given
+        self._backend = backend
+        self.player: Optional[PlaybackQueue] = None
+        self._player_lock = threading.Lock()
+        # Synthesized audio is kept in the shared content-addressed cache
+        self.audio_cache = audio_cache
+        self.voice_settings = {
+            "judge": {"language": "en", "slow": False, "voice": "judge"},
+            "plaintiff": {"language": "en", "slow": False, "voice": "plaintiff"},
+            "defendant": {"language": "en", "slow": False, "voice": "defendant"},
+            "witness": {"language": "en", "slow": False, "voice": "witness"}
+        }
         try:
-            # Use dummy audio driver if specified
-            if os.environ.get("SDL_AUDIODRIVER") == "dummy":
-                print("Using dummy audio driver for pygame.")
-            pygame.mixer.init()
-            self.audio_available = True
-            self.temp_dir = tempfile.mkdtemp()
-            self.voice_settings = {
-                "judge": {"language": "en", "slow": False},
-                "plaintiff": {"language": "en", "slow": False},
-                "defendant": {"language": "en", "slow": False},
-                "witness": {"language": "en", "slow": False}
-            }
+            if delivery == "browser":
+                self.audio_available = True
+            else:
+                # Use dummy audio driver if specified
+                if os.environ.get("SDL_AUDIODRIVER") == "dummy":
+                    print("Using dummy audio driver for pygame.")
+                pygame.mixer.init()
+                self.audio_available = True
             print("TTSEngine initialized successfully")
         except Exception as e:
             print(f"Error initializing TTSEngine: {str(e)}")
             self.audio_available = False
 
+    @property
+    def backend(self) -> Optional[TTSBackend]:
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    @property
+    def audio_format(self) -> str:
+        """MIME type of the audio the backend produces"""
+        return self.backend.mime_type if self.backend is not None else "audio/mp3"
+
     def generate_tts(self, text: str, role: str = "judge", language: str = "en") -> str:
         """Generate TTS audio for the given text"""
         try:
@@ -39,15 +64,25 @@ class TTSEngine:
             settings = self.voice_settings.get(role, {"language": language, "slow": False})
             print(f"Using settings: {settings}")
             
-            tts = gTTS(text=text, lang=settings["language"], slow=settings["slow"])
-            
-            # Save to temporary file
-            filename = f"tts_{role}_{hash(text)}.mp3"
-            filepath = os.path.join(self.temp_dir, filename)
-            print(f"Saving to: {filepath}")
+            backend = self.backend
+            if backend is None:
+                print("No TTS backend is available")
+                return None
+            key = self._audio_key(text, settings)
+            cache = get_audio_cache(backend.extension)
+            filepath = cache.get(key)
+            if filepath:
+                print(f"Using cached TTS audio: {filepath}")
+                return filepath
             
-            tts.save(filepath)
-            print("TTS file saved successfully")
+            data = backend.synthesize(text, settings["language"], settings["slow"], settings.get("voice", "default"))
+
+            def write(path: str):
+                with open(path, "wb") as f:
+                    f.write(data)
+
+            filepath = cache.store(key, write)
+            print(f"TTS file saved to: {filepath}")
             
             return filepath
         except Exception as e:
@@ -57,6 +92,34 @@ class TTSEngine:
             print(f"Traceback: {traceback.format_exc()}")
             return None
 
+    def synthesize(self, text: str, role: str = "judge", language: str = "en") -> Optional[bytes]:
+        """Synthesize speech into memory and return the audio bytes, without writing to disk"""
+        try:
+            settings = self.voice_settings.get(role, {"language": language, "slow": False})
+            backend = self.backend
+            if backend is None:
+                print("No TTS backend is available")
+                return None
+            key = self._audio_key(text, settings)
+
+            def create() -> bytes:
+                # Clips pre-synthesized at build time (utils.tts_warmup) are read, never written
+                filepath = get_audio_cache(backend.extension).get(key)
+                if filepath:
+                    with open(filepath, "rb") as f:
+                        return f.read()
+                return backend.synthesize(text, settings["language"], settings["slow"], settings.get("voice", "default"))
+
+            return memory_audio_cache.get_or_create(key, create)
+        except Exception as e:
+            print(f"Error synthesizing TTS: {str(e)}")
+            return None
+
+    def _audio_key(self, text: str, settings: Dict[str, Any]) -> str:
+        # The backend's voice id keeps clips from different engines apart
+        voice = self.backend.voice_id(settings["language"], settings.get("voice", "default"))
+        return audio_key(text, settings["language"], settings["slow"], voice)
+
     def play_audio(self, filepath: str) -> bool:
         """Play the generated audio file"""
         try:
@@ -74,32 +137,106 @@ class TTSEngine:
             print(f"Traceback: {traceback.format_exc()}")
             return False
 
-    def speak(self, text: str, role: str = "judge", language: str = "en") -> bool:
-        """Generate and play TTS audio for the given text."""
+    # Longer texts are split into sentences, synthesized in parallel and played in order
+    SPLIT_THRESHOLD = 300
+
+    def speak(self, text: str, role: str = "judge", language: str = "en",
+              wait: bool = False) -> Union[PlaybackHandle, PlaybackGroup]:
+        """Queue TTS audio for the given text and return at once with a playback handle.
+
+        The line is synthesized in the background and played after the lines
+        queued before it; pass wait=True to block until it has been played.
+        """
+        print(f"Speaking text for role: {role}")
+        print(f"Text: {text[:100]}...")  # Print first 100 chars
+        if not getattr(self, "audio_available", False) or self.delivery == "browser":
+            handle = PlaybackHandle(text, role, language)
+            handle._finish("failed", "audio is not available" if self.delivery != "browser"
+                           else "audio is played in the browser; use synthesize()")
+            return handle
+        if len(text) > self.SPLIT_THRESHOLD:
+            # The first sentence plays while the rest are still being synthesized
+            stream = self.open_speech_stream(role, language)
+            stream.feed(text)
+            stream.close()
+            handle = stream.handle
+        else:
+            handle = self._get_player().enqueue(text, role, language)
+        if wait:
+            handle.wait()
+        return handle
+
+    def open_speech_stream(self, role: str = "judge", language: str = "en") -> SpeechStream:
+        """Start speaking text that is still being generated; feed() it chunks and close() it at the end"""
+        if not getattr(self, "audio_available", False):
+            return SpeechStream(None, role, language)
+        if self.delivery == "browser":
+            return SpeechStream(ClipCollector(self.synthesize), role, language)
+        return SpeechStream(self._get_player(), role, language)
+
+    def collect_audio(self, stream: SpeechStream, timeout: Optional[float] = None) -> bytes:
+        """Audio of a closed browser-delivery speech stream, as one MP3"""
+        if not isinstance(stream.player, ClipCollector):
+            return b""
         try:
-            print(f"Speaking text for role: {role}")
-            print(f"Text: {text[:100]}...")  # Print first 100 chars
-            
-            filepath = self.generate_tts(text, role=role, language=language)
-            if filepath:
-                return self.play_audio(filepath)
-            return False
-        except Exception as e:
-            print(f"Error in speak method: {str(e)}")
-            print(f"Error type: {type(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-            return False
+            return stream.player.collect(timeout)
+        finally:
+            stream.player.shutdown()
+
+    def ready_audio(self, stream: SpeechStream) -> List[bytes]:
+        """Clips of the sentences of a browser-delivery speech stream synthesized so far, in order"""
+        if not isinstance(stream.player, ClipCollector):
+            return []
+        return stream.player.ready()
+
+    def speak_stream(self, chunks: Iterable[str], role: str = "judge", language: str = "en") -> PlaybackGroup:
+        """Speak a stream of text chunks (e.g. from an LLM) in the background, sentence by sentence"""
+        stream = self.open_speech_stream(role, language)
+
+        def consume():
+            try:
+                for _ in stream.tee(chunks):
+                    pass
+            except Exception as e:
+                print(f"Error speaking text stream: {str(e)}")
+
+        threading.Thread(target=consume, name="tts-stream", daemon=True).start()
+        return stream.handle
+
+    def _get_player(self) -> PlaybackQueue:
+        with self._player_lock:
+            if self.player is None:
+                self.player = PlaybackQueue(
+                    lambda text, role, language: self.generate_tts(text, role=role, language=language)
+                )
+            return self.player
+
+    def cancel_playback(self):
+        """Stop the current line and drop everything queued (used on undo and restart)"""
+        if self.player is not None:
+            self.player.cancel_all()
+
+    def is_speaking(self) -> bool:
+        return self.player is not None and self.player.pending() > 0
 
     def cleanup(self):
-        """Clean up temporary files"""
-        try:
-            for filename in os.listdir(self.temp_dir):
-                filepath = os.path.join(self.temp_dir, filename)
-                os.remove(filepath)
-            os.rmdir(self.temp_dir)
-        except Exception as e:
-            print(f"Error cleaning up TTS files: {str(e)}")
+        """Stop the playback worker (audio files live in the shared cache)"""
+        if self.player is not None:
+            self.player.shutdown()
+            self.player = None
+
+    def get_backend_info(self) -> Dict[str, Any]:
+        """Which synthesizer is in use and the audio format it produces"""
+        backend = self.backend
+        return {"name": backend.name if backend else None, "format": self.audio_format}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Size and hit rate of the caches this engine uses: on disk for the backend's format, and in memory"""
+        backend = self.backend
+        return {
+            "disk": get_audio_cache(backend.extension).stats() if backend is not None else None,
+            "memory": memory_audio_cache.stats()
+        }
 
     def set_voice_settings(self, role: str, settings: Dict[str, Any]):
         """Set voice settings for a specific role"""
@@ -121,5 +258,5 @@ def generate_tts(text, language="en", voice="default"):
     return tts_engine.generate_tts(text, language, voice)
 
 def cleanup():
-    """Delete temporary audio files."""
+    """Stop background playback."""
     tts_engine.cleanup()
@@ -0,0 +1,135 @@
+# utils/tts_pipeline.py
+
+import re
+from typing import Iterable, Iterator, List, Optional
+
+from .audio_playback import PlaybackGroup, PlaybackHandle, PlaybackQueue
+
+# A full stop is a sentence end only when followed by whitespace, so a
+# chunk ending in "." waits for the next chunk before it is split
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n\s*\n")
+LAST_WORD = re.compile(r"([\w'/]+)\W*$")
+CLAUSE_BREAK = re.compile(r"[,;:]\s")
+
+# Words that end in a full stop without ending the sentence
+ABBREVIATIONS = {
+    "v", "vs", "mr", "mrs", "ms", "dr", "hon'ble", "no", "nos", "sec", "secs", "art", "arts",
+    "cl", "ch", "para", "paras", "ltd", "co", "corp", "inc", "pvt", "ors", "anr", "jr", "sr",
+    "st", "rs", "viz", "cf", "etc", "ibid", "govt", "dept", "u/s", "r/w", "ed", "vol", "pp", "p"
+}
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is complete.
+
+    Understands the abbreviations common in Indian legal writing ("v.",
+    "Sec.", "No.", "i.e.", initials such as "M.B.") and merges very short
+    sentences into the next so each clip is worth a synthesis request. A
+    run-on without a full stop is cut at a clause break once it grows past
+    max_chars, so speech never waits long for punctuation.
+    """
+
+    def __init__(self, min_chars: int = 24, max_chars: int = 300):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+        self._short = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return the sentences it completed"""
+        self.buffer += text
+        sentences: List[str] = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if match.group().startswith(".") and self._is_abbreviation(self.buffer[start:match.start()]):
+                continue
+            self._emit(self.buffer[start:match.end()], sentences)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        while len(self.buffer) > self.max_chars:
+            breaks = [m.end() for m in CLAUSE_BREAK.finditer(self.buffer, 0, self.max_chars)]
+            cut = breaks[-1] if breaks else self.buffer.rfind(" ", 0, self.max_chars) + 1
+            if cut <= 0:
+                break
+            self._emit(self.buffer[:cut], sentences)
+            self.buffer = self.buffer[cut:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        rest = " ".join(part for part in (self._short, self.buffer.strip()) if part)
+        self._short = ""
+        self.buffer = ""
+        return [rest] if rest else []
+
+    def _emit(self, piece: str, sentences: List[str]):
+        piece = " ".join(piece.split())
+        if not piece:
+            return
+        sentence = f"{self._short} {piece}" if self._short else piece
+        if len(sentence) < self.min_chars:
+            self._short = sentence
+        else:
+            self._short = ""
+            sentences.append(sentence)
+
+    @staticmethod
+    def _is_abbreviation(text: str) -> bool:
+        match = LAST_WORD.search(text)
+        if match is None:
+            return False
+        word = match.group(1).lower()
+        # Single letters are initials or the parts of "i.e." / "e.g."
+        return word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+def split_sentences(text: str, min_chars: int = 24, max_chars: int = 300) -> List[str]:
+    """Split a complete text the same way a stream would be split"""
+    splitter = SentenceSplitter(min_chars, max_chars)
+    return splitter.feed(text) + splitter.flush()
+
+class SpeechStream:
+    """Speaks text while it is still being generated.
+
+    Each sentence is queued on the player the moment it is complete, so it
+    is synthesized while earlier sentences play and the first audio starts
+    after one sentence instead of after the whole response. `handle` covers
+    every sentence and is done once the stream is closed and all have played.
+    """
+
+    def __init__(self, player: Optional[PlaybackQueue], role: str = "judge", language: str = "en",
+                 splitter: Optional[SentenceSplitter] = None):
+        self.player = player
+        self.role = role
+        self.language = language
+        self.splitter = splitter or SentenceSplitter()
+        self.handle = PlaybackGroup(role)
+
+    def feed(self, text: str):
+        for sentence in self.splitter.feed(text):
+            self._enqueue(sentence)
+
+    def close(self):
+        for sentence in self.splitter.flush():
+            self._enqueue(sentence)
+        self.handle.close()
+
+    def cancel(self):
+        self.handle.cancel()
+
+    def tee(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Pass chunks through unchanged while speaking them"""
+        try:
+            for chunk in chunks:
+                self.feed(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def _enqueue(self, sentence: str):
+        if self.handle.cancelled:
+            return
+        if self.player is None:
+            handle = PlaybackHandle(sentence, self.role, self.language)
+            handle._finish("failed", "audio is not available")
+        else:
+            handle = self.player.enqueue(sentence, self.role, self.language)
+        self.handle.add(handle)
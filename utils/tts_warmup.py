@@ -0,0 +1,208 @@
+# utils/tts_warmup.py
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from .kb_journal import write_json_atomic
+from .knowledge_base import DATA_DIR
+from .transcript_store import TRANSCRIPT_DIR
+
+STATS_PATH = os.path.join(DATA_DIR, "index", "phrase_stats.json")
+CASES_PATH = os.path.join(DATA_DIR, "cases.json")
+
+# Lines spoken word for word in every trial, by the role whose voice speaks them
+FIXED_PHRASES: Dict[str, List[str]] = {
+    "judge": [
+        "Court is now in session",
+        "Let the proceedings begin",
+        "Court is adjourned",
+        "Please deliver your opening statement.",
+        # ClerkAgent.generate_response (the clerk has no voice of its own)
+        "Objection noted for the record.",
+        "The court is in session."
+    ],
+    "defendant": [
+        "Objection, leading the witness!"
+    ]
+}
+
+# Transcript speakers and the voice their lines are spoken in
+SPEAKER_ROLES = {
+    "Judge": "judge",
+    "Plaintiff Lawyer": "plaintiff",
+    "Defendant Lawyer": "defendant",
+    "Witness": "witness"
+}
+
+# Generated text is only worth caching if it is short enough to repeat verbatim
+MAX_LEARNED_CHARS = 160
+
+def catalog_phrases(cases_path: str = CASES_PATH) -> List[Tuple[str, str]]:
+    """Lines fixed by the case catalog: evidence presentations and the clerk's exhibit and witness calls"""
+    if not os.path.exists(cases_path):
+        return []
+    with open(cases_path, "r", encoding="utf-8") as f:
+        cases = json.load(f).get("cases", [])
+    phrases = []
+    for case in cases:
+        for evidence in case.get("evidence", []):
+            # The app and trial runner speak str(evidence) for each side
+            phrases.append(("plaintiff", str(evidence)))
+            phrases.append(("defendant", str(evidence)))
+            if isinstance(evidence, dict) and evidence.get("id"):
+                phrases.append(("judge", f"Evidence marked as Exhibit {evidence['id']} for identification."))
+        for witness in case.get("witnesses", []):
+            if isinstance(witness, dict) and witness.get("name"):
+                phrases.append(("judge", f"Calling {witness['name']} to the stand."))
+    return phrases
+
+class PhraseStats:
+    """How often each short line appears in saved transcripts.
+
+    Counts are kept in a JSON file together with how far each transcript
+    has been read, so learning only reads lines added since the last run.
+    """
+
+    def __init__(self, path: str = STATS_PATH):
+        self.path = path
+        self.counts: Counter = Counter()
+        self.offsets: Dict[str, int] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.counts = Counter({tuple(key.split("\t", 1)): n for key, n in data.get("counts", {}).items()})
+                self.offsets = data.get("offsets", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading phrase stats: {str(e)}")
+
+    def add(self, role: str, text: str, count: int = 1):
+        text = " ".join(text.split())
+        if text and len(text) <= MAX_LEARNED_CHARS:
+            self.counts[(role, text)] += count
+
+    def learn_from_transcripts(self, directory: str = TRANSCRIPT_DIR) -> int:
+        """Count lines from JSONL transcripts not seen before. Returns the number of lines read."""
+        read = 0
+        paths = glob.glob(os.path.join(directory, "*.jsonl"))
+        # Forget transcripts that have been pruned
+        present = {os.path.basename(path) for path in paths}
+        self.offsets = {name: offset for name, offset in self.offsets.items() if name in present}
+        for path in paths:
+            name = os.path.basename(path)
+            offset = self.offsets.get(name, 0)
+            try:
+                if os.path.getsize(path) < offset:
+                    # Rewritten since the last run
+                    offset = 0
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            # Still being written; read it next time
+                            break
+                        offset += len(raw)
+                        read += 1
+                        try:
+                            entry = json.loads(raw)
+                        except ValueError:
+                            continue
+                        role = SPEAKER_ROLES.get(entry.get("speaker"))
+                        if role and isinstance(entry.get("content"), str):
+                            self.add(role, entry["content"])
+            except OSError as e:
+                print(f"Error reading transcript {path}: {str(e)}")
+            self.offsets[name] = offset
+        return read
+
+    def frequent(self, min_count: int = 3, limit: int = 200) -> List[Tuple[str, str]]:
+        return [key for key, n in self.counts.most_common(limit) if n >= min_count]
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "counts": {f"{role}\t{text}": n for (role, text), n in self.counts.items()},
+            "offsets": self.offsets
+        })
+
+class TTSWarmup:
+    """Pre-synthesizes fixed and frequent courtroom lines into the TTS cache.
+
+    Every phrase is rendered in the voice and language configured for its
+    role, through the same cache the engine reads from, so the first time
+    a trial speaks one of them it is a cache hit instead of a synthesis call.
+    """
+
+    def __init__(self, engine, stats: Optional[PhraseStats] = None, cases_path: str = CASES_PATH,
+                 min_count: int = 3, workers: int = 2):
+        self.engine = engine
+        self.stats = stats or PhraseStats()
+        self.cases_path = cases_path
+        self.min_count = min_count
+        self.workers = workers
+
+    def phrases(self) -> List[Tuple[str, str]]:
+        """(role, text) pairs to synthesize, without duplicates"""
+        phrases: List[Tuple[str, str]] = []
+        for role, texts in FIXED_PHRASES.items():
+            phrases.extend((role, text) for text in texts)
+        phrases.extend(catalog_phrases(self.cases_path))
+        phrases.extend(self.stats.frequent(self.min_count))
+        return list(dict.fromkeys(phrases))
+
+    def run(self, learn: bool = True) -> Dict[str, Any]:
+        if learn:
+            self.stats.learn_from_transcripts()
+            self.stats.save()
+        phrases = self.phrases()
+        # Browser sessions play from the in-memory cache, server playback (and
+        # build-time runs, which browser sessions read from) use the disk cache
+        synthesize = self.engine.synthesize if self.engine.delivery == "browser" else self.engine.generate_tts
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tts-warmup") as pool:
+            results = list(pool.map(lambda phrase: synthesize(phrase[1], role=phrase[0]), phrases))
+        summary = {
+            "phrases": len(phrases),
+            "synthesized": sum(1 for result in results if result),
+            "seconds": round(time.perf_counter() - start, 2)
+        }
+        print(f"TTS warm-up: {summary}")
+        return summary
+
+# Started at most once per process (the caches are shared)
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+def start_warmup(engine) -> bool:
+    """Warm the TTS cache in a background thread. Returns False if already started."""
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started or not getattr(engine, "audio_available", False):
+            return False
+        _warmup_started = True
+
+    def run():
+        try:
+            TTSWarmup(engine).run()
+        except Exception as e:
+            print(f"Error warming up TTS: {str(e)}")
+
+    threading.Thread(target=run, name="tts-warmup", daemon=True).start()
+    return True
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Pre-synthesize fixed and frequent courtroom phrases into the TTS cache")
+    parser.add_argument("--min-count", type=int, default=3, help="How often a transcript line must occur to be cached")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+    from .tts import TTSEngine
+    TTSWarmup(TTSEngine(), min_count=args.min_count, workers=args.workers).run()
+
+if __name__ == "__main__":
+    main()